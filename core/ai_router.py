@@ -1,8 +1,416 @@
-from data.models import AIResponse, Settings, Team
-from core.anthropic_client import call_anthropic
-from core.gemini_client import call_gemini
-from core.prompt_builder import build_system_prompt, build_user_message
-from core.response_parser import parse_ai_response
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TypeVar
+
+from data.models import AIResponse, Decomposition, Settings, Team
+from core import anthropic_client, gemini_client
+from core.anthropic_client import call_anthropic, stream_anthropic
+from core.gemini_client import call_gemini, stream_gemini
+from core.llm_clients import LLMUnavailableError
+from core.prompt_builder import build_decompose_message, build_system_prompt, build_user_message
+from core.response_cache import get_cached_response, response_cache_key, store_response
+from core.response_parser import (
+    AI_RESPONSE_SCHEMA,
+    DECOMPOSITION_SCHEMA,
+    StreamingResponseParser,
+    is_structured_response,
+    parse_ai_response,
+    parse_decomposition,
+)
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Issue type names Jira uses for epics (English and Russian localisations)
+_EPIC_TYPE_NAMES = {"epic", "эпик"}
+
+# Seconds without a new chunk after which a streamed generation is abandoned
+STREAM_IDLE_TIMEOUT = 30.0
+
+_PROVIDER_NAMES = {"anthropic": "Anthropic", "gemini": "Google Gemini"}
+_MODELS = {"anthropic": anthropic_client.MODEL, "gemini": gemini_client.MODEL}
+
+# Hedging: recent latencies per (provider, "response" | "first_chunk"); until
+# enough samples are collected the default delay is used
+_HEDGE_WINDOW = 100
+_HEDGE_MIN_SAMPLES = 10
+_HEDGE_DEFAULT_DELAY = {"response": 20.0, "first_chunk": 5.0}
+_HEDGE_MIN_DELAY = 0.5
+_latencies: dict[tuple[str, str], deque[float]] = {}
+
+# Circuit breaker: consecutive transient failures that open a provider's circuit,
+# and seconds it stays open before a probe request is let through
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 30.0
+
+
+class CircuitBreaker:
+    """Stops sending requests to a provider after consecutive transient failures.
+
+    closed → (threshold failures in a row) → open → (cooldown elapsed) →
+    half-open: one probe request is let through; its success closes the
+    circuit, its failure opens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN,
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """"closed", "open" or "half_open"."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allows(self) -> bool:
+        """Whether a request may be sent now (in half-open state, only one at a time)."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._probing)
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through (0 if it is not open)."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def try_acquire(self) -> bool:
+        """Check allows() and mark the start of a request in one step.
+
+        In half-open state the caller that gets True owns the probe slot until
+        it reports the outcome (record_success / record_failure / release).
+        """
+        if not self.allows():
+            return False
+        if self.state == "half_open":
+            self._probing = True
+        return True
+
+    def release(self) -> None:
+        """Request ended without telling anything about availability (cancelled, bad key...)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            log.info("Circuit for %s closed", self.name)
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        probe, self._probing = self._probing, False
+        if probe or self.failures >= self.threshold:
+            self._opened_at = time.monotonic()
+            log.warning(
+                "Circuit for %s opened after %d failure(s), retry in %.0f s",
+                self.name, self.failures, self.cooldown,
+            )
+
+
+_breakers = {provider: CircuitBreaker(provider) for provider in _PROVIDER_NAMES}
+
+# Background force-complete generations keyed by response cache key
+_speculative: dict[str, asyncio.Task[str]] = {}
+
+
+def _provider_key(settings: Settings, provider: str) -> str:
+    return settings.gemini_api_key if provider == "gemini" else settings.anthropic_api_key
+
+
+def _configured_provider(settings: Settings) -> str:
+    return "gemini" if settings.default_llm == "gemini" else "anthropic"
+
+
+def _providers(settings: Settings) -> list[str]:
+    """Providers to try in order: the configured one, then the other one if its key is set.
+
+    Providers with an open circuit are skipped, so traffic fails over to the
+    other provider during an incident. Raises ValueError if the configured
+    provider has no key and LLMUnavailableError if no provider may be called.
+    """
+    primary = _configured_provider(settings)
+    if not _provider_key(settings, primary):
+        raise ValueError(
+            f"{_PROVIDER_NAMES[primary]} API key не настроен.\nПерейдите в раздел «Настройки» и введите ключ."
+        )
+    secondary = "anthropic" if primary == "gemini" else "gemini"
+    candidates = [primary, secondary] if _provider_key(settings, secondary) else [primary]
+    usable = [p for p in candidates if _breakers[p].allows()]
+    if not usable:
+        raise _circuit_open_error(primary)
+    if usable[0] != primary:
+        log.warning("Circuit for %s is open, using %s", primary, usable[0])
+    return usable
+
+
+def _circuit_open_error(provider: str) -> LLMUnavailableError:
+    return LLMUnavailableError(
+        f"{_PROVIDER_NAMES[provider]} API временно недоступен (несколько ошибок подряд).\n"
+        f"Повторите попытку через {math.ceil(_breakers[provider].retry_after())} с."
+    )
+
+
+def _record_latency(provider: str, kind: str, seconds: float) -> None:
+    _latencies.setdefault((provider, kind), deque(maxlen=_HEDGE_WINDOW)).append(seconds)
+
+
+def _hedge_delay(provider: str, kind: str, percentile: int) -> float:
+    """Seconds to wait for the provider before asking the other one.
+
+    This is the given percentile of the provider's recent latencies, so only
+    the slowest requests get a second copy.
+    """
+    samples = sorted(_latencies.get((provider, kind), ()))
+    if len(samples) < _HEDGE_MIN_SAMPLES:
+        return _HEDGE_DEFAULT_DELAY[kind]
+    rank = math.ceil(len(samples) * min(max(percentile, 1), 100) / 100) - 1
+    return max(_HEDGE_MIN_DELAY, samples[rank])
+
+
+async def _race(
+    providers: list[str],
+    start: Callable[[str], Awaitable[T]],
+    delay: float | None,
+    dispose: Callable[[T], Awaitable[None]] | None = None,
+) -> tuple[str, T]:
+    """Run start(providers[0]); if it fails with LLMUnavailableError or, when delay is
+    set, is not done within delay seconds, also run start(providers[1]). Returns
+    the provider that succeeded first and its result, cancelling the other.
+
+    Other errors are raised at once; if every attempt fails, the first error
+    is raised.
+
+    A provider is started only if its circuit breaker grants the request
+    (try_acquire), and every started attempt reports its outcome back, so a
+    half-open circuit lets exactly one probe through. A losing attempt that
+    still succeeded (both finished at once) has its result passed to
+    dispose(), e.g. to close an opened stream.
+    """
+    queue = list(reversed(providers))
+    pending: dict[asyncio.Task[T], str] = {}
+    errors: list[BaseException] = []
+
+    def launch() -> None:
+        while queue:
+            provider = queue.pop()
+            if _breakers[provider].try_acquire():
+                if pending or errors:
+                    log.info("Hedging LLM request to %s", provider)
+                pending[asyncio.create_task(start(provider))] = provider
+                return
+            log.info("Circuit for %s is busy with a probe, skipping it", provider)
+
+    launch()
+    if not pending:
+        raise _circuit_open_error(providers[0])
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, timeout=delay if queue else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                provider = pending.pop(task)
+                breaker = _breakers[provider]
+                if task.exception() is None:
+                    breaker.record_success()
+                    return provider, task.result()
+                log.warning("LLM provider %s failed: %s", provider, task.exception())
+                if not isinstance(task.exception(), LLMUnavailableError):
+                    breaker.release()
+                    raise task.exception()
+                breaker.record_failure()
+                errors.append(task.exception())
+            if queue and (not done or not pending):
+                launch()
+        raise errors[0]
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task, provider in pending.items():
+            breaker = _breakers[provider]
+            if task.cancelled():
+                breaker.release()
+            elif isinstance(task.exception(), LLMUnavailableError):
+                breaker.record_failure()
+            elif task.exception() is not None:
+                breaker.release()
+            else:
+                breaker.record_success()
+                if dispose is not None:
+                    await dispose(task.result())
+
+
+async def _call_provider(
+    provider: str, system_prompt: str, user_message: str, settings: Settings, schema: dict
+) -> str:
+    api_key = _provider_key(settings, provider)
+    started = time.monotonic()
+    if provider == "gemini":
+        text = await call_gemini(system_prompt, user_message, api_key, schema=schema)
+    else:
+        text = await call_anthropic(system_prompt, user_message, api_key, schema=schema)
+    _record_latency(provider, "response", time.monotonic() - started)
+    return text
+
+
+async def _call_llm(
+    system_prompt: str, user_message: str, settings: Settings, schema: dict = AI_RESPONSE_SCHEMA
+) -> tuple[str, str]:
+    """Send the prompt to the configured provider; returns the provider that answered and the raw text.
+
+    If the provider is unavailable, the request fails over to the other one;
+    with hedging on, a request it is slow to answer is sent there too (see _race).
+    """
+    providers = _providers(settings)
+    return await _race(
+        providers,
+        lambda p: _call_provider(p, system_prompt, user_message, settings, schema),
+        _hedge_delay(providers[0], "response", settings.llm_hedge_percentile)
+        if settings.llm_hedging else None,
+    )
+
+
+async def _open_stream(
+    provider: str, system_prompt: str, user_message: str, settings: Settings, schema: dict
+) -> tuple[AsyncIterator[str], str | None]:
+    """Start streaming from the provider; returns the stream and its first chunk (None if empty)."""
+    api_key = _provider_key(settings, provider)
+    if provider == "gemini":
+        chunks = stream_gemini(system_prompt, user_message, api_key, schema=schema)
+    else:
+        chunks = stream_anthropic(system_prompt, user_message, api_key, schema=schema)
+    started = time.monotonic()
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        return chunks, None
+    except BaseException:
+        await chunks.aclose()
+        raise
+    _record_latency(provider, "first_chunk", time.monotonic() - started)
+    return chunks, first
+
+
+async def _close_stream(opened: tuple[AsyncIterator[str], str | None]) -> None:
+    await opened[0].aclose()
+
+
+async def _stream_llm(
+    system_prompt: str,
+    user_message: str,
+    settings: Settings,
+    schema: dict,
+    idle_timeout: float,
+    on_chunk: Callable[[str], None] | None = None,
+) -> tuple[str, str]:
+    """Stream the response to the end; returns the provider that answered and the text.
+
+    Fails over like _call_llm; with hedging on, the provider that delivers
+    the first chunk wins the race. Raises asyncio.TimeoutError if no chunk
+    arrives for idle_timeout seconds, so long answers are not cut off by a
+    limit on the whole generation.
+    """
+    providers = _providers(settings)
+    provider, (chunks, first) = await asyncio.wait_for(
+        _race(
+            providers,
+            lambda p: _open_stream(p, system_prompt, user_message, settings, schema),
+            _hedge_delay(providers[0], "first_chunk", settings.llm_hedge_percentile)
+            if settings.llm_hedging else None,
+            _close_stream,
+        ),
+        timeout=idle_timeout,
+    )
+    parts: list[str] = []
+    try:
+        chunk = first
+        while chunk is not None:
+            parts.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+            try:
+                chunk = await asyncio.wait_for(anext(chunks), timeout=idle_timeout)
+            except StopAsyncIteration:
+                chunk = None
+    finally:
+        await chunks.aclose()
+    return provider, "".join(parts)
+
+
+def _cache_key(system_prompt: str, user_message: str, settings: Settings) -> str:
+    provider = _configured_provider(settings)
+    return response_cache_key(provider, _MODELS[provider], system_prompt, user_message)
+
+
+async def _store_if_structured(key: str, raw_text: str, provider: str, settings: Settings) -> None:
+    # The key names the configured provider; an answer from the failover or
+    # hedge provider must not be served later as if that provider gave it
+    if provider != _configured_provider(settings):
+        log.debug("Not caching response %s answered by %s", key[:12], provider)
+        return
+    # Plain-text fallbacks are not worth repeating: the next attempt may do better
+    if is_structured_response(raw_text):
+        await store_response(key, raw_text)
+
+
+def _apply_team_params(response: AIResponse, team: Team, issue_type: str, issue_type_id: str) -> None:
+    # Team config is authoritative for type and project
+    response.jira_params["type"] = issue_type
+    response.jira_params["type_id"] = issue_type_id
+    response.jira_params["project"] = team.jira_project
+    if team.extra_jira_fields:
+        response.jira_params["extra_fields"] = team.extra_jira_fields
+
+
+async def _join_speculative(key: str, timeout: float = STREAM_IDLE_TIMEOUT) -> str | None:
+    """Wait for a speculative generation of the same request.
+
+    Returns None if there is none, it failed, or it gives no answer within
+    timeout seconds; a stalled one is cancelled, so the caller starts its own
+    (streamed) request instead of hanging on a non-streaming call.
+    """
+    task = _speculative.get(key)
+    if task is None:
+        return None
+    log.debug("Joining speculative generation %s", key[:12])
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except asyncio.TimeoutError:
+        log.info("Speculative generation %s stalled, dropping it", key[:12])
+        cancel_speculative_completion(key)
+        return None
+    except asyncio.CancelledError:
+        if task.cancelled():
+            return None
+        raise
+    except Exception:
+        return None
+
+
+def _parse_response(raw_text: str, team: Team) -> AIResponse:
+    response = parse_ai_response(raw_text)
+    if response.status == "ready":
+        _apply_team_params(response, team, team.default_task_type, team.default_task_type_id)
+    return response
 
 
 async def generate(
@@ -11,30 +419,148 @@ async def generate(
     answers: list[tuple[str, str]] | None,
     settings: Settings,
     force_complete: bool = False,
+    use_cache: bool = True,
 ) -> AIResponse:
-    """Route AI call to Anthropic or Gemini and return a parsed AIResponse."""
+    """Route AI call to Anthropic or Gemini and return a parsed AIResponse.
+
+    An identical earlier request is answered from the response cache;
+    use_cache=False (regenerate) always asks the provider and refreshes the cache.
+    """
     system_prompt = build_system_prompt(team)
-    user_message = build_user_message(user_input, answers, force_complete=force_complete)
+    user_message = build_user_message(
+        user_input, answers, force_complete=force_complete, use_glossary=team.use_glossary
+    )
 
-    if settings.default_llm == "gemini":
-        if not settings.gemini_api_key:
-            raise ValueError(
-                "Google Gemini API key не настроен.\nПерейдите в раздел «Настройки» и введите ключ."
-            )
-        raw_text = await call_gemini(system_prompt, user_message, settings.gemini_api_key)
-    else:
-        if not settings.anthropic_api_key:
-            raise ValueError(
-                "Anthropic API key не настроен.\nПерейдите в раздел «Настройки» и введите ключ."
-            )
-        raw_text = await call_anthropic(system_prompt, user_message, settings.anthropic_api_key)
+    key = _cache_key(system_prompt, user_message, settings)
+    raw_text = await get_cached_response(key) if use_cache else None
+    if raw_text is None and use_cache:
+        raw_text = await _join_speculative(key)
+    if raw_text is None:
+        provider, raw_text = await _call_llm(system_prompt, user_message, settings)
+        await _store_if_structured(key, raw_text, provider, settings)
 
-    response = parse_ai_response(raw_text)
-    if response.status == "ready":
-        # Team config is authoritative for type and project
-        response.jira_params["type"] = team.default_task_type
-        response.jira_params["type_id"] = team.default_task_type_id
-        response.jira_params["project"] = team.jira_project
-        if team.extra_jira_fields:
-            response.jira_params["extra_fields"] = team.extra_jira_fields
-    return response
+    return _parse_response(raw_text, team)
+
+
+async def generate_stream(
+    team: Team,
+    user_input: str,
+    answers: list[tuple[str, str]] | None,
+    settings: Settings,
+    force_complete: bool = False,
+    on_partial: Callable[[dict[str, str]], None] | None = None,
+    idle_timeout: float = STREAM_IDLE_TIMEOUT,
+    use_cache: bool = True,
+) -> AIResponse:
+    """Like generate(), but streams the completion.
+
+    on_partial(fields) is called after every chunk with the fields known so far
+    (see StreamingResponseParser); a cached response is returned at once without
+    calling it. Instead of a limit on the whole generation, asyncio.TimeoutError
+    is raised only if no chunk arrives for idle_timeout seconds.
+    """
+    system_prompt = build_system_prompt(team)
+    user_message = build_user_message(
+        user_input, answers, force_complete=force_complete, use_glossary=team.use_glossary
+    )
+
+    key = _cache_key(system_prompt, user_message, settings)
+    cached = await get_cached_response(key) if use_cache else None
+    if cached is None and use_cache:
+        cached = await _join_speculative(key, idle_timeout)
+    if cached is not None:
+        return _parse_response(cached, team)
+
+    parser = StreamingResponseParser()
+
+    def on_chunk(chunk: str) -> None:
+        fields = parser.feed(chunk)
+        if on_partial is not None:
+            on_partial(fields)
+
+    provider, _ = await _stream_llm(
+        system_prompt, user_message, settings, AI_RESPONSE_SCHEMA, idle_timeout, on_chunk
+    )
+    await _store_if_structured(key, parser.text, provider, settings)
+
+    return _parse_response(parser.text, team)
+
+
+def start_speculative_completion(team: Team, user_input: str, settings: Settings) -> str | None:
+    """Start the force-complete generation of user_input in the background.
+
+    Meant to be called while clarifying questions are shown: skipping them then
+    finds the task in the response cache, or joins the request still in flight,
+    instead of starting a new generation. Does nothing unless
+    settings.speculative_completion is on, since the extra request costs tokens.
+    Returns a handle for cancel_speculative_completion(), or None. Must be
+    called from the event loop.
+    """
+    if not settings.speculative_completion:
+        return None
+    system_prompt = build_system_prompt(team)
+    user_message = build_user_message(
+        user_input, None, force_complete=True, use_glossary=team.use_glossary
+    )
+    key = _cache_key(system_prompt, user_message, settings)
+    if key in _speculative:
+        return key
+
+    async def _run() -> str:
+        raw_text = await get_cached_response(key)
+        if raw_text is None:
+            provider, raw_text = await _call_llm(system_prompt, user_message, settings)
+            await _store_if_structured(key, raw_text, provider, settings)
+        return raw_text
+
+    def _done(t: asyncio.Task[str]) -> None:
+        if _speculative.get(key) is t:
+            del _speculative[key]
+        if not t.cancelled() and t.exception() is not None:
+            log.info("Speculative generation failed: %s", t.exception())
+
+    task = asyncio.create_task(_run())
+    task.add_done_callback(_done)
+    _speculative[key] = task
+    log.debug("Speculative generation %s started", key[:12])
+    return key
+
+
+def cancel_speculative_completion(handle: str | None) -> None:
+    """Cancel a generation started by start_speculative_completion(), if it is still running."""
+    task = _speculative.pop(handle, None) if handle else None
+    if task is not None and not task.done():
+        task.cancel()
+        log.debug("Speculative generation %s cancelled", handle[:12])
+
+
+async def decompose(
+    team: Team,
+    user_input: str,
+    settings: Settings,
+    answers: list[tuple[str, str]] | None = None,
+    idle_timeout: float = STREAM_IDLE_TIMEOUT,
+) -> Decomposition:
+    """Ask the AI for an epic plus child stories in one call.
+
+    Stories get the team's default issue type; the epic gets the project's epic
+    type (ID taken from the team's issue type metadata when available).
+    The answer is streamed, so like generate_stream() asyncio.TimeoutError is
+    raised only if no chunk arrives for idle_timeout seconds.
+    """
+    system_prompt = build_system_prompt(team)
+    user_message = build_decompose_message(user_input, answers, use_glossary=team.use_glossary)
+
+    _, raw_text = await _stream_llm(
+        system_prompt, user_message, settings, DECOMPOSITION_SCHEMA, idle_timeout
+    )
+
+    decomposition = parse_decomposition(raw_text)
+    epic_type = next(
+        (t for t in team.jira_issue_types_meta if t.get("name", "").lower() in _EPIC_TYPE_NAMES),
+        None,
+    )
+    _apply_team_params(decomposition.epic, team, "Epic", epic_type["id"] if epic_type else "")
+    for story in decomposition.stories:
+        _apply_team_params(story, team, team.default_task_type, team.default_task_type_id)
+    return decomposition
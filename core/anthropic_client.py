@@ -1,33 +1,138 @@
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
 import anthropic
 
+from core.llm_clients import LLMUnavailableError, get_anthropic_client
+
+log = logging.getLogger(__name__)
+
+MODEL = "claude-sonnet-4-6"
+
+# Structured output is requested as a forced call of this tool
+_RESPONSE_TOOL = "submit_response"
+
+
+def _system_blocks(system_prompt: str) -> list[dict]:
+    """System prompt as a single cached block.
+
+    The prompt (team rules and context) is identical for every request of a
+    team, including clarification rounds, so a cache breakpoint at its end lets the
+    provider reuse it for ~5 minutes. Prompts below the model's minimum cacheable
+    length are simply processed uncached.
+    """
+    return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+
+def _tool_params(schema: dict | None) -> dict:
+    """Request arguments that force the answer into the given JSON schema ({} for free text)."""
+    if schema is None:
+        return {}
+    return {
+        "tools": [{
+            "name": _RESPONSE_TOOL,
+            "description": "Вернуть ответ в структурированном виде",
+            "input_schema": schema,
+        }],
+        "tool_choice": {"type": "tool", "name": _RESPONSE_TOOL},
+    }
+
+
+def _log_usage(usage: Any) -> None:
+    if usage is None:
+        return
+    log.info(
+        "Anthropic usage: input=%s, cache_read=%s, cache_write=%s, output=%s",
+        usage.input_tokens,
+        getattr(usage, "cache_read_input_tokens", None) or 0,
+        getattr(usage, "cache_creation_input_tokens", None) or 0,
+        usage.output_tokens,
+    )
+
+
+def _to_value_error(e: anthropic.APIError) -> ValueError:
+    """Translate an SDK error into a user-facing ValueError.
+
+    Transient errors become LLMUnavailableError so the router can fail over.
+    """
+    if isinstance(e, anthropic.APITimeoutError):
+        return LLMUnavailableError("Anthropic API: превышено время ожидания")
+    if isinstance(e, anthropic.APIConnectionError):
+        return LLMUnavailableError("Не удалось подключиться к Anthropic API")
+    if isinstance(e, anthropic.AuthenticationError):
+        return ValueError("Anthropic API: неверный ключ (ошибка авторизации)")
+    if isinstance(e, anthropic.PermissionDeniedError):
+        return ValueError("Anthropic API: нет доступа (403)")
+    if isinstance(e, anthropic.RateLimitError):
+        return LLMUnavailableError("Anthropic API: превышен лимит запросов")
+    if isinstance(e, anthropic.InternalServerError):
+        return LLMUnavailableError("Anthropic API: внутренняя ошибка сервера (500)")
+    if isinstance(e, anthropic.APIStatusError) and e.status_code >= 500:
+        return LLMUnavailableError(f"Anthropic API ошибка {e.status_code}: {e.message}")
+    if isinstance(e, anthropic.APIStatusError):
+        return ValueError(f"Anthropic API ошибка {e.status_code}: {e.message}")
+    return ValueError(f"Anthropic API: {e}")
+
 
 async def call_anthropic(
     system_prompt: str,
     user_message: str,
     api_key: str,
-    model: str = "claude-sonnet-4-6",
+    model: str = MODEL,
+    schema: dict | None = None,
 ) -> str:
-    """Call Anthropic API asynchronously and return the raw response text."""
-    client = anthropic.AsyncAnthropic(api_key=api_key)
+    """Call Anthropic API asynchronously and return the raw response text.
+
+    With a schema, the answer comes back as a tool call and is returned as its
+    JSON arguments, so it always matches the schema.
+    """
+    client = get_anthropic_client(api_key)
     try:
         message = await client.messages.create(
             model=model,
             max_tokens=4096,
-            system=system_prompt,
+            system=_system_blocks(system_prompt),
             messages=[{"role": "user", "content": user_message}],
+            **_tool_params(schema),
         )
-        return message.content[0].text
-    except anthropic.APITimeoutError:
-        raise ValueError("Anthropic API: превышено время ожидания")
-    except anthropic.APIConnectionError:
-        raise ValueError("Не удалось подключиться к Anthropic API")
-    except anthropic.AuthenticationError:
-        raise ValueError("Anthropic API: неверный ключ (ошибка авторизации)")
-    except anthropic.PermissionDeniedError:
-        raise ValueError("Anthropic API: нет доступа (403)")
-    except anthropic.RateLimitError:
-        raise ValueError("Anthropic API: превышен лимит запросов")
-    except anthropic.InternalServerError:
-        raise ValueError("Anthropic API: внутренняя ошибка сервера (500)")
-    except anthropic.APIStatusError as e:
-        raise ValueError(f"Anthropic API ошибка {e.status_code}: {e.message}")
+        _log_usage(message.usage)
+        for block in message.content:
+            if block.type == "tool_use":
+                return json.dumps(block.input, ensure_ascii=False)
+        return "".join(block.text for block in message.content if block.type == "text")
+    except anthropic.APIError as e:
+        raise _to_value_error(e)
+
+
+async def stream_anthropic(
+    system_prompt: str,
+    user_message: str,
+    api_key: str,
+    model: str = MODEL,
+    schema: dict | None = None,
+) -> AsyncIterator[str]:
+    """Stream the response of Anthropic API as text chunks, as soon as they arrive.
+
+    With a schema, the chunks are the pieces of the tool call's JSON arguments.
+    """
+    client = get_anthropic_client(api_key)
+    try:
+        async with client.messages.stream(
+            model=model,
+            max_tokens=4096,
+            system=_system_blocks(system_prompt),
+            messages=[{"role": "user", "content": user_message}],
+            **_tool_params(schema),
+        ) as stream:
+            async for event in stream:
+                if event.type != "content_block_delta":
+                    continue
+                if event.delta.type == "input_json_delta":
+                    yield event.delta.partial_json
+                elif event.delta.type == "text_delta":
+                    yield event.delta.text
+            _log_usage((await stream.get_final_message()).usage)
+    except anthropic.APIError as e:
+        raise _to_value_error(e)
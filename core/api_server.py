@@ -0,0 +1,386 @@
+"""Local HTTP API for team-rules-aware generation: python -m core.api_server.
+
+Endpoints (JSON in, JSON out):
+  POST /generate  {"team", "description", "force_complete"?}       → AIResponse fields
+  POST /clarify   {"team", "description", "answers": [[q, a], ...]} → AIResponse fields
+                  ("regenerate": true on either skips the response cache)
+  POST /create    AIResponse fields as returned by /generate        → {"key"}
+  GET  /metrics   queue depth, in-flight jobs, per-route counters and latency
+  GET  /health    {"status": "ok"}
+
+Requests are served concurrently by one process: generation and Jira calls run
+on a fixed pool of workers fed by a bounded queue, and a full queue answers 503
+instead of piling up work. Teams and settings are the ones saved by the desktop
+app and are re-read per request, so edits made in the UI apply immediately.
+The server listens on 127.0.0.1 only and has no authentication.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict
+from http import HTTPStatus
+from typing import Any
+
+from core.ai_router import generate
+from core.jira_client import (
+    close_jira_sessions,
+    configure_jira_pool,
+    configure_jira_rate_limits,
+    create_jira_issue,
+)
+from core.llm_clients import close_llm_clients
+from data.models import AIResponse, Team
+from data.settings_store import load_settings
+from data.teams_store import load_all_teams
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 100
+_GENERATE_TIMEOUT = 60.0
+_MAX_BODY = 1024 * 1024
+_HEADER_TIMEOUT = 30.0
+
+
+class ApiError(Exception):
+    """Error answered with the given HTTP status and {"error": message}."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _RouteStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        self.count += 1
+        self.errors += 0 if ok else 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 server with a bounded worker pool for generation and Jira jobs."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._worker_count = workers
+        self._queue: asyncio.Queue[tuple[Callable[[], Awaitable[Any]], asyncio.Future]] = (
+            asyncio.Queue(maxsize=queue_size)
+        )
+        self._workers: list[asyncio.Task] = []
+        self._server: asyncio.AbstractServer | None = None
+        self._in_flight = 0
+        self._stats: dict[str, _RouteStats] = {}
+        self._routes: dict[tuple[str, str], Callable[[dict], Awaitable[dict]]] = {
+            ("POST", "/generate"): self._generate,
+            ("POST", "/clarify"): self._clarify,
+            ("POST", "/create"): self._create,
+            ("GET", "/metrics"): self._metrics,
+            ("GET", "/health"): self._health,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        settings = load_settings()
+        await configure_jira_pool(settings.jira_max_connections, settings.jira_http2)
+        configure_jira_rate_limits(settings.jira_rate_limits)
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self._worker_count)]
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        log.info(
+            "API server listening on http://%s:%d (%d workers, queue %d)",
+            self.host, self.port, self._worker_count, self._queue.maxsize,
+        )
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await close_jira_sessions()
+        await close_llm_clients()
+
+    # ------------------------------------------------------------------
+    # Worker pool
+    # ------------------------------------------------------------------
+
+    async def _worker_loop(self) -> None:
+        while True:
+            job, future = await self._queue.get()
+            if future.cancelled():  # client went away while queued
+                continue
+            self._in_flight += 1
+            try:
+                result = await job()
+                if not future.cancelled():
+                    future.set_result(result)
+            except Exception as exc:
+                if not future.cancelled():
+                    future.set_exception(exc)
+            finally:
+                self._in_flight -= 1
+
+    async def _submit(self, job: Callable[[], Awaitable[Any]]) -> Any:
+        """Run job on the worker pool; raises ApiError(503) if the queue is full."""
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((job, future))
+        except asyncio.QueueFull:
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "Очередь запросов переполнена, повторите позже")
+        return await future
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload = await self._dispatch(method, path, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        except ApiError as exc:  # malformed request line / headers
+            self._write_response(writer, exc.status, {"error": str(exc)}, False)
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[str, str, bytes, bool] | None:
+        line = await asyncio.wait_for(reader.readline(), timeout=_HEADER_TIMEOUT)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Некорректная строка запроса")
+        headers: dict[str, str] = {}
+        while True:
+            header = await asyncio.wait_for(reader.readline(), timeout=_HEADER_TIMEOUT)
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Некорректный Content-Length")
+        if length > _MAX_BODY:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Слишком большой запрос")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return method.upper(), target.split("?", 1)[0], body, keep_alive
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        started = time.perf_counter()
+        handler = self._routes.get((method, path))
+        status = HTTPStatus.OK
+        try:
+            if handler is None:
+                if any(p == path for _, p in self._routes):
+                    raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"Метод {method} не поддерживается")
+                raise ApiError(HTTPStatus.NOT_FOUND, f"Неизвестный адрес {path}")
+            try:
+                data = json.loads(body) if body else {}
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Тело запроса должно быть JSON-объектом")
+            if not isinstance(data, dict):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Тело запроса должно быть JSON-объектом")
+            payload = await handler(data)
+        except ApiError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        except asyncio.TimeoutError:
+            status, payload = HTTPStatus.GATEWAY_TIMEOUT, {"error": "Превышено время ожидания ответа ИИ"}
+        except ValueError as exc:
+            status, payload = HTTPStatus.BAD_GATEWAY, {"error": str(exc)}
+        except Exception as exc:
+            log.exception("API %s %s failed", method, path)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if handler is not None:
+            self._stats.setdefault(path, _RouteStats()).record(elapsed_ms, status < 400)
+        log.info(
+            "API %s %s → %d in %.0f ms (queue %d, in flight %d)",
+            method, path, status, elapsed_ms, self._queue.qsize(), self._in_flight,
+        )
+        return int(status), payload
+
+    # ------------------------------------------------------------------
+    # Handlers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _team(name: Any) -> Team:
+        if not name or not isinstance(name, str):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Не указана команда (team)")
+        team = next((t for t in load_all_teams() if t.name == name), None)
+        if team is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Команда «{name}» не найдена")
+        return team
+
+    @staticmethod
+    def _description(data: dict) -> str:
+        description = data.get("description")
+        if not description or not isinstance(description, str) or not description.strip():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Не указано описание задачи (description)")
+        return description.strip()
+
+    async def _run_generate(
+        self, data: dict, answers: list[tuple[str, str]] | None, force_complete: bool,
+    ) -> dict:
+        team = self._team(data.get("team"))
+        description = self._description(data)
+        settings = load_settings()
+        response = await self._submit(lambda: asyncio.wait_for(
+            generate(
+                team, description, answers, settings,
+                force_complete=force_complete, use_cache=not data.get("regenerate"),
+            ),
+            timeout=_GENERATE_TIMEOUT,
+        ))
+        return asdict(response)
+
+    async def _generate(self, data: dict) -> dict:
+        return await self._run_generate(data, None, bool(data.get("force_complete")))
+
+    async def _clarify(self, data: dict) -> dict:
+        raw_answers = data.get("answers")
+        if not isinstance(raw_answers, list) or not raw_answers:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Не указаны ответы (answers: [[вопрос, ответ], ...])")
+        try:
+            answers = [(str(q), str(a)) for q, a in raw_answers]
+        except (TypeError, ValueError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "answers должен быть списком пар [вопрос, ответ]")
+        return await self._run_generate(data, answers, bool(data.get("force_complete")))
+
+    async def _create(self, data: dict) -> dict:
+        response = AIResponse(
+            status="ready",
+            task_title=str(data.get("task_title") or ""),
+            task_text=str(data.get("task_text") or ""),
+            epic_name=str(data.get("epic_name") or ""),
+            jira_params=data.get("jira_params") if isinstance(data.get("jira_params"), dict) else {},
+        )
+        params = response.jira_params
+        if not response.task_title or not params.get("project"):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Нужны task_title и jira_params.project")
+        settings = load_settings()
+        if not settings.jira_url or not settings.jira_token:
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "Jira не настроена в приложении")
+        key = await self._submit(lambda: create_jira_issue(
+            jira_url=settings.jira_url,
+            token=settings.jira_token,
+            project_key=params["project"],
+            summary=response.task_title,
+            description=response.task_text,
+            issue_type=params.get("type", "Story"),
+            issue_type_id=params.get("type_id", ""),
+            labels=params.get("labels", []),
+            extra_fields=params.get("extra_fields") or None,
+            epic_name=response.epic_name,
+        ))
+        return {"key": key, "url": f"{settings.jira_url.rstrip('/')}/browse/{key}"}
+
+    async def _metrics(self, data: dict) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "in_flight": self._in_flight,
+            "workers": self._worker_count,
+            "routes": {path: stats.as_dict() for path, stats in self._stats.items()},
+        }
+
+    async def _health(self, data: dict) -> dict:
+        return {"status": "ok"}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.api_server",
+        description="Локальный HTTP API генерации задач по правилам команд.",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"порт (по умолчанию {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"одновременных запросов к ИИ и Jira (по умолчанию {DEFAULT_WORKERS})")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"максимум ожидающих запросов (по умолчанию {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="подробный лог в stderr")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)-8s] %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+    server = ApiServer(port=args.port, workers=max(1, args.workers), queue_size=max(1, args.queue))
+    print(f"Lyudochka API: http://127.0.0.1:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Headless batch generation: python -m core.batch INPUT [-o OUTPUT] [--create].
+
+Reads (team, description) rows from CSV (header with "team" and "description"
+columns) or JSONL ({"team": ..., "description": ...} per line), generates a task
+for every row with the teams and settings saved by the desktop app, optionally
+creates the issues in Jira, and writes one JSON line per row to OUTPUT as soon as
+the row is done (completion order; "row" is the 1-based input position).
+Clarifying questions cannot be answered headless, so generation always runs in
+force-complete mode.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+from core.ai_router import generate
+from core.jira_client import (
+    close_jira_sessions,
+    configure_jira_pool,
+    configure_jira_rate_limits,
+    create_jira_issue,
+)
+from core.llm_clients import close_llm_clients
+from data.models import Settings, Team
+from data.settings_store import load_settings
+from data.teams_store import load_all_teams
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 60.0
+
+
+def _jsonl_records(lines: Iterator[str]) -> Iterator[dict]:
+    for n, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"строка {n}: некорректный JSON ({exc.msg})") from exc
+        if not isinstance(record, dict):
+            raise ValueError(f"строка {n}: ожидается объект")
+        yield record
+
+
+def read_rows(path: Path) -> list[dict]:
+    """Load input rows as [{"row", "team", "description"}]; format is chosen by extension.
+
+    Raises OSError if the file cannot be read and ValueError on malformed input.
+    """
+    rows: list[dict] = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            records: Iterator[dict] = _jsonl_records(f)
+        else:
+            records = csv.DictReader(f)
+        for n, record in enumerate(records, start=1):
+            rows.append({
+                "row": n,
+                "team": str(record.get("team") or "").strip(),
+                "description": str(record.get("description") or "").strip(),
+            })
+    return rows
+
+
+async def process_row(
+    row: dict,
+    teams: dict[str, Team],
+    settings: Settings,
+    create: bool,
+    timeout: float,
+) -> dict:
+    """Generate (and optionally create) one task; never raises, errors go to "error"."""
+    result: dict = {"row": row["row"], "team": row["team"], "status": "error"}
+    started = time.perf_counter()
+    try:
+        team = teams.get(row["team"])
+        if team is None:
+            raise ValueError(f"Команда «{row['team']}» не найдена")
+        if not row["description"]:
+            raise ValueError("Пустое описание задачи")
+
+        response = await asyncio.wait_for(
+            generate(team, row["description"], None, settings, force_complete=True),
+            timeout=timeout,
+        )
+        result["generate_s"] = round(time.perf_counter() - started, 3)
+        result["status"] = response.status
+        if response.status != "ready":
+            result["questions"] = response.questions
+            return result
+        result.update(
+            task_title=response.task_title,
+            task_text=response.task_text,
+            epic_name=response.epic_name,
+            jira_params=response.jira_params,
+        )
+
+        if create:
+            create_started = time.perf_counter()
+            params = response.jira_params
+            result["jira_issue_key"] = await create_jira_issue(
+                jira_url=settings.jira_url,
+                token=settings.jira_token,
+                project_key=params.get("project", ""),
+                summary=response.task_title,
+                description=response.task_text,
+                issue_type=params.get("type", "Story"),
+                issue_type_id=params.get("type_id", ""),
+                labels=params.get("labels", []),
+                extra_fields=params.get("extra_fields") or None,
+                epic_name=response.epic_name,
+            )
+            result["create_s"] = round(time.perf_counter() - create_started, 3)
+    except asyncio.TimeoutError:
+        result["error"] = f"Превышено время ожидания ({timeout:.0f} с)"
+    except Exception as exc:
+        log.warning("Row %d failed: %s", row["row"], exc)
+        result["error"] = str(exc)
+    finally:
+        result["total_s"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def run_batch(
+    rows: list[dict],
+    out: TextIO,
+    create: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> tuple[int, int]:
+    """Process rows with at most `concurrency` generations in flight.
+
+    Each result is written to `out` as one JSON line as soon as it is ready.
+    Returns (succeeded, failed); a row whose model still asked questions counts as failed.
+    """
+    settings = load_settings()
+    if create and not (settings.jira_url and settings.jira_token):
+        raise ValueError("Jira не настроена: укажите URL и токен в настройках приложения")
+    teams = {t.name: t for t in load_all_teams()}
+    if create:
+        await configure_jira_pool(settings.jira_max_connections, settings.jira_http2)
+        configure_jira_rate_limits(settings.jira_rate_limits)
+
+    pending = iter(rows)
+    counts = [0, 0]
+
+    async def _worker() -> None:
+        for row in pending:
+            result = await process_row(row, teams, settings, create, timeout)
+            counts[0 if result["status"] == "ready" and "error" not in result else 1] += 1
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(_worker() for _ in range(max(1, min(concurrency, len(rows))))))
+    finally:
+        if create:
+            await close_jira_sessions()
+        await close_llm_clients()
+    log.info(
+        "Batch done: %d row(s), %d ok, %d failed in %.1f s",
+        len(rows), counts[0], counts[1], time.perf_counter() - started,
+    )
+    return counts[0], counts[1]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.batch",
+        description="Пакетная генерация задач без интерфейса (CSV/JSONL → JSONL).",
+    )
+    parser.add_argument("input", type=Path, help="CSV с колонками team,description или JSONL")
+    parser.add_argument("-o", "--output", default="-", help="JSONL с результатами (по умолчанию stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"одновременных запросов к ИИ (по умолчанию {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--create", action="store_true", help="сразу создавать задачи в Jira")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"таймаут генерации одной задачи, с (по умолчанию {DEFAULT_TIMEOUT:.0f})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="подробный лог в stderr")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)-8s] %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+    out: TextIO | None = None
+    try:
+        rows = read_rows(args.input)
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        ok, failed = asyncio.run(run_batch(rows, out, args.create, args.concurrency, args.timeout))
+    except (OSError, ValueError, csv.Error) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    print(f"Готово: {ok} из {len(rows)}, ошибок: {failed}", file=sys.stderr)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Bounded-concurrency executor for bulk Jira operations.
+
+Items are processed by a fixed pool of workers; results are streamed back as they
+complete, each tagged with its input index so the UI can keep rows in input order.
+"""
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TypeVar
+
+from core.jira_client import (
+    create_issue_link,
+    create_jira_issue,
+    create_jira_issues,
+    estimate_write_eta,
+    get_issue_links,
+    get_write_queue_depth,
+    on_jira_retry,
+    search_issues_by_keys,
+    update_jira_issue,
+)
+from core.field_diff import changed_fields
+from core.meta_cache import get_project_meta_cached
+from data.models import BulkItemResult, IssueCheck, IssueUpdatePlan, NewIssue
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+T = TypeVar("T")
+
+# Names of the Jira Software "Epic Link" field (English and Russian localisations)
+_EPIC_LINK_NAMES = {"epic link", "ссылка на эпик"}
+
+
+async def run_bulk(
+    items: list[T],
+    worker: Callable[[T], Awaitable[str | None]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cancel_event: asyncio.Event | None = None,
+    label: Callable[[T], str] = str,
+    on_retry: Callable[[int, str], None] | None = None,
+) -> AsyncIterator[BulkItemResult]:
+    """Run worker(item) for every item with at most `concurrency` in flight.
+
+    Yields one BulkItemResult per item in completion order. A string returned by
+    the worker becomes BulkItemResult.detail. Once cancel_event is set no new items
+    are started: in-flight ones finish, the rest are reported as cancelled.
+    on_retry(index, status_text) is called when a Jira call of an item is retried.
+    """
+    if not items:
+        return
+    results: asyncio.Queue[BulkItemResult] = asyncio.Queue()
+    pending = iter(enumerate(items))
+
+    async def _worker_loop() -> None:
+        for index, item in pending:
+            key = label(item)
+            if cancel_event is not None and cancel_event.is_set():
+                await results.put(BulkItemResult(index=index, key=key, ok=False, cancelled=True))
+                continue
+            retries = [0]
+
+            def _on_retry(attempt: int, delay: float, reason: str, index: int = index) -> None:
+                retries[0] += 1
+                if on_retry is not None:
+                    on_retry(index, f"повтор {attempt} через {delay:.0f} с ({reason})")
+
+            try:
+                with on_jira_retry(_on_retry):
+                    detail = await worker(item)
+                result = BulkItemResult(index=index, key=key, ok=True, detail=detail or "")
+            except Exception as exc:
+                log.warning("Bulk item %s failed: %s", key, exc)
+                result = BulkItemResult(index=index, key=key, ok=False, error=str(exc))
+            result.retries = retries[0]
+            await results.put(result)
+
+    workers = [
+        asyncio.create_task(_worker_loop())
+        for _ in range(max(1, min(concurrency, len(items))))
+    ]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def estimate_bulk_eta(jira_url: str, remaining: int) -> tuple[int, float]:
+    """Return (writes queued at the rate limiter, seconds until `remaining` writes pass it)."""
+    queued = get_write_queue_depth(jira_url)
+    return queued, estimate_write_eta(jira_url, max(0, remaining - queued))
+
+
+async def check_issues(
+    jira_url: str,
+    token: str,
+    keys: list[str],
+    field_ids: list[str] | None = None,
+) -> list[IssueCheck]:
+    """Pre-flight check of bulk targets with batched searches instead of N failed writes.
+
+    Returns one IssueCheck per key, in input order, with the current values of
+    field_ids for issues that were found.
+    """
+    fields = ["project", "issuetype", "summary", *(field_ids or [])]
+    found = await search_issues_by_keys(jira_url, token, keys, list(dict.fromkeys(fields)))
+    checks: list[IssueCheck] = []
+    for key in keys:
+        issue = found.get(key.upper())
+        if issue is None:
+            checks.append(IssueCheck(key=key, found=False))
+            continue
+        raw = issue.get("fields", {})
+        checks.append(IssueCheck(
+            key=key,
+            found=True,
+            project=(raw.get("project") or {}).get("key", ""),
+            issue_type=(raw.get("issuetype") or {}).get("name", ""),
+            summary=raw.get("summary") or "",
+            fields={fid: raw.get(fid) for fid in field_ids or []},
+        ))
+    return checks
+
+
+def bulk_update_issues(
+    jira_url: str,
+    token: str,
+    issue_keys: list[str],
+    extra_fields: dict[str, str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cancel_event: asyncio.Event | None = None,
+    on_retry: Callable[[int, str], None] | None = None,
+) -> AsyncIterator[BulkItemResult]:
+    """Apply the same field changes to many issues concurrently; streams per-issue results."""
+    async def _update(issue_key: str) -> None:
+        await update_jira_issue(jira_url, token, issue_key, extra_fields)
+
+    log.info("Bulk update of %d issue(s), concurrency=%d", len(issue_keys), concurrency)
+    return run_bulk(
+        issue_keys, _update, concurrency=concurrency, cancel_event=cancel_event, on_retry=on_retry,
+    )
+
+
+async def plan_bulk_update(
+    jira_url: str,
+    token: str,
+    issue_keys: list[str],
+    extra_fields: dict[str, str],
+) -> list[IssueUpdatePlan]:
+    """Diff the requested changes against current values (dry run, no writes).
+
+    Current values are read with batched searches limited to the edited fields.
+    Returns one plan per key in input order; plan.changes is empty for issues
+    that already have all target values or were not found (see plan.check.found).
+    """
+    checks = await check_issues(jira_url, token, issue_keys, list(extra_fields))
+    plans = [
+        IssueUpdatePlan(check=c, changes=changed_fields(c.fields, extra_fields) if c.found else {})
+        for c in checks
+    ]
+    log.info(
+        "Bulk update plan: %d issue(s), %d to change, %d missing",
+        len(plans), sum(1 for p in plans if p.changes), sum(1 for p in plans if not p.check.found),
+    )
+    return plans
+
+
+def bulk_apply_plans(
+    jira_url: str,
+    token: str,
+    plans: list[IssueUpdatePlan],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cancel_event: asyncio.Event | None = None,
+    on_retry: Callable[[int, str], None] | None = None,
+) -> AsyncIterator[BulkItemResult]:
+    """Send only the changed fields of each plan; results are indexed like `plans`."""
+    async def _update(plan: IssueUpdatePlan) -> None:
+        await update_jira_issue(jira_url, token, plan.check.key, plan.changes)
+
+    return run_bulk(
+        plans, _update, concurrency=concurrency, cancel_event=cancel_event,
+        label=lambda plan: plan.check.key, on_retry=on_retry,
+    )
+
+
+async def bulk_create_links(
+    jira_url: str,
+    token: str,
+    link_type_id: str,
+    source: str,
+    targets: list[str],
+    is_outward: bool,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cancel_event: asyncio.Event | None = None,
+    on_retry: Callable[[int, str], None] | None = None,
+    existing: set[tuple[str, str, str]] | None = None,
+) -> AsyncIterator[BulkItemResult]:
+    """Link source with every target concurrently, skipping links that already exist.
+
+    Existing links of the source (as returned by get_issue_links) are fetched once up
+    front unless the caller passes them; a target whose link of the same type and
+    direction is already present is reported with a detail instead of being
+    re-created. Raises ValueError if the source issue cannot be read.
+    """
+    if existing is None:
+        existing = await get_issue_links(jira_url, token, source)
+
+    async def _link(target: str) -> str | None:
+        outward = source if is_outward else target
+        inward = target if is_outward else source
+        triple = (str(link_type_id), outward.upper(), inward.upper())
+        if triple in existing:
+            return "связь уже существует"
+        # Mark before awaiting so a duplicate target in the same run is skipped too
+        existing.add(triple)
+        try:
+            await create_issue_link(jira_url, token, link_type_id, outward, inward)
+        except Exception:
+            existing.discard(triple)
+            raise
+        return None
+
+    log.info(
+        "Bulk link %s with %d issue(s) (%d existing links), concurrency=%d",
+        source, len(targets), len(existing), concurrency,
+    )
+    async for result in run_bulk(
+        targets, _link, concurrency=concurrency, cancel_event=cancel_event, on_retry=on_retry,
+    ):
+        yield result
+
+
+async def find_epic_link_field(jira_url: str, token: str, project_key: str) -> str:
+    """Return the ID of the project's Epic Link field, or "" if it is not on the create screens."""
+    meta = await get_project_meta_cached(jira_url, token, project_key)
+    return next(
+        (f["id"] for f in meta.get("fields", []) if f.get("name", "").lower() in _EPIC_LINK_NAMES),
+        "",
+    )
+
+
+async def create_epic_with_stories(
+    jira_url: str,
+    token: str,
+    epic: NewIssue,
+    stories: list[NewIssue],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_retry: Callable[[int, str], None] | None = None,
+) -> AsyncIterator[tuple[str, BulkItemResult]]:
+    """Create an epic, then all its stories at once, then attach every story to the epic.
+
+    Yields (stage, result) as work completes: ("epic", result) first, then one
+    ("story", result) per story (result.key is the created key) and one
+    ("link", result) per created story. Story and link results are indexed like
+    `stories`. Raises ValueError if the epic cannot be created; nothing else is
+    attempted in that case.
+    """
+    epic_key = await create_jira_issue(
+        jira_url=jira_url,
+        token=token,
+        project_key=epic.project_key,
+        summary=epic.summary,
+        description=epic.description,
+        issue_type=epic.issue_type,
+        issue_type_id=epic.issue_type_id,
+        labels=epic.labels,
+        extra_fields=epic.extra_fields or None,
+        epic_name=epic.epic_name,
+    )
+    yield "epic", BulkItemResult(index=0, key=epic_key, ok=True)
+
+    created = await create_jira_issues(jira_url, token, stories)
+    for result in created:
+        yield "story", result
+
+    to_link = [r for r in created if r.ok]
+    if not to_link:
+        return
+    try:
+        link_field = await find_epic_link_field(jira_url, token, epic.project_key)
+    except ValueError as exc:
+        log.warning("Could not read fields of %s: %s", epic.project_key, exc)
+        link_field = ""
+    if not link_field:
+        for result in to_link:
+            yield "link", BulkItemResult(
+                index=result.index, key=result.key, ok=False,
+                error=f"поле Epic Link не найдено в проекте {epic.project_key}",
+            )
+        return
+
+    async def _attach(result: BulkItemResult) -> None:
+        await update_jira_issue(jira_url, token, result.key, {link_field: epic_key})
+
+    log.info("Linking %d stor(ies) to epic %s via %s", len(to_link), epic_key, link_field)
+    async for link in run_bulk(
+        to_link, _attach, concurrency=concurrency,
+        label=lambda r: r.key,
+        on_retry=(lambda i, text: on_retry(to_link[i].index, text)) if on_retry else None,
+    ):
+        link.index = to_link[link.index].index
+        yield "link", link
@@ -0,0 +1,80 @@
+"""Compare current Jira field values with the values a bulk edit would set.
+
+Desired values come from the bulk edit screen in API format ('{"id": "1"}',
+'[{"id": "1"}]', '[{"key": "CMDB-1"}]' or a plain string); current values are
+raw field values from a search response. When the two shapes cannot be
+compared reliably the field is reported as changed, so an update is never lost.
+"""
+import json
+import re
+from typing import Any
+
+# Insight fields on Jira Server return objects as "Label (KEY-123)" strings
+_INSIGHT_LABEL_RE = re.compile(r"\(([A-Z][A-Z0-9_]*-\d+)\)\s*$")
+
+# Attributes that identify a referenced entity (option, version, user, Insight object)
+_IDENTITY_KEYS = ("id", "key", "name", "value")
+
+
+def parse_field_value(raw: str) -> Any:
+    """Parse a value string the way update_jira_issue sends it."""
+    stripped = raw.strip()
+    if stripped.startswith(("[", "{")):
+        try:
+            return json.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+    return stripped
+
+
+def _matches_ref(current: Any, desired: dict) -> bool:
+    """True if current refers to the same entity as desired, e.g. {"id": "1"}."""
+    if isinstance(current, str):
+        m = _INSIGHT_LABEL_RE.search(current)
+        ref = m.group(1) if m else current
+        return any(str(desired.get(k)) == ref for k in ("key", "name", "value") if k in desired)
+    if not isinstance(current, dict):
+        return False
+    if "key" in desired and "key" not in current and "objectKey" in current:
+        current = {**current, "key": current["objectKey"]}
+    keys = [k for k in _IDENTITY_KEYS if k in desired]
+    return bool(keys) and all(str(current.get(k)) == str(desired[k]) for k in keys)
+
+
+def values_equal(current: Any, desired: Any) -> bool:
+    if isinstance(desired, list):
+        if not isinstance(current, list) or len(current) != len(desired):
+            return not desired and not current
+        remaining = list(current)
+        for want in desired:
+            match = next(
+                (c for c in remaining if (_matches_ref(c, want) if isinstance(want, dict) else c == want)),
+                None,
+            )
+            if match is None:
+                return False
+            remaining.remove(match)
+        return True
+    if isinstance(desired, dict):
+        return _matches_ref(current, desired)
+    if current is None:
+        return desired == ""
+    if isinstance(current, bool):
+        return str(current).lower() == str(desired).lower()
+    if isinstance(current, (int, float)):
+        try:
+            return float(desired) == float(current)
+        except (TypeError, ValueError):
+            return False
+    if isinstance(current, dict):
+        return any(str(current.get(k)) == str(desired) for k in _IDENTITY_KEYS if k in current)
+    return str(current) == str(desired)
+
+
+def changed_fields(current: dict, extra_fields: dict[str, str]) -> dict[str, str]:
+    """Return the subset of extra_fields whose value differs from current[field_id]."""
+    return {
+        fid: raw
+        for fid, raw in extra_fields.items()
+        if fid not in current or not values_equal(current[fid], parse_field_value(raw))
+    }
@@ -1,40 +1,89 @@
-from google import genai
+from collections.abc import AsyncIterator
+
 from google.genai import types
 
+from core.llm_clients import LLMUnavailableError, get_gemini_client
+
+MODEL = "gemini-2.5-flash"
+
+
+def _config(system_prompt: str, schema: dict | None) -> types.GenerateContentConfig:
+    if schema is None:
+        return types.GenerateContentConfig(system_instruction=system_prompt)
+    # Gemini orders generated properties alphabetically unless told otherwise;
+    # keep the schema order so "status" and the title stream first
+    return types.GenerateContentConfig(
+        system_instruction=system_prompt,
+        response_mime_type="application/json",
+        response_schema={**schema, "property_ordering": list(schema["properties"])},
+    )
+
+
+def _to_value_error(e: Exception) -> ValueError:
+    """Translate an SDK error into a user-facing ValueError (google-genai has no stable hierarchy).
+
+    Transient errors become LLMUnavailableError so the router can fail over.
+    """
+    msg = str(e)
+    low = msg.lower()
+    tname = type(e).__name__
+    if "403" in msg or "permission" in low or "forbidden" in low or "api_key" in low:
+        return ValueError("Gemini API: нет доступа (403) — проверьте API-ключ")
+    elif "401" in msg or "unauthenticated" in low:
+        return ValueError("Gemini API: неверный ключ (401)")
+    elif "500" in msg or "internal" in low:
+        return LLMUnavailableError("Gemini API: внутренняя ошибка сервера (500)")
+    elif "503" in msg or "unavailable" in low:
+        return LLMUnavailableError("Gemini API: сервис временно недоступен (503)")
+    elif "timeout" in low or "Timeout" in tname or "DeadlineExceeded" in tname:
+        return LLMUnavailableError("Gemini API: превышено время ожидания")
+    elif "connect" in low or "Connection" in tname or "Network" in tname:
+        return LLMUnavailableError("Не удалось подключиться к Gemini API")
+    elif "quota" in low or "429" in msg or "resource_exhausted" in low:
+        return LLMUnavailableError("Gemini API: превышен лимит запросов (429)")
+    return ValueError(f"Gemini API: {e}")
+
 
 async def call_gemini(
     system_prompt: str,
     user_message: str,
     api_key: str,
-    model: str = "gemini-2.5-flash",
+    model: str = MODEL,
+    schema: dict | None = None,
 ) -> str:
-    """Call Google Gemini API asynchronously and return the raw response text."""
-    client = genai.Client(api_key=api_key)
+    """Call Google Gemini API asynchronously and return the raw response text.
+
+    With a schema, Gemini returns JSON that matches it.
+    """
+    client = get_gemini_client(api_key)
     try:
         response = await client.aio.models.generate_content(
             model=model,
             contents=user_message,
-            config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
-            ),
+            config=_config(system_prompt, schema),
         )
         return response.text
     except Exception as e:
-        msg = str(e)
-        low = msg.lower()
-        tname = type(e).__name__
-        if "403" in msg or "permission" in low or "forbidden" in low or "api_key" in low:
-            raise ValueError("Gemini API: нет доступа (403) — проверьте API-ключ")
-        elif "401" in msg or "unauthenticated" in low:
-            raise ValueError("Gemini API: неверный ключ (401)")
-        elif "500" in msg or "internal" in low:
-            raise ValueError("Gemini API: внутренняя ошибка сервера (500)")
-        elif "503" in msg or "unavailable" in low:
-            raise ValueError("Gemini API: сервис временно недоступен (503)")
-        elif "timeout" in low or "Timeout" in tname or "DeadlineExceeded" in tname:
-            raise ValueError("Gemini API: превышено время ожидания")
-        elif "connect" in low or "Connection" in tname or "Network" in tname:
-            raise ValueError("Не удалось подключиться к Gemini API")
-        elif "quota" in low or "429" in msg or "resource_exhausted" in low:
-            raise ValueError("Gemini API: превышен лимит запросов (429)")
-        raise ValueError(f"Gemini API: {e}")
+        raise _to_value_error(e)
+
+
+async def stream_gemini(
+    system_prompt: str,
+    user_message: str,
+    api_key: str,
+    model: str = MODEL,
+    schema: dict | None = None,
+) -> AsyncIterator[str]:
+    """Stream the response of Google Gemini API as text chunks, as soon as they arrive."""
+    client = get_gemini_client(api_key)
+    try:
+        stream = await client.aio.models.generate_content_stream(
+            model=model,
+            contents=user_message,
+            config=_config(system_prompt, schema),
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        raise _to_value_error(e)
@@ -0,0 +1,147 @@
+"""Find glossary terms mentioned in free text.
+
+All term names are compiled into one Aho-Corasick automaton, so a request is
+scanned once no matter how large the glossary is. Matching is case-insensitive,
+treats "ё" as "е" and tolerates inflected endings: "кредитный конвейер" also
+matches "кредитного конвейера", "ЕФС" matches "ЕФС-а". The index is rebuilt only when
+terms.json changes.
+"""
+import logging
+from collections import deque
+
+from data.models import Term
+from data.terms_store import load_terms, terms_version
+
+log = logging.getLogger(__name__)
+
+# Letters an inflected word may add after the stem of a term word
+_INFLECTION_SLACK = 3
+# Words this short (typically abbreviations) must match as a whole word
+_SHORT_WORD = 3
+_DROPPABLE_ENDINGS = "аеиоуыэюяьй"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().replace("ё", "е").split())
+
+
+def _stem(word: str) -> tuple[str, int]:
+    """A term word as (stem, allowed trailing letters).
+
+    "система" → ("систем", 3) matches "системы", "системой"; "кредитный" →
+    ("кредитн", 3) matches "кредитного". Short words only match as they are.
+    """
+    if len(word) <= _SHORT_WORD:
+        return word, 0
+    if word.isalpha():
+        # Drop up to two ending letters ("-ая", "-ый", "-а"), keeping at least four
+        for _ in range(2):
+            if len(word) > 4 and word[-1] in _DROPPABLE_ENDINGS:
+                word = word[:-1]
+    return word, _INFLECTION_SLACK
+
+
+def _word_end(text: str, pos: int, slack: int) -> int:
+    """Index where the word continuing at pos ends, or -1 if more than slack letters remain."""
+    end = pos
+    while end < len(text) and text[end].isalnum():
+        end += 1
+        if end - pos > slack:
+            return -1
+    return end
+
+
+class GlossaryIndex:
+    """Aho-Corasick automaton over the first word stems of a list of terms.
+
+    Each hit on a first word is then verified against the remaining words of the
+    term, so multi-word terms match with every word inflected.
+    """
+
+    def __init__(self, terms: list[Term]) -> None:
+        self.terms = terms
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        # (term index, stems of all words as (stem, slack))
+        self._patterns: list[tuple[int, list[tuple[str, int]]]] = []
+        for term_idx, term in enumerate(terms):
+            words = _normalize(term.name).split(" ")
+            if words == [""]:
+                continue
+            stems = [_stem(w) for w in words]
+            self._add(stems[0][0], (term_idx, stems))
+        self._link()
+
+    def _add(self, form: str, pattern: tuple[int, list[tuple[str, int]]]) -> None:
+        state = 0
+        for ch in form:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self._patterns))
+        self._patterns.append(pattern)
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @staticmethod
+    def _matches_rest(text: str, pos: int, stems: list[tuple[str, int]]) -> bool:
+        """Check the term's words from the end of its first stem (pos) onwards."""
+        end = _word_end(text, pos, stems[0][1])
+        for stem, slack in stems[1:]:
+            if end < 0 or not text.startswith(stem, end + 1) or text[end] != " ":
+                return False
+            end = _word_end(text, end + 1 + len(stem), slack)
+        return end >= 0
+
+    def find(self, text: str, limit: int | None = None) -> list[Term]:
+        """Terms mentioned in text, in order of first mention, at most `limit` of them."""
+        norm = _normalize(text)
+        first_seen: dict[int, int] = {}
+        state = 0
+        for pos, ch in enumerate(norm):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pid in self._out[state]:
+                term_idx, stems = self._patterns[pid]
+                if term_idx in first_seen:
+                    continue
+                start = pos - len(stems[0][0]) + 1
+                if start > 0 and norm[start - 1].isalnum():
+                    continue
+                if self._matches_rest(norm, pos + 1, stems):
+                    first_seen[term_idx] = start
+        ordered = sorted(first_seen, key=first_seen.__getitem__)
+        return [self.terms[i] for i in ordered[:limit]]
+
+
+_index: GlossaryIndex | None = None
+_index_version: tuple | None = None
+
+
+def get_glossary_index() -> GlossaryIndex:
+    """Index over the current terms.json, rebuilt only after the file changed."""
+    global _index, _index_version
+    version = terms_version()
+    if _index is None or version != _index_version:
+        _index = GlossaryIndex(load_terms())
+        _index_version = version
+        log.debug("Glossary index built: %d term(s)", len(_index.terms))
+    return _index
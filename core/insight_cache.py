@@ -0,0 +1,69 @@
+"""Persistent cache of Insight objects per (field_id or field name, objectTypeId).
+
+A fresh cache entry is served as a single page without any request. Otherwise
+objects are streamed from Jira and the complete set is written back together
+with the objectTypeIds resolved from the field config, so the next load skips
+that round trip as well.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+
+from core.jira_client import get_insight_field_type_ids, iter_insight_objects
+from data import insight_cache_store
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 3600.0  # seconds
+
+
+async def load_insight_objects(
+    jira_url: str,
+    token: str,
+    field_name: str,
+    field_id: str = "",
+    object_type_id: int | None = None,
+    force: bool = False,
+    ttl: float = DEFAULT_TTL,
+) -> AsyncIterator[list[dict]]:
+    """Yield Insight objects for a field page by page, from cache when fresh."""
+    cached = None
+    if not force:
+        cached = await asyncio.to_thread(
+            insight_cache_store.load_insight_objects, jira_url, field_id, field_name, object_type_id,
+        )
+    type_ids: list[int] | None = None
+    if cached is not None:
+        objects, type_ids, fetched_at = cached
+        age = time.time() - fetched_at
+        if age < ttl and objects:
+            log.debug("insight cache: hit for %s/%s (%d objects)", field_id, object_type_id, len(objects))
+            yield objects
+            return
+        log.debug("insight cache: %s/%s is stale (%.0f s)", field_id, object_type_id, age)
+
+    if object_type_id is None and field_id and not type_ids:
+        type_ids = await get_insight_field_type_ids(jira_url, token, field_id) or None
+
+    collected: list[dict] = []
+    async for page in iter_insight_objects(
+        jira_url, token, field_name, field_id,
+        object_type_id=object_type_id, object_type_ids=type_ids,
+    ):
+        collected.extend(page)
+        yield page
+
+    if collected:
+        await asyncio.to_thread(
+            insight_cache_store.save_insight_objects,
+            jira_url, field_id, field_name, object_type_id, collected, type_ids,
+        )
+        log.debug("insight cache: stored %d objects for %s/%s", len(collected), field_id, object_type_id)
+
+
+def clear_insight_cache() -> int:
+    """Drop all cached Insight objects. Returns the number of removed entries."""
+    removed = insight_cache_store.clear_insight_cache()
+    log.info("insight cache: cleared %d entries", removed)
+    return removed
@@ -0,0 +1,126 @@
+"""Incremental in-memory search index over Insight objects.
+
+Objects can be added page by page while loading continues; pickers query the
+index at any time and see everything added so far. Lookups use a sorted word
+list (prefix matches via bisect) and a trigram posting index (substring and
+typo-tolerant matches), so a query costs microseconds even with 10k+ objects.
+"""
+import bisect
+import heapq
+import re
+from collections import defaultdict
+
+# Minimum share of the query's trigrams an object must contain to count as a fuzzy match
+_FUZZY_THRESHOLD = 0.6
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().replace("ё", "е").split())
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\w+", text)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class InsightIndex:
+    """Searchable collection of Insight objects [{"id", "name", ...}]."""
+
+    def __init__(self) -> None:
+        self._objects: list[dict] = []
+        self._names: list[str] = []     # normalized "name key" per object, same order
+        self._ids: set[str] = set()
+        self._word_postings: dict[str, list[int]] = defaultdict(list)
+        self._trigram_postings: dict[str, list[int]] = defaultdict(list)
+        self._sorted_words: list[str] = []
+        self._words_dirty = False
+        self.complete: bool = False     # True once the last page has been added
+
+    @classmethod
+    def from_objects(cls, objects: list[dict]) -> "InsightIndex":
+        index = cls()
+        index.add(objects)
+        index.complete = True
+        return index
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def add(self, objects: list[dict]) -> None:
+        """Append a page of objects; duplicates (by id) are ignored."""
+        for obj in objects:
+            oid = obj.get("id", "")
+            if not oid or oid in self._ids:
+                continue
+            pos = len(self._objects)
+            name = _normalize(f"{obj.get('name', '')} {oid}")
+            self._ids.add(oid)
+            self._objects.append(obj)
+            self._names.append(name)
+            for word in set(_words(name)):
+                self._word_postings[word].append(pos)
+            for gram in _trigrams(name):
+                self._trigram_postings[gram].append(pos)
+            self._words_dirty = True
+
+    def search(self, query: str, limit: int = 50, exclude: set[str] | None = None) -> list[dict]:
+        """Return up to `limit` objects for query.
+
+        Objects where every query word is a word prefix come first (in load order),
+        followed by substring / fuzzy trigram matches ranked by similarity.
+        """
+        exclude = exclude or set()
+        needle = _normalize(query)
+        if not needle:
+            return [o for o in self._objects if o["id"] not in exclude][:limit]
+
+        prefix_hits = self._prefix_matches(_words(needle))
+        result = [
+            self._objects[pos]
+            for pos in heapq.nsmallest(limit + len(exclude), prefix_hits)
+            if self._objects[pos]["id"] not in exclude
+        ][:limit]
+        if len(result) >= limit or len(needle) < 3:
+            return result
+
+        for pos in self._trigram_matches(needle):
+            if pos in prefix_hits or self._objects[pos]["id"] in exclude:
+                continue
+            result.append(self._objects[pos])
+            if len(result) >= limit:
+                break
+        return result
+
+    def _prefix_matches(self, words: list[str]) -> set[int]:
+        if self._words_dirty:
+            self._sorted_words = sorted(self._word_postings)
+            self._words_dirty = False
+        hits: set[int] | None = None
+        for word in words:
+            positions: set[int] = set()
+            i = bisect.bisect_left(self._sorted_words, word)
+            while i < len(self._sorted_words) and self._sorted_words[i].startswith(word):
+                positions.update(self._word_postings[self._sorted_words[i]])
+                i += 1
+            hits = positions if hits is None else hits & positions
+            if not hits:
+                return set()
+        return hits if hits is not None else set()
+
+    def _trigram_matches(self, needle: str) -> list[int]:
+        """Positions sharing enough trigrams with needle; exact substrings rank first."""
+        grams = _trigrams(needle)
+        counts: dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for pos in self._trigram_postings.get(gram, ()):
+                counts[pos] += 1
+        need = max(1, int(len(grams) * _FUZZY_THRESHOLD))
+        ranked = sorted(
+            (pos for pos, cnt in counts.items() if cnt >= need),
+            key=lambda pos: (needle not in self._names[pos], -counts[pos], pos),
+        )
+        return ranked
@@ -1,13 +1,259 @@
+import asyncio
+import email.utils
 import json
 import logging
+import random
 import re
+import time
 import urllib.parse
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any
 
 import httpx
 
+from core.rate_limiter import TokenBucket
+from data.models import BulkItemResult, NewIssue
+
 log = logging.getLogger(__name__)
 
+# Long-lived connection pools keyed by (jira_url, token). Reusing keep-alive
+# connections avoids a TCP + TLS handshake on every call, which dominates bulk runs.
+_sessions: dict[tuple[str, str], httpx.AsyncClient] = {}
+_pool_max_connections: int = 20
+_pool_http2: bool = False
+
+
+def _session(jira_url: str, token: str) -> httpx.AsyncClient:
+    """Return the pooled client for this Jira instance and token, creating it on first use."""
+    key = (jira_url.rstrip("/"), token)
+    client = _sessions.get(key)
+    if client is not None and not client.is_closed:
+        return client
+    limits = httpx.Limits(
+        max_connections=_pool_max_connections,
+        max_keepalive_connections=_pool_max_connections,
+        keepalive_expiry=60.0,
+    )
+    try:
+        client = httpx.AsyncClient(verify=False, limits=limits, http2=_pool_http2)
+    except ImportError:
+        # HTTP/2 needs the optional "h2" package (pip install httpx[http2])
+        log.warning("HTTP/2 requested but h2 is not installed — falling back to HTTP/1.1")
+        client = httpx.AsyncClient(verify=False, limits=limits)
+    _sessions[key] = client
+    log.debug("Opened Jira session for %s (max_connections=%d, http2=%s)",
+              key[0], _pool_max_connections, _pool_http2)
+    return client
+
+
+async def configure_jira_pool(max_connections: int = 20, http2: bool = False) -> None:
+    """Set pool limits and HTTP/2 opt-in; open sessions are closed if the config changed."""
+    global _pool_max_connections, _pool_http2
+    max_connections = max(1, max_connections)
+    if (max_connections, http2) == (_pool_max_connections, _pool_http2):
+        return
+    _pool_max_connections = max_connections
+    _pool_http2 = http2
+    await close_jira_sessions()
+
+
+async def close_jira_sessions() -> None:
+    """Close all pooled Jira connections. Call on application shutdown."""
+    clients = list(_sessions.values())
+    _sessions.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as exc:
+            log.debug("Error closing Jira session: %s", exc)
+    if clients:
+        log.debug("Closed %d Jira session(s)", len(clients))
+
+# Write rate limits per Jira instance: {normalized_url: TokenBucket}. All non-GET
+# requests pass through the bucket of their instance before being sent.
+DEFAULT_WRITE_RATE = 5.0     # requests per second; 0 disables limiting
+DEFAULT_WRITE_BURST = 10
+_write_limits: dict[str, tuple[float, int]] = {}
+_write_limiters: dict[str, TokenBucket] = {}
+
+
+def _instance_key(jira_url: str) -> str:
+    return jira_url.strip().rstrip("/").lower()
+
+
+def configure_jira_rate_limits(limits: dict[str, dict]) -> None:
+    """Set write limits per Jira URL: {url: {"rate": req_per_sec, "burst": n}}.
+
+    Instances not listed use DEFAULT_WRITE_RATE / DEFAULT_WRITE_BURST.
+    """
+    _write_limits.clear()
+    for url, cfg in limits.items():
+        _write_limits[_instance_key(url)] = (
+            float(cfg.get("rate", DEFAULT_WRITE_RATE)),
+            int(cfg.get("burst", DEFAULT_WRITE_BURST)),
+        )
+    for key, bucket in _write_limiters.items():
+        bucket.configure(*_write_limits.get(key, (DEFAULT_WRITE_RATE, DEFAULT_WRITE_BURST)))
+
+
+def _write_limiter(jira_url: str) -> TokenBucket:
+    key = _instance_key(jira_url)
+    bucket = _write_limiters.get(key)
+    if bucket is None:
+        bucket = TokenBucket(*_write_limits.get(key, (DEFAULT_WRITE_RATE, DEFAULT_WRITE_BURST)))
+        _write_limiters[key] = bucket
+    return bucket
+
+
+def get_write_queue_depth(jira_url: str) -> int:
+    """Number of Jira writes currently waiting for the rate limiter."""
+    bucket = _write_limiters.get(_instance_key(jira_url))
+    return bucket.queue_depth if bucket is not None else 0
+
+
+def estimate_write_eta(jira_url: str, pending: int) -> float:
+    """Seconds the rate limiter needs to let `pending` more writes through (0 if unlimited)."""
+    return _write_limiter(jira_url).eta(pending)
+
+
+# Retry policy for transient failures (rate limiting, gateway errors, timeouts).
+_RETRY_ATTEMPTS = 4          # total attempts including the first one
+_RETRY_BASE_DELAY = 0.5      # seconds; doubles per attempt, randomized (full jitter)
+_RETRY_MAX_DELAY = 30.0
+_RETRY_AFTER_MAX = 120.0     # upper bound for a server-provided Retry-After
+_RETRY_STATUSES = {429, 502, 503, 504}
+# Statuses that guarantee the server did not apply the request
+_REJECTED_STATUSES = {429, 503}
+
+# Called as listener(attempt, delay_seconds, reason) before every retry in the current task
+_retry_listener: ContextVar[Callable[[int, float, str], None] | None] = ContextVar(
+    "jira_retry_listener", default=None,
+)
+
+
+@contextmanager
+def on_jira_retry(listener: Callable[[int, float, str], None]) -> Iterator[None]:
+    """Report retries of Jira calls made by the current task to listener."""
+    reset_token = _retry_listener.set(listener)
+    try:
+        yield
+    finally:
+        _retry_listener.reset(reset_token)
+
+
+def _retry_after(resp: httpx.Response) -> float | None:
+    """Parse Retry-After (delta seconds or HTTP date) into seconds to wait."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int, resp: httpx.Response | None) -> float:
+    if resp is not None:
+        retry_after = _retry_after(resp)
+        if retry_after is not None:
+            return min(retry_after, _RETRY_AFTER_MAX)
+    return random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def _transport_error(exc: httpx.TransportError) -> ValueError:
+    if isinstance(exc, httpx.ConnectTimeout):
+        return ValueError("Сервер Jira недоступен: превышено время подключения")
+    if isinstance(exc, httpx.TimeoutException):
+        return ValueError("Сервер Jira не ответил вовремя (таймаут)")
+    if isinstance(exc, httpx.ConnectError):
+        return ValueError(f"Не удалось подключиться к Jira: {exc}")
+    return ValueError(f"Ошибка соединения с Jira: {exc}")
+
+
+async def _request(
+    jira_url: str,
+    token: str,
+    method: str,
+    url: str,
+    *,
+    timeout: float,
+    idempotent: bool = True,
+    dedupe: Callable[[], Awaitable[dict | None]] | None = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request through the pooled session, retrying transient failures.
+
+    Writes (non-GET) wait for the instance's rate limiter before every attempt.
+    Retries 429/502/503/504 and transport errors with exponential backoff and
+    jitter, honoring Retry-After. Non-idempotent requests (POST) are repeated
+    freely only when the server surely did not process them (connection not
+    established, 429, 503). After an ambiguous failure (read timeout, 502, 504)
+    they are repeated only if `dedupe` is given: it is called first and returns
+    the JSON body of the already created resource, or None if nothing was created.
+    Transport errors that survive all attempts become ValueError; error statuses
+    are returned to the caller as the last response.
+    """
+    first_attempt_at = time.time()
+    for attempt in range(1, _RETRY_ATTEMPTS + 1):
+        resp: httpx.Response | None = None
+        error: httpx.TransportError | None = None
+        if method != "GET":
+            await _write_limiter(jira_url).acquire()
+        try:
+            resp = await _session(jira_url, token).request(method, url, timeout=timeout, **kwargs)
+        except (httpx.ConnectTimeout, httpx.PoolTimeout, httpx.ConnectError) as exc:
+            error, ambiguous = exc, False  # never reached the server
+        except httpx.TransportError as exc:
+            error, ambiguous = exc, True
+        else:
+            if resp.status_code not in _RETRY_STATUSES:
+                return resp
+            ambiguous = resp.status_code not in _REJECTED_STATUSES
+
+        if resp is not None:
+            reason = str(resp.status_code)
+        elif isinstance(error, httpx.TimeoutException):
+            reason = "таймаут"
+        elif isinstance(error, httpx.ConnectError):
+            reason = "нет соединения"
+        else:
+            reason = type(error).__name__
+        give_up = attempt == _RETRY_ATTEMPTS or (ambiguous and not idempotent and dedupe is None)
+        if not give_up:
+            delay = _backoff_delay(attempt, resp)
+            log.warning(
+                "Jira %s %s failed (%s), retry %d/%d in %.1f s",
+                method, url, reason, attempt, _RETRY_ATTEMPTS - 1, delay,
+            )
+            listener = _retry_listener.get()
+            if listener is not None:
+                listener(attempt, delay, reason)
+            await asyncio.sleep(delay)
+            if ambiguous and not idempotent and dedupe is not None:
+                try:
+                    existing = await dedupe()
+                except Exception as exc:
+                    log.warning("Jira %s %s: duplicate check failed: %s", method, url, exc)
+                    give_up = True
+                else:
+                    if existing is not None:
+                        log.info(
+                            "Jira %s %s: request was applied despite %s (%.1f s ago)",
+                            method, url, reason, time.time() - first_attempt_at,
+                        )
+                        return httpx.Response(201, json=existing, request=httpx.Request(method, url))
+        if give_up:
+            if resp is not None:
+                return resp
+            raise _transport_error(error) from error
+    raise AssertionError("unreachable")
+
+
 # JQL field name → Jira REST API v2 field name
 _JQL_TO_API: dict[str, str] = {
     "affectedversion": "versions",
@@ -74,28 +320,150 @@ _SKIP_FIELD_IDS = {
 }
 
 
-async def get_project_meta(jira_url: str, token: str, project_key: str) -> dict:
+# Page size for the paginated createmeta endpoints and parallel issue-type requests
+_CREATEMETA_PAGE_SIZE = 100
+_CREATEMETA_CONCURRENCY = 6
+
+
+def _field_meta(fid: str, fmeta: dict) -> dict:
+    """Normalize one createmeta field description to {id, name, multi, allowed_values, insight}."""
+    schema = fmeta.get("schema", {})
+    raw_av = fmeta.get("allowedValues", [])
+    return {
+        "id": fid,
+        "name": fmeta.get("name", fid),
+        "multi": schema.get("type") == "array",
+        "allowed_values": [
+            {"id": str(av.get("id", "")), "name": av.get("name") or av.get("value") or str(av.get("id", ""))}
+            for av in raw_av
+            if av.get("id") is not None
+        ],
+        "insight": "insight" in schema.get("custom", "").lower(),
+    }
+
+
+def _merge_fields(fields_by_type: list[list[tuple[str, dict]]]) -> list[dict]:
+    """Collect unique fields across issue types, excluding handled ones; sorted by name."""
+    seen: set[str] = set()
+    fields: list[dict] = []
+    for type_fields in fields_by_type:
+        for fid, fmeta in type_fields:
+            if fid in seen or fid in _SKIP_FIELD_IDS or fid.startswith("__"):
+                continue
+            seen.add(fid)
+            fields.append(_field_meta(fid, fmeta))
+    fields.sort(key=lambda f: f["name"])
+    return fields
+
+
+async def _get_paged_values(jira_url: str, token: str, url: str) -> list[dict] | None:
+    """Read all pages of a Jira 'values' collection (startAt/maxResults/isLast).
+
+    Returns None on 404 so callers can fall back to an older endpoint.
+    """
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    values: list[dict] = []
+    start_at = 0
+    while True:
+        params = {"startAt": start_at, "maxResults": _CREATEMETA_PAGE_SIZE}
+        resp = await _request(
+            jira_url, token, "GET", url, params=params, headers=headers, timeout=60.0,
+        )
+        if resp.status_code == 404:
+            return None
+        if resp.status_code >= 400:
+            raise ValueError(f"Jira {resp.status_code}: {resp.text[:300]}")
+        data = resp.json()
+        page = data.get("values", [])
+        values.extend(page)
+        start_at += len(page)
+        total = data.get("total")
+        if data.get("isLast", True) or not page or (total is not None and start_at >= total):
+            return values
+
+
+async def get_project_issue_types(jira_url: str, token: str, project_key: str) -> list[dict] | None:
+    """List issue types of a project via the paginated createmeta endpoint.
+    Returns [{"id", "name"}], or None if the server lacks the endpoint (Jira < 8.4).
+    """
+    url = f"{jira_url.rstrip('/')}/rest/api/2/issue/createmeta/{project_key}/issuetypes"
+    values = await _get_paged_values(jira_url, token, url)
+    if values is None:
+        return None
+    return [{"id": str(t["id"]), "name": t["name"]} for t in values]
+
+
+async def get_issue_type_fields(
+    jira_url: str, token: str, project_key: str, issue_type_id: str,
+) -> list[tuple[str, dict]]:
+    """Fetch raw create-screen fields of one issue type. Returns [(field_id, field_meta)]."""
+    url = (
+        f"{jira_url.rstrip('/')}/rest/api/2/issue/createmeta/{project_key}"
+        f"/issuetypes/{issue_type_id}"
+    )
+    values = await _get_paged_values(jira_url, token, url)
+    if values is None:
+        raise ValueError(f"Тип задачи {issue_type_id} не найден в проекте '{project_key}'")
+    return [(f.get("fieldId") or f.get("key", ""), f) for f in values]
+
+
+async def get_project_meta(
+    jira_url: str,
+    token: str,
+    project_key: str,
+    issue_type_ids: list[str] | None = None,
+) -> dict:
     """Fetch issue types and available fields for a Jira project via createmeta.
+
+    Uses the paginated per-issue-type endpoints (Jira 8.4+), loading issue types
+    concurrently; falls back to the legacy expand=projects.issuetypes.fields call on
+    older servers. issue_type_ids limits field loading to those issue types only.
     Returns {
         "issue_types": [{"id", "name"}],
         "fields": [{"id", "name", "multi", "allowed_values": [{"id", "name"}]}]
     }.
     """
+    issue_types = await get_project_issue_types(jira_url, token, project_key)
+    if issue_types is None:
+        log.debug("Paginated createmeta unavailable, using legacy endpoint for %s", project_key)
+        return await _get_project_meta_legacy(jira_url, token, project_key, issue_type_ids)
+
+    wanted = [
+        t for t in issue_types
+        if issue_type_ids is None or t["id"] in issue_type_ids
+    ]
+    sem = asyncio.Semaphore(_CREATEMETA_CONCURRENCY)
+
+    async def _load(type_id: str) -> list[tuple[str, dict]]:
+        async with sem:
+            return await get_issue_type_fields(jira_url, token, project_key, type_id)
+
+    fields_by_type = await asyncio.gather(*(_load(t["id"]) for t in wanted))
+    fields = _merge_fields(list(fields_by_type))
+    insight_count = sum(1 for f in fields if f["insight"])
+    log.debug(
+        "Project %s: %d issue types (%d loaded), %d fields (%d insight)",
+        project_key, len(issue_types), len(wanted), len(fields), insight_count,
+    )
+    return {"issue_types": issue_types, "fields": fields}
+
+
+async def _get_project_meta_legacy(
+    jira_url: str,
+    token: str,
+    project_key: str,
+    issue_type_ids: list[str] | None = None,
+) -> dict:
+    """get_project_meta via the deprecated single-response createmeta expansion."""
     headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
     base = jira_url.rstrip("/")
     url = (
         f"{base}/rest/api/2/issue/createmeta"
         f"?projectKeys={project_key}&expand=projects.issuetypes.fields"
     )
-    try:
-        async with httpx.AsyncClient(verify=False, timeout=60.0) as client:
-            resp = await client.get(url, headers=headers)
-    except httpx.ConnectTimeout:
-        raise ValueError("Сервер Jira недоступен: превышено время подключения")
-    except httpx.TimeoutException:
-        raise ValueError("Сервер Jira не ответил вовремя (таймаут)")
-    except httpx.ConnectError as e:
-        raise ValueError(f"Не удалось подключиться к Jira: {e}")
+    if issue_type_ids:
+        url += f"&issuetypeIds={','.join(issue_type_ids)}"
+    resp = await _request(jira_url, token, "GET", url, headers=headers, timeout=60.0)
     if resp.status_code >= 400:
         raise ValueError(f"Jira {resp.status_code}: {resp.text}")
 
@@ -106,33 +474,10 @@ async def get_project_meta(jira_url: str, token: str, project_key: str) -> dict:
 
     project_data = projects[0]
     issue_types = [{"id": t["id"], "name": t["name"]} for t in project_data.get("issuetypes", [])]
-
-    # Collect unique fields across all issue types, excluding handled ones
-    seen: set[str] = set()
-    fields: list[dict] = []
-    for itype in project_data.get("issuetypes", []):
-        for fid, fmeta in itype.get("fields", {}).items():
-            if fid in seen or fid in _SKIP_FIELD_IDS or fid.startswith("__"):
-                continue
-            seen.add(fid)
-            schema = fmeta.get("schema", {})
-            multi = schema.get("type") == "array"
-            is_insight = "insight" in schema.get("custom", "").lower()
-            raw_av = fmeta.get("allowedValues", [])
-            allowed_values = [
-                {"id": str(av.get("id", "")), "name": av.get("name") or av.get("value") or str(av.get("id", ""))}
-                for av in raw_av
-                if av.get("id") is not None
-            ]
-            fields.append({
-                "id": fid,
-                "name": fmeta.get("name", fid),
-                "multi": multi,
-                "allowed_values": allowed_values,
-                "insight": is_insight,
-            })
-
-    fields.sort(key=lambda f: f["name"])
+    fields = _merge_fields([
+        list(itype.get("fields", {}).items())
+        for itype in project_data.get("issuetypes", [])
+    ])
     insight_count = sum(1 for f in fields if f["insight"])
     log.debug(
         "Project %s: %d issue types, %d fields (%d insight)",
@@ -141,9 +486,7 @@ async def get_project_meta(jira_url: str, token: str, project_key: str) -> dict:
     return {"issue_types": issue_types, "fields": fields}
 
 
-async def create_jira_issue(
-    jira_url: str,
-    token: str,
+def _issue_fields(
     project_key: str,
     summary: str,
     description: str,
@@ -152,10 +495,8 @@ async def create_jira_issue(
     labels: list[str] | None = None,
     extra_fields: dict | None = None,
     epic_name: str = "",
-) -> str:
-    """Create a Jira issue via REST API v2. Returns the issue key (e.g. 'PROJ-123')."""
-    url = f"{jira_url.rstrip('/')}/rest/api/2/issue"
-
+) -> dict:
+    """Build the "fields" object of an issue create payload."""
     # Prefer numeric ID (avoids locale-specific name rejection by Jira Server)
     issuetype_value = {"id": issue_type_id} if issue_type_id else {"name": issue_type}
 
@@ -173,8 +514,26 @@ async def create_jira_issue(
         for raw_k, raw_v in extra_fields.items():
             api_k, api_v = _normalize_field(raw_k, str(raw_v))
             fields[api_k] = api_v
+    return fields
 
-    payload = {"fields": fields}
+
+async def create_jira_issue(
+    jira_url: str,
+    token: str,
+    project_key: str,
+    summary: str,
+    description: str,
+    issue_type: str = "Story",
+    issue_type_id: str = "",
+    labels: list[str] | None = None,
+    extra_fields: dict | None = None,
+    epic_name: str = "",
+) -> str:
+    """Create a Jira issue via REST API v2. Returns the issue key (e.g. 'PROJ-123')."""
+    url = f"{jira_url.rstrip('/')}/rest/api/2/issue"
+    payload = {"fields": _issue_fields(
+        project_key, summary, description, issue_type, issue_type_id, labels, extra_fields, epic_name,
+    )}
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
@@ -182,15 +541,15 @@ async def create_jira_issue(
     }
 
     log.debug("Jira request payload: %s", payload)
-    try:
-        async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-            response = await client.post(url, json=payload, headers=headers)
-    except httpx.ConnectTimeout:
-        raise ValueError("Сервер Jira недоступен: превышено время подключения")
-    except httpx.TimeoutException:
-        raise ValueError("Сервер Jira не ответил вовремя (таймаут)")
-    except httpx.ConnectError as e:
-        raise ValueError(f"Не удалось подключиться к Jira: {e}")
+    started_at = time.time()
+
+    async def _find_created() -> dict | None:
+        return await _find_recent_issue(jira_url, token, project_key, summary, started_at)
+
+    response = await _request(
+        jira_url, token, "POST", url, json=payload, headers=headers, timeout=30.0,
+        idempotent=False, dedupe=_find_created,
+    )
 
     log.debug("Jira response status: %s", response.status_code)
     if response.status_code >= 400:
@@ -213,21 +572,161 @@ async def create_jira_issue(
     return key
 
 
+async def _find_recent_issue(
+    jira_url: str, token: str, project_key: str, summary: str, since: float,
+) -> dict | None:
+    """Find an issue with this summary created by the current user since `since` (epoch).
+
+    Used as the duplicate guard when a create request failed ambiguously (the
+    issue may have been created before the connection broke).
+    """
+    minutes = int((time.time() - since) // 60) + 2  # JQL relative dates have minute precision
+    jql = (
+        f'project = "{project_key}" AND reporter = currentUser() '
+        f'AND created >= "-{minutes}m" ORDER BY created DESC'
+    )
+    resp = await _request(
+        jira_url, token, "GET", f"{jira_url.rstrip('/')}/rest/api/2/search",
+        params={"jql": jql, "fields": "summary", "maxResults": 50},
+        headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+        timeout=30.0,
+    )
+    if resp.status_code >= 400:
+        raise ValueError(f"Jira {resp.status_code}: {resp.text[:200]}")
+    for issue in resp.json().get("issues", []):
+        if issue.get("fields", {}).get("summary") == summary:
+            return {"id": issue.get("id"), "key": issue["key"]}
+    return None
+
+
+# Issues per /issue/bulk request (Jira default: jira.bulk.create.max.issues.per.request = 50)
+_BULK_CREATE_BATCH = 50
+# Parallel single creates when the server does not support bulk creation
+_SINGLE_CREATE_CONCURRENCY = 4
+
+
+def _element_error(error: dict) -> str:
+    element = error.get("elementErrors", {})
+    parts = [*element.get("errorMessages", []), *(str(v) for v in element.get("errors", {}).values())]
+    return "; ".join(parts) or f"Jira {error.get('status', '')}".strip()
+
+
+async def _create_batch(
+    jira_url: str, token: str, issues: list[NewIssue],
+) -> list[BulkItemResult] | None:
+    """Create one batch via /rest/api/2/issue/bulk. Returns None if the server rejects bulk."""
+    url = f"{jira_url.rstrip('/')}/rest/api/2/issue/bulk"
+    payload = {"issueUpdates": [{"fields": _issue_fields(**vars(issue))} for issue in issues]}
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+    resp = await _request(
+        jira_url, token, "POST", url, json=payload, headers=headers, timeout=120.0, idempotent=False,
+    )
+    if resp.status_code in (404, 405, 501):
+        log.info("Bulk create is not supported by %s (%s)", jira_url, resp.status_code)
+        return None
+    if resp.status_code == 401:
+        raise ValueError("Jira: неверный токен (401 Unauthorized)")
+    try:
+        data = resp.json()
+    except ValueError:
+        data = {}
+    if resp.status_code >= 400 and not data.get("errors"):
+        raise ValueError(f"Jira {resp.status_code}: {resp.text[:300]}")
+
+    # "issues" lists the created issues in input order, skipping failed elements
+    failed = {int(e.get("failedElementNumber", -1)): _element_error(e) for e in data.get("errors", [])}
+    created = iter(data.get("issues", []))
+    results: list[BulkItemResult] = []
+    for i, issue in enumerate(issues):
+        if i in failed:
+            results.append(BulkItemResult(index=i, key="", ok=False, error=failed[i]))
+            continue
+        item = next(created, None)
+        if item is None:
+            results.append(BulkItemResult(index=i, key="", ok=False, error="Jira не вернула ключ задачи"))
+        else:
+            results.append(BulkItemResult(index=i, key=item["key"], ok=True))
+    return results
+
+
+async def _create_singly(
+    jira_url: str, token: str, issues: list[NewIssue], check_existing_since: float | None = None,
+) -> list[BulkItemResult]:
+    """Create issues one request each (bounded concurrency).
+
+    check_existing_since — after an ambiguous bulk failure, look for an issue with
+    the same summary created since that moment before creating a new one.
+    """
+    sem = asyncio.Semaphore(_SINGLE_CREATE_CONCURRENCY)
+
+    async def _one(i: int, issue: NewIssue) -> BulkItemResult:
+        async with sem:
+            try:
+                if check_existing_since is not None:
+                    existing = await _find_recent_issue(
+                        jira_url, token, issue.project_key, issue.summary, check_existing_since,
+                    )
+                    if existing is not None:
+                        return BulkItemResult(index=i, key=existing["key"], ok=True)
+                key = await create_jira_issue(jira_url, token, **vars(issue))
+                return BulkItemResult(index=i, key=key, ok=True)
+            except Exception as exc:
+                return BulkItemResult(index=i, key="", ok=False, error=str(exc))
+
+    return list(await asyncio.gather(*(_one(i, issue) for i, issue in enumerate(issues))))
+
+
+async def create_jira_issues(
+    jira_url: str,
+    token: str,
+    issues: list[NewIssue],
+    batch_size: int = _BULK_CREATE_BATCH,
+) -> list[BulkItemResult]:
+    """Create many issues with as few requests as possible.
+
+    Issues are packed into /rest/api/2/issue/bulk requests of up to batch_size.
+    Servers that reject the bulk endpoint get one create per issue instead; if a
+    batch fails ambiguously (timeout, 5xx) its issues are created one by one,
+    skipping those that turn out to have been created. Returns one BulkItemResult
+    per input, in input order: key is the created issue key, or error is set.
+    """
+    results: list[BulkItemResult] = []
+    bulk_supported = True
+    for start in range(0, len(issues), batch_size):
+        batch = issues[start:start + batch_size]
+        batch_results: list[BulkItemResult] | None = None
+        if bulk_supported:
+            started_at = time.time()
+            try:
+                batch_results = await _create_batch(jira_url, token, batch)
+            except ValueError as exc:
+                log.warning("Bulk create of %d issue(s) failed, creating one by one: %s", len(batch), exc)
+                batch_results = await _create_singly(jira_url, token, batch, check_existing_since=started_at)
+            if batch_results is None:
+                bulk_supported = False
+        if batch_results is None:
+            batch_results = await _create_singly(jira_url, token, batch)
+        for result in batch_results:
+            result.index += start
+        results.extend(batch_results)
+    log.info(
+        "Created %d of %d issue(s)%s", sum(1 for r in results if r.ok), len(issues),
+        "" if bulk_supported else " (without bulk endpoint)",
+    )
+    return results
+
+
 async def get_link_types(jira_url: str, token: str) -> list[dict]:
     """Fetch all issue link types available in the Jira instance.
     Returns [{"id", "name", "inward", "outward"}].
     """
     url = f"{jira_url.rstrip('/')}/rest/api/2/issueLinkType"
     headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
-    try:
-        async with httpx.AsyncClient(verify=False, timeout=15.0) as client:
-            resp = await client.get(url, headers=headers)
-    except httpx.ConnectTimeout:
-        raise ValueError("Сервер Jira недоступен: превышено время подключения")
-    except httpx.TimeoutException:
-        raise ValueError("Сервер Jira не ответил вовремя (таймаут)")
-    except httpx.ConnectError as e:
-        raise ValueError(f"Не удалось подключиться к Jira: {e}")
+    resp = await _request(jira_url, token, "GET", url, headers=headers, timeout=15.0)
     if resp.status_code == 401:
         raise ValueError("Jira: неверный токен (401 Unauthorized)")
     if resp.status_code == 403:
@@ -273,15 +772,16 @@ async def create_issue_link(
         "Accept": "application/json",
     }
     log.debug("Creating issue link: %s → %s (type %s)", outward_issue, inward_issue, link_type_id)
-    try:
-        async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-            resp = await client.post(url, json=payload, headers=headers)
-    except httpx.ConnectTimeout:
-        raise ValueError("Сервер Jira недоступен: превышено время подключения")
-    except httpx.TimeoutException:
-        raise ValueError("Сервер Jira не ответил вовремя (таймаут)")
-    except httpx.ConnectError as e:
-        raise ValueError(f"Не удалось подключиться к Jira: {e}")
+
+    async def _find_link() -> dict | None:
+        existing = await get_issue_links(jira_url, token, outward_issue)
+        triple = (str(link_type_id), outward_issue.upper(), inward_issue.upper())
+        return {} if triple in existing else None
+
+    resp = await _request(
+        jira_url, token, "POST", url, json=payload, headers=headers, timeout=30.0,
+        idempotent=False, dedupe=_find_link,
+    )
     if resp.status_code == 401:
         raise ValueError("Неверный токен (401)")
     if resp.status_code == 403:
@@ -298,6 +798,36 @@ async def create_issue_link(
     log.info("Issue link created: %s → %s (type_id=%s)", outward_issue, inward_issue, link_type_id)
 
 
+async def get_issue_links(jira_url: str, token: str, issue_key: str) -> set[tuple[str, str, str]]:
+    """Fetch existing links of an issue in one request.
+
+    Returns {(link_type_id, outward_issue_key, inward_issue_key)} using the same
+    orientation as the create_issue_link payload, so candidates can be checked directly.
+    """
+    url = f"{jira_url.rstrip('/')}/rest/api/2/issue/{issue_key}?fields=issuelinks"
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    resp = await _request(jira_url, token, "GET", url, headers=headers, timeout=30.0)
+    if resp.status_code == 401:
+        raise ValueError("Неверный токен (401)")
+    if resp.status_code == 403:
+        raise ValueError(f"Нет прав для просмотра задачи {issue_key} (403)")
+    if resp.status_code == 404:
+        raise ValueError(f"Задача {issue_key} не найдена (404)")
+    if resp.status_code >= 400:
+        raise ValueError(f"Jira {resp.status_code}: {resp.text[:200]}")
+
+    own_key = issue_key.upper()
+    result: set[tuple[str, str, str]] = set()
+    for link in resp.json().get("fields", {}).get("issuelinks", []):
+        type_id = str(link.get("type", {}).get("id", ""))
+        if "outwardIssue" in link:
+            result.add((type_id, link["outwardIssue"]["key"].upper(), own_key))
+        elif "inwardIssue" in link:
+            result.add((type_id, own_key, link["inwardIssue"]["key"].upper()))
+    log.debug("Issue %s has %d existing link(s)", issue_key, len(result))
+    return result
+
+
 async def update_jira_issue(
     jira_url: str,
     token: str,
@@ -331,15 +861,9 @@ async def update_jira_issue(
     }
 
     log.debug("Jira update %s payload: %s", issue_key, payload)
-    try:
-        async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-            resp = await client.put(url, json=payload, headers=headers)
-    except httpx.ConnectTimeout:
-        raise ValueError("Сервер Jira недоступен: превышено время подключения")
-    except httpx.TimeoutException:
-        raise ValueError("Сервер Jira не ответил вовремя (таймаут)")
-    except httpx.ConnectError as e:
-        raise ValueError(f"Не удалось подключиться к Jira: {e}")
+    resp = await _request(
+        jira_url, token, "PUT", url, json=payload, headers=headers, timeout=30.0,
+    )
 
     if resp.status_code == 204:
         log.info("Jira issue updated: %s", issue_key)
@@ -364,15 +888,79 @@ async def update_jira_issue(
         raise ValueError(detail or f"Jira {resp.status_code}")
 
 
-async def _get_insight_field_config(
+# Issue keys per "key in (...)" search and how many of those searches run in parallel
+_SEARCH_KEYS_CHUNK = 100
+_SEARCH_CONCURRENCY = 4
+_ISSUE_KEY_RE = re.compile(r"[A-Z][A-Z0-9_]*-\d+")
+
+
+async def _search_chunk(
+    jira_url: str, token: str, keys: list[str], fields: list[str],
+) -> list[dict]:
+    """Run one paged "key in (...)" search; unknown keys are ignored (validateQuery=warn)."""
+    url = f"{jira_url.rstrip('/')}/rest/api/2/search"
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    jql = f"key in ({', '.join(keys)})"
+    issues: list[dict] = []
+    while True:
+        params = {
+            "jql": jql,
+            "fields": ",".join(fields),
+            "startAt": len(issues),
+            "maxResults": len(keys),
+            "validateQuery": "warn",
+        }
+        resp = await _request(jira_url, token, "GET", url, params=params, headers=headers, timeout=60.0)
+        if resp.status_code == 401:
+            raise ValueError("Jira: неверный токен (401 Unauthorized)")
+        if resp.status_code >= 400:
+            raise ValueError(f"Jira {resp.status_code}: {resp.text[:300]}")
+        data = resp.json()
+        for warning in data.get("warningMessages", []):
+            log.debug("Jira search warning: %s", warning)
+        page = data.get("issues", [])
+        issues.extend(page)
+        if not page or len(issues) >= int(data.get("total", 0)):
+            return issues
+
+
+async def search_issues_by_keys(
+    jira_url: str,
+    token: str,
+    keys: list[str],
+    fields: list[str] | None = None,
+) -> dict[str, dict]:
+    """Resolve many issue keys with chunked "key in (...)" JQL searches.
+
+    fields — field IDs to return (default: project, issuetype, summary).
+    Returns {KEY: {"key", "id", "fields": {...}}} for issues that exist and are
+    visible to the token; malformed, unknown and inaccessible keys are absent.
+    """
+    wanted = list(dict.fromkeys(k.upper() for k in keys if _ISSUE_KEY_RE.fullmatch(k.upper())))
+    fields = fields or ["project", "issuetype", "summary"]
+    chunks = [wanted[i:i + _SEARCH_KEYS_CHUNK] for i in range(0, len(wanted), _SEARCH_KEYS_CHUNK)]
+    sem = asyncio.Semaphore(_SEARCH_CONCURRENCY)
+
+    async def _load(chunk: list[str]) -> list[dict]:
+        async with sem:
+            return await _search_chunk(jira_url, token, chunk, fields)
+
+    found: dict[str, dict] = {}
+    for issues in await asyncio.gather(*(_load(c) for c in chunks)):
+        for issue in issues:
+            found[issue["key"].upper()] = issue
+    log.debug("Search by keys: %d requested, %d found in %d request(s)", len(wanted), len(found), len(chunks))
+    return found
+
+
+async def get_insight_field_type_ids(
     jira_url: str, token: str, field_id: str
 ) -> list[int]:
     """Return objectTypeIds from Insight field config, or empty list on failure."""
     url = f"{jira_url.rstrip('/')}/rest/insight/1.0/config/field/{field_id}"
     headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
     try:
-        async with httpx.AsyncClient(verify=False, timeout=15.0) as client:
-            resp = await client.get(url, headers=headers)
+        resp = await _request(jira_url, token, "GET", url, headers=headers, timeout=15.0)
         log.debug("Insight field config %s: status=%s body=%s", field_id, resp.status_code, resp.text[:300])
         if resp.status_code == 200:
             data = resp.json()
@@ -384,21 +972,22 @@ async def _get_insight_field_config(
     return []
 
 
-async def get_insight_objects(
-    jira_url: str, token: str, field_name: str, field_id: str = "",
-    object_type_id: int | None = None,
-) -> list[dict]:
-    """Fetch Insight/Assets objects for a field.
+# Insight IQL pagination: objects per page and how many pages are fetched in parallel
+_INSIGHT_PAGE_SIZE = 500
+_INSIGHT_PAGE_CONCURRENCY = 4
+
+
+async def _build_insight_iql(
+    jira_url: str, token: str, field_name: str, field_id: str, object_type_id: int | None,
+    object_type_ids: list[int] | None = None,
+) -> tuple[str, str]:
+    """Return (iql, type_name) for an Insight field; type_name is a label for messages.
 
     Priority for IQL building:
     1. object_type_id (explicit, most precise): objectTypeId = {id}
-    2. field_id → config endpoint: objectTypeId = {id from config}
+    2. field_id → object_type_ids if already known, else config endpoint: objectTypeId = {id}
     3. Fallback: objectType = "{derived name}"
-    Returns [{"id": objectKey, "name": label, "schema_id": ...}].
     """
-    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
-    base = jira_url.rstrip("/")
-
     # Always derive type_name as fallback label for error messages
     type_name = re.sub(r"\s*\(.*?\)\s*$", "", field_name).strip()
 
@@ -407,7 +996,10 @@ async def get_insight_objects(
         iql = f"objectTypeId = {object_type_id}"
         log.debug("Insight IQL by explicit objectTypeId: %s", iql)
     elif field_id:
-        type_ids = await _get_insight_field_config(jira_url, token, field_id)
+        type_ids = (
+            object_type_ids if object_type_ids is not None
+            else await get_insight_field_type_ids(jira_url, token, field_id)
+        )
         if type_ids:
             cond = " OR ".join(f"objectTypeId = {tid}" for tid in type_ids)
             iql = f"({cond})" if len(type_ids) > 1 else f"objectTypeId = {type_ids[0]}"
@@ -417,29 +1009,27 @@ async def get_insight_objects(
             log.debug("Insight IQL fallback by name: %s", iql)
     else:
         iql = f'objectType = "{type_name}"'
+    return iql, type_name
 
+
+async def _get_insight_page(jira_url: str, token: str, iql: str, page: int, page_size: int) -> dict:
+    """Fetch one 1-based page of IQL results (raw JSON)."""
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
     url = (
-        f"{base}/rest/insight/1.0/iql/objects"
-        f"?iql={urllib.parse.quote(iql)}&maxResults=200&includeAttributes=false"
+        f"{jira_url.rstrip('/')}/rest/insight/1.0/iql/objects"
+        f"?iql={urllib.parse.quote(iql)}&page={page}&resultPerPage={page_size}"
+        "&includeAttributes=false"
     )
-
     log.debug("Insight IQL request: %s", url)
-    try:
-        async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-            resp = await client.get(url, headers=headers)
-    except httpx.ConnectTimeout:
-        raise ValueError("Сервер Jira недоступен: превышено время подключения")
-    except httpx.TimeoutException:
-        raise ValueError("Сервер Jira не ответил вовремя (таймаут)")
-    except httpx.ConnectError as e:
-        raise ValueError(f"Не удалось подключиться к Jira: {e}")
+    resp = await _request(jira_url, token, "GET", url, headers=headers, timeout=30.0)
 
     if resp.status_code >= 400:
         raise ValueError(f"Insight API {resp.status_code}: {resp.text[:300]}")
+    return resp.json()
 
-    raw = resp.json()
-    entries = raw.get("objectEntries", [])
-    result: list[dict] = [
+
+def _insight_entries_to_objects(entries: list[dict]) -> list[dict]:
+    return [
         {
             "id": obj.get("objectKey", ""),
             "name": obj.get("label", obj.get("objectKey", "")),
@@ -449,20 +1039,78 @@ async def get_insight_objects(
         if obj.get("objectKey")
     ]
 
+
+async def iter_insight_objects(
+    jira_url: str, token: str, field_name: str, field_id: str = "",
+    object_type_id: int | None = None,
+    object_type_ids: list[int] | None = None,
+    page_size: int = _INSIGHT_PAGE_SIZE,
+    concurrency: int = _INSIGHT_PAGE_CONCURRENCY,
+) -> AsyncIterator[list[dict]]:
+    """Stream Insight/Assets objects for a field page by page, in page order.
+
+    object_type_ids — objectTypeIds of the field config if already known (skips
+    that request). The first page is yielded as soon as it arrives; the remaining
+    pages are then fetched concurrently (bounded by `concurrency`). Each page is
+    [{"id": objectKey, "name": label, "schema_id": ...}].
+    """
+    iql, type_name = await _build_insight_iql(
+        jira_url, token, field_name, field_id, object_type_id, object_type_ids,
+    )
+
+    first = await _get_insight_page(jira_url, token, iql, 1, page_size)
+    total = first.get("totalFilterCount")
+    if total is not None:
+        page_count = max(1, -(-int(total) // page_size))
+    else:
+        page_count = int(first.get("pageSize") or 1)  # Insight reports the number of pages here
+    log.debug(
+        "Insight: type '%s' has %s object(s) in %d page(s)", type_name, total, page_count,
+    )
+    yield _insight_entries_to_objects(first.get("objectEntries", []))
+    if page_count <= 1:
+        return
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _fetch(page: int) -> list[dict]:
+        async with sem:
+            data = await _get_insight_page(jira_url, token, iql, page, page_size)
+        return _insight_entries_to_objects(data.get("objectEntries", []))
+
+    tasks = [asyncio.create_task(_fetch(p)) for p in range(2, page_count + 1)]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def get_insight_objects(
+    jira_url: str, token: str, field_name: str, field_id: str = "",
+    object_type_id: int | None = None,
+) -> list[dict]:
+    """Fetch all Insight/Assets objects for a field (all pages).
+
+    See iter_insight_objects for IQL building and paging.
+    Returns [{"id": objectKey, "name": label, "schema_id": ...}].
+    """
+    result: list[dict] = []
+    async for page in iter_insight_objects(
+        jira_url, token, field_name, field_id, object_type_id=object_type_id,
+    ):
+        result.extend(page)
+
     if not result:
+        type_name = re.sub(r"\s*\(.*?\)\s*$", "", field_name).strip()
         raise ValueError(
             f"Insight: объекты типа «{type_name}» не найдены.\n"
             "Возможно, имя типа объекта в Insight не совпадает с названием поля."
         )
 
-    log.debug("Insight: got %d objects for type '%s'", len(result), type_name)
-    # Log full detail to diagnose wrong-schema issues
-    for obj in entries[:50]:
-        obj_type = obj.get("objectType", {})
-        schema = obj_type.get("objectSchemaId", "?")
-        type_n = obj_type.get("name", "?")
-        log.debug(
-            "  Insight obj: key=%s label=%r schema=%s type=%s",
-            obj.get("objectKey"), obj.get("label"), schema, type_n,
-        )
+    log.debug("Insight: got %d objects for field '%s'", len(result), field_name)
+    for obj in result[:50]:
+        log.debug("  Insight obj: key=%s label=%r schema=%s", obj["id"], obj["name"], obj["schema_id"])
     return result
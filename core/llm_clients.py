@@ -0,0 +1,72 @@
+"""Long-lived LLM SDK clients, one per (provider, api_key).
+
+Each SDK client owns an HTTP connection pool, so reusing it across generations
+skips connection setup and the TLS handshake on every call after the first.
+A changed API key simply maps to a new client; clients for keys that are no
+longer configured are closed by release_stale_llm_clients(), and everything is
+closed on shutdown by close_llm_clients().
+"""
+import logging
+from typing import Any
+
+import anthropic
+from google import genai
+
+from data.models import Settings
+
+log = logging.getLogger(__name__)
+
+_clients: dict[tuple[str, str], Any] = {}
+
+
+class LLMUnavailableError(ValueError):
+    """The provider is temporarily unavailable: rate limit, 5xx, timeout or network error."""
+
+
+def get_anthropic_client(api_key: str) -> anthropic.AsyncAnthropic:
+    client = _clients.get(("anthropic", api_key))
+    if client is None:
+        log.debug("Creating Anthropic client")
+        client = anthropic.AsyncAnthropic(api_key=api_key)
+        _clients[("anthropic", api_key)] = client
+    return client
+
+
+def get_gemini_client(api_key: str) -> genai.Client:
+    client = _clients.get(("gemini", api_key))
+    if client is None:
+        log.debug("Creating Gemini client")
+        client = genai.Client(api_key=api_key)
+        _clients[("gemini", api_key)] = client
+    return client
+
+
+async def _close(provider: str, client: Any) -> None:
+    try:
+        if provider == "anthropic":
+            await client.close()
+        else:
+            # Older google-genai releases have no async close; their pools die with the process
+            aclose = getattr(client.aio, "aclose", None)
+            if aclose is not None:
+                await aclose()
+    except Exception as exc:
+        log.warning("Closing %s client failed: %s", provider, exc)
+
+
+async def release_stale_llm_clients(settings: Settings) -> None:
+    """Close clients whose API key is no longer the configured one (e.g. after a key change)."""
+    current = {
+        ("anthropic", settings.anthropic_api_key),
+        ("gemini", settings.gemini_api_key),
+    }
+    for key in [k for k in _clients if k not in current]:
+        log.debug("Closing stale %s client", key[0])
+        await _close(key[0], _clients.pop(key))
+
+
+async def close_llm_clients() -> None:
+    """Close every cached client; call once on application exit."""
+    while _clients:
+        (provider, _), client = _clients.popitem()
+        await _close(provider, client)
@@ -0,0 +1,160 @@
+"""Stale-while-revalidate cache for Jira project metadata (createmeta).
+
+Fresh entries are served from disk without a request. Stale entries are served
+immediately as well, while a single background refresh per project updates the
+cache and notifies the caller through on_refresh.
+
+A caller that needs only some issue types (e.g. the team's default one) passes
+issue_type_ids; only their createmeta is loaded, into a separate cache entry.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+from core.jira_client import get_project_meta
+from data import meta_cache_store
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 3600.0  # seconds
+
+# In-flight fetches keyed by (jira_url, project_key, issue_type_ids) — concurrent callers share one request
+_inflight: dict[tuple[str, str, tuple[str, ...]], asyncio.Task] = {}
+# Strong refs to fire-and-forget refreshes so they are not garbage-collected mid-flight
+_background: set[asyncio.Task] = set()
+# Parsed cache files with the mtime they were read at, so screens that peek at the
+# cache while building controls do not re-parse a multi-megabyte file every time
+_parsed: dict[tuple[str, str, tuple[str, ...]], tuple[float, tuple[dict, float]]] = {}
+
+
+def _key(
+    jira_url: str, project_key: str, issue_type_ids: list[str] | None = None
+) -> tuple[str, str, tuple[str, ...]]:
+    return jira_url.rstrip("/").lower(), project_key.upper(), tuple(sorted(issue_type_ids or ()))
+
+
+def peek_project_meta(
+    jira_url: str, project_key: str, issue_type_ids: list[str] | None = None
+) -> dict | None:
+    """Return cached metadata regardless of age, without any network access."""
+    cached = _load(jira_url, project_key, issue_type_ids)
+    return cached[0] if cached else None
+
+
+def _load(
+    jira_url: str, project_key: str, issue_type_ids: list[str] | None = None
+) -> tuple[dict, float] | None:
+    """(meta, fetched_at) of a cache entry; the file is parsed again only after it changes."""
+    key = _key(jira_url, project_key, issue_type_ids)
+    mtime = meta_cache_store.project_meta_mtime(jira_url, project_key, issue_type_ids)
+    if mtime is None:
+        _parsed.pop(key, None)
+        return None
+    hit = _parsed.get(key)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    cached = meta_cache_store.load_project_meta(jira_url, project_key, issue_type_ids)
+    if cached is not None:
+        _parsed[key] = (mtime, cached)
+    return cached
+
+
+def _save(jira_url: str, project_key: str, meta: dict, issue_type_ids: list[str] | None) -> None:
+    meta_cache_store.save_project_meta(jira_url, project_key, meta, issue_type_ids)
+    mtime = meta_cache_store.project_meta_mtime(jira_url, project_key, issue_type_ids)
+    if mtime is not None:
+        _parsed[_key(jira_url, project_key, issue_type_ids)] = (mtime, (meta, time.time()))
+
+
+async def _fetch_and_store(
+    jira_url: str, token: str, project_key: str, issue_type_ids: list[str] | None = None
+) -> dict:
+    key = _key(jira_url, project_key, issue_type_ids)
+    task = _inflight.get(key)
+    if task is None:
+        async def _run() -> dict:
+            try:
+                meta = await get_project_meta(jira_url, token, project_key, issue_type_ids)
+                await asyncio.to_thread(_save, jira_url, project_key, meta, issue_type_ids)
+                return meta
+            finally:
+                _inflight.pop(key, None)
+
+        task = asyncio.create_task(_run())
+        _inflight[key] = task
+    return await asyncio.shield(task)
+
+
+async def get_project_meta_cached(
+    jira_url: str,
+    token: str,
+    project_key: str,
+    on_refresh: Callable[[dict], None] | None = None,
+    force: bool = False,
+    ttl: float = DEFAULT_TTL,
+    issue_type_ids: list[str] | None = None,
+) -> dict:
+    """Return project metadata, preferring the on-disk cache.
+
+    force=True bypasses the cache and refetches. A stale entry is returned as-is and
+    refreshed in the background; on_refresh(meta) is called when the new data lands.
+    issue_type_ids limits the fields to those issue types (see get_project_meta).
+    A forced reload of the whole project first invalidates all of its entries,
+    so per-issue-type ones are refetched too.
+    """
+    if force and issue_type_ids is None:
+        await asyncio.to_thread(invalidate_project_meta, jira_url, project_key)
+    if not force:
+        cached = await asyncio.to_thread(_load, jira_url, project_key, issue_type_ids)
+        if cached is not None:
+            meta, fetched_at = cached
+            age = time.time() - fetched_at
+            if age >= ttl:
+                log.debug("meta cache: %s is stale (%.0f s), refreshing in background", project_key, age)
+                task = asyncio.create_task(
+                    _background_refresh(jira_url, token, project_key, on_refresh, issue_type_ids)
+                )
+                _background.add(task)
+                task.add_done_callback(_background.discard)
+            else:
+                log.debug("meta cache: hit for %s (%.0f s old)", project_key, age)
+            return meta
+    return await _fetch_and_store(jira_url, token, project_key, issue_type_ids)
+
+
+async def _background_refresh(
+    jira_url: str,
+    token: str,
+    project_key: str,
+    on_refresh: Callable[[dict], None] | None,
+    issue_type_ids: list[str] | None = None,
+) -> None:
+    try:
+        meta = await _fetch_and_store(jira_url, token, project_key, issue_type_ids)
+    except Exception as exc:
+        log.warning("meta cache: background refresh of %s failed: %s", project_key, exc)
+        return
+    if on_refresh is not None:
+        try:
+            on_refresh(meta)
+        except Exception:
+            log.exception("meta cache: on_refresh callback failed for %s", project_key)
+
+
+def invalidate_project_meta(jira_url: str, project_key: str) -> int:
+    """Drop cached metadata of one project, for all issue type sets. Returns the number of removed entries."""
+    url, project, _ = _key(jira_url, project_key)
+    for key in [k for k in list(_parsed) if k[:2] == (url, project)]:
+        _parsed.pop(key, None)
+    removed = meta_cache_store.delete_project_meta(jira_url, project_key)
+    log.info("meta cache: invalidated %s (%d entries)", project_key, removed)
+    return removed
+
+
+def clear_project_meta_cache() -> int:
+    """Drop cached metadata for all projects. Returns the number of removed entries."""
+    _parsed.clear()
+    removed = meta_cache_store.clear_meta_cache()
+    log.info("meta cache: cleared %d entries", removed)
+    return removed
@@ -1,5 +1,5 @@
+from core.glossary_index import get_glossary_index
 from data.models import Team
-from data.terms_store import load_terms
 
 _SYSTEM_PROMPT_TEMPLATE = """\
 Ты — эксперт по составлению задач в Jira. Твоя задача — помочь оформить задачу для команды "{team_name}" строго по их правилам.
@@ -53,10 +53,44 @@ _SYSTEM_PROMPT_TEMPLATE = """\
 Отвечай на русском языке. Не добавляй никакого текста вне JSON-объекта.\
 """
 
+_DECOMPOSE_INSTRUCTIONS = """
+
+## РЕЖИМ ДЕКОМПОЗИЦИИ
+Разбей запрос на один Epic и дочерние истории (от 2 до {max_stories}), каждая история — отдельная законченная часть работы.
+Каждую историю оформи по правилам команды, как обычную задачу. Вопросов не задавай: для недостающих данных используй значение «Нет данных».
+Верни ТОЛЬКО валидный JSON строго в таком формате (он заменяет формат из системных инструкций):
+{{
+  "status": "ready",
+  "epic": {{
+    "task_title": "Название эпика",
+    "task_text": "Описание эпика в формате Jira wiki markup",
+    "epic_name": "Три слова"
+  }},
+  "stories": [
+    {{
+      "task_title": "Название истории",
+      "task_text": "Описание истории в формате Jira wiki markup",
+      "labels": []
+    }}
+  ]
+}}\
+"""
+
+# Upper bound on stories requested in decomposition mode
+MAX_DECOMPOSE_STORIES = 15
+
+# Most glossary terms added to one request
+GLOSSARY_MAX_TERMS = 50
 
 def build_system_prompt(team: Team) -> str:
-    """Assemble the system prompt from team rules."""
-    prompt = _SYSTEM_PROMPT_TEMPLATE.format(
+    """Assemble the system prompt from team rules.
+
+    The result depends only on the team and must stay byte-identical between
+    requests (Anthropic caches it as a prefix); anything request-specific,
+    including the glossary terms, belongs in the user message. Formatting is
+    deterministic, so no memo is needed for that.
+    """
+    return _SYSTEM_PROMPT_TEMPLATE.format(
         team_name=team.name,
         context=team.context or "(не указан)",
         rules=team.rules or "(правила не заданы)",
@@ -64,24 +98,39 @@ def build_system_prompt(team: Team) -> str:
         jira_project=team.jira_project,
         default_task_type=team.default_task_type,
     )
-    if team.use_glossary:
-        terms = load_terms()
-        if terms:
-            lines = "\n".join(f"- {t.name}: {t.description}" for t in terms)
-            prompt += (
-                "\n\n## Термины и сокращения компании:\n"
-                + lines
-                + "\n\nИспользуй эти термины и сокращения при составлении задачи."
-            )
-    return prompt
+
+
+def build_glossary_section(
+    user_input: str,
+    answers: list[tuple[str, str]] | None = None,
+    limit: int | None = GLOSSARY_MAX_TERMS,
+) -> str:
+    """Glossary terms mentioned in the request or the answers, "" if none are.
+
+    Only matching terms are sent, so the prompt does not grow with terms.json.
+    """
+    text = "\n".join([user_input, *(f"{q}\n{a}" for q, a in answers or [])])
+    terms = get_glossary_index().find(text, limit=limit)
+    if not terms:
+        return ""
+    lines = "\n".join(f"- {t.name}: {t.description}" for t in terms)
+    return (
+        "\n\n## Термины и сокращения компании, упомянутые в запросе:\n"
+        + lines
+        + "\n\nИспользуй эти термины и сокращения при составлении задачи."
+    )
 
 
 def build_user_message(
     user_input: str,
     answers: list[tuple[str, str]] | None = None,
     force_complete: bool = False,
+    use_glossary: bool = False,
 ) -> str:
-    """Build the user message, optionally appending Q&A from clarification round."""
+    """Build the user message, optionally appending Q&A from clarification round.
+
+    With use_glossary, the glossary terms mentioned in the request are appended.
+    """
     message = f"Запрос на создание задачи:\n{user_input}"
 
     if answers:
@@ -89,6 +138,9 @@ def build_user_message(
         for question, answer in answers:
             message += f"\nВопрос: {question}\nОтвет: {answer}\n"
 
+    if use_glossary:
+        message += build_glossary_section(user_input, answers)
+
     if force_complete:
         message += (
             "\n\n## ВАЖНО: Пользователь пропустил уточнение.\n"
@@ -97,3 +149,14 @@ def build_user_message(
         )
 
     return message
+
+
+def build_decompose_message(
+    user_input: str,
+    answers: list[tuple[str, str]] | None = None,
+    max_stories: int = MAX_DECOMPOSE_STORIES,
+    use_glossary: bool = False,
+) -> str:
+    """Build the user message asking for an epic plus child stories in one response."""
+    message = build_user_message(user_input, answers, use_glossary=use_glossary)
+    return message + _DECOMPOSE_INSTRUCTIONS.format(max_stories=max_stories)
@@ -0,0 +1,61 @@
+"""Token-bucket rate limiter for outgoing requests.
+
+Waiters are served in arrival order: asyncio.Lock wakes them FIFO, and only the
+head of the queue sleeps until the next token is available.
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average with bursts up to `burst`.
+
+    rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting for a token."""
+        return self._waiting
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Change limits in place; current waiters continue with the new rate."""
+        self._refill()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = min(self._tokens, float(self.burst))
+
+    def eta(self, pending: int) -> float:
+        """Seconds until `pending` more acquisitions (plus the queued ones) are served."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return max(0.0, (pending + self._waiting - self._tokens) / self.rate)
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        self._waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self._waiting -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate > 0:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
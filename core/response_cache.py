@@ -0,0 +1,83 @@
+"""Exact-match cache of LLM responses.
+
+Entries are keyed by a hash of (provider, model, system prompt, user message),
+so re-running the same input (Back/Forward, cloned drafts, retries) returns the
+previous raw response without a request. Entries expire after DEFAULT_TTL and
+only the MAX_ENTRIES most recently used are kept. The cache is persisted in
+response_cache.json, so it survives restarts.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from data import response_cache_store
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 3600.0  # seconds
+MAX_ENTRIES = 200
+
+# key → {"raw", "stored_at"}, least recently used first; loaded on first use
+_entries: OrderedDict[str, dict] | None = None
+_save_lock = asyncio.Lock()
+
+
+def response_cache_key(provider: str, model: str, system_prompt: str, user_message: str) -> str:
+    raw = json.dumps([provider, model, system_prompt, user_message], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _load() -> OrderedDict[str, dict]:
+    global _entries
+    if _entries is None:
+        # Under the save lock, so concurrent first calls share one load and a
+        # clear cannot interleave with it
+        async with _save_lock:
+            if _entries is None:
+                _entries = OrderedDict(await asyncio.to_thread(response_cache_store.load_response_cache))
+            return _entries
+    return _entries
+
+
+async def get_cached_response(key: str, ttl: float = DEFAULT_TTL) -> str | None:
+    """Return the cached raw response for key, or None if there is no fresh one."""
+    entries = await _load()
+    entry = entries.get(key)
+    if entry is None:
+        return None
+    if time.time() - entry["stored_at"] >= ttl:
+        del entries[key]
+        return None
+    entries.move_to_end(key)
+    log.debug("response cache: hit %s", key[:12])
+    return entry["raw"]
+
+
+async def store_response(key: str, raw: str) -> None:
+    """Cache a raw response, evicting the least recently used entries beyond MAX_ENTRIES."""
+    entries = await _load()
+    entries[key] = {"raw": raw, "stored_at": time.time()}
+    entries.move_to_end(key)
+    while len(entries) > MAX_ENTRIES:
+        entries.popitem(last=False)
+    async with _save_lock:
+        if entries is not _entries:
+            return  # cleared while waiting for the lock
+        await asyncio.to_thread(response_cache_store.save_response_cache, dict(entries))
+
+
+async def clear_response_cache() -> int:
+    """Drop all cached responses. Returns the number of removed entries.
+
+    Holds the save lock, so a save in progress cannot write the old entries
+    back after the file is removed.
+    """
+    global _entries
+    async with _save_lock:
+        _entries = None
+        removed = await asyncio.to_thread(response_cache_store.clear_response_cache)
+    log.info("response cache: cleared %d entries", removed)
+    return removed
@@ -2,11 +2,63 @@ import json
 import re
 
 from core.jira_markup import markdown_to_jira
-from data.models import AIResponse
+from data.models import AIResponse, Decomposition
 
 
-def parse_ai_response(raw_text: str) -> AIResponse:
-    """Parse raw AI response text into a structured AIResponse."""
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# Shape of a generation response, for providers' native structured output.
+# One object covers both variants: "status" tells which of the other fields are set.
+# Only keywords both Anthropic (JSON Schema) and Gemini (OpenAPI subset) accept are used.
+AI_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "status": {"type": "string", "enum": ["ready", "need_clarification"]},
+        "task_title": {"type": "string", "description": "Краткое название задачи (для status=ready)"},
+        "task_text": {"type": "string", "description": "Описание задачи в Jira wiki markup (для status=ready)"},
+        "epic_name": {"type": "string", "description": "Название эпика до 3 слов (только для типа Epic)"},
+        "jira_params": {
+            "type": "object",
+            "properties": {
+                "project": {"type": "string"},
+                "type": {"type": "string"},
+                "labels": _STRING_LIST,
+            },
+        },
+        "questions": {**_STRING_LIST, "description": "Уточняющие вопросы (для status=need_clarification)"},
+    },
+    "required": ["status"],
+}
+
+_ISSUE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "task_title": {"type": "string"},
+        "task_text": {"type": "string", "description": "Описание в Jira wiki markup"},
+        "epic_name": {"type": "string", "description": "Название эпика до 3 слов (только для эпика)"},
+        "labels": _STRING_LIST,
+    },
+    "required": ["task_title", "task_text"],
+}
+
+# Shape of a decomposition-mode response (epic plus child stories)
+DECOMPOSITION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "status": {"type": "string", "enum": ["ready"]},
+        "epic": _ISSUE_SCHEMA,
+        "stories": {"type": "array", "items": _ISSUE_SCHEMA},
+    },
+    "required": ["epic", "stories"],
+}
+
+
+def _extract_json(raw_text: str) -> dict | None:
+    """Return the JSON object in an AI response, tolerating code fences and surrounding text.
+
+    Responses requested with a schema are plain JSON; the recovery steps are
+    kept for cached responses and providers answering in free text.
+    """
     text = raw_text.strip()
 
     # Strip markdown code fences if present
@@ -18,7 +70,8 @@ def parse_ai_response(raw_text: str) -> AIResponse:
     # Attempt 1: parse the whole text as JSON
     try:
         data = json.loads(text)
-        return _build_response(data)
+        if isinstance(data, dict):
+            return data
     except json.JSONDecodeError:
         pass
 
@@ -27,9 +80,23 @@ def parse_ai_response(raw_text: str) -> AIResponse:
     if json_match:
         try:
             data = json.loads(json_match.group())
-            return _build_response(data)
+            if isinstance(data, dict):
+                return data
         except json.JSONDecodeError:
             pass
+    return None
+
+
+def is_structured_response(raw_text: str) -> bool:
+    """Whether the response contains a JSON object (rather than falling back to plain text)."""
+    return _extract_json(raw_text) is not None
+
+
+def parse_ai_response(raw_text: str) -> AIResponse:
+    """Parse raw AI response text into a structured AIResponse."""
+    data = _extract_json(raw_text)
+    if data is not None:
+        return _build_response(data)
 
     # Fallback: treat entire response as task text
     return AIResponse(
@@ -40,6 +107,39 @@ def parse_ai_response(raw_text: str) -> AIResponse:
     )
 
 
+def parse_decomposition(raw_text: str) -> Decomposition:
+    """Parse a decomposition-mode response ({"epic": {...}, "stories": [...]}).
+
+    Raises ValueError if the response has no epic or no stories.
+    """
+    data = _extract_json(raw_text)
+    if data is None or not isinstance(data.get("epic"), dict):
+        raise ValueError("ИИ не вернул декомпозицию задачи. Попробуйте ещё раз.")
+    stories = [s for s in data.get("stories") or [] if isinstance(s, dict)]
+    if not stories:
+        raise ValueError("ИИ не предложил ни одной истории для эпика. Попробуйте ещё раз.")
+
+    epic = data["epic"]
+    return Decomposition(
+        epic=AIResponse(
+            status="ready",
+            task_title=epic.get("task_title", ""),
+            task_text=markdown_to_jira(epic.get("task_text", "")),
+            epic_name=epic.get("epic_name", ""),
+            jira_params={"labels": list(epic.get("labels") or [])},
+        ),
+        stories=[
+            AIResponse(
+                status="ready",
+                task_title=story.get("task_title", ""),
+                task_text=markdown_to_jira(story.get("task_text", "")),
+                jira_params={"labels": list(story.get("labels") or [])},
+            )
+            for story in stories
+        ],
+    )
+
+
 def _build_response(data: dict) -> AIResponse:
     status = data.get("status", "")
 
@@ -65,3 +165,87 @@ def _build_response(data: dict) -> AIResponse:
         task_text=data.get("task_text", str(data)),
         jira_params=data.get("jira_params", {}),
     )
+
+
+_JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class _StringField:
+    """Decoding state of one JSON string value that may still be arriving."""
+
+    def __init__(self, start: int) -> None:
+        self.pos = start                # next undecoded character in the buffer
+        self.chars: list[str] = []
+        self.done = False
+
+    def advance(self, buf: str) -> None:
+        """Decode as much of the value as the buffer holds; stop before incomplete escapes."""
+        pos, n = self.pos, len(buf)
+        while pos < n:
+            ch = buf[pos]
+            if ch == '"':
+                self.done = True
+                pos += 1
+                break
+            if ch != "\\":
+                self.chars.append(ch)
+                pos += 1
+                continue
+            if pos + 1 >= n:
+                break
+            esc = buf[pos + 1]
+            if esc == "u":
+                if pos + 6 > n:
+                    break
+                try:
+                    self.chars.append(chr(int(buf[pos + 2:pos + 6], 16)))
+                except ValueError:
+                    self.chars.append(buf[pos:pos + 6])
+                pos += 6
+            else:
+                self.chars.append(_JSON_ESCAPES.get(esc, esc))
+                pos += 2
+        self.pos = pos
+
+    @property
+    def value(self) -> str:
+        # \uXXXX escapes of non-BMP characters arrive as surrogate pairs
+        return "".join(self.chars).encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+class StreamingResponseParser:
+    """Extract top-level string fields from a JSON response while it is being streamed.
+
+    feed() takes the next chunk of model output and returns the fields known so far
+    ({"status", "task_title", "task_text", "epic_name"}); a value that is still
+    arriving is returned as the prefix received. Decoding resumes where the previous
+    chunk stopped instead of re-parsing the whole buffer. The complete text must
+    still go through parse_ai_response(): this parser is for progressive display only.
+    """
+
+    FIELDS = ("status", "task_title", "task_text", "epic_name")
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._fields: dict[str, _StringField] = {}
+        self._patterns = {name: re.compile(rf'"{name}"\s*:\s*"') for name in self.FIELDS}
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buf
+
+    def feed(self, chunk: str) -> dict[str, str]:
+        # Look back a little so a key split across chunks is still found
+        scan_from = max(0, len(self._buf) - 32)
+        self._buf += chunk
+        for name, pattern in self._patterns.items():
+            field = self._fields.get(name)
+            if field is None:
+                m = pattern.search(self._buf, scan_from)
+                if m is None:
+                    continue
+                field = self._fields[name] = _StringField(m.end())
+            if not field.done:
+                field.advance(self._buf)
+        return {name: field.value for name, field in self._fields.items()}
@@ -3,9 +3,9 @@ import json
 import re
 from pathlib import Path
 
-from google import genai
 from google.genai import types
 
+from core.llm_clients import get_gemini_client
 from data.models import Team, VoiceResult
 
 _PROMPT_TEMPLATE = """\
@@ -37,7 +37,7 @@ async def process_voice(
 
     audio_bytes = audio_path.read_bytes()
 
-    client = genai.Client(api_key=gemini_api_key)
+    client = get_gemini_client(gemini_api_key)
     response = await client.aio.models.generate_content(
         model="gemini-2.5-flash",
         contents=[
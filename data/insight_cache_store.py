@@ -0,0 +1,73 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+def _cache_dir() -> Path:
+    appdata = os.environ.get("APPDATA")
+    base = Path(appdata) if appdata else Path.home() / "AppData" / "Roaming"
+    directory = base / "Lyudochka" / "insight_cache"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _cache_path(jira_url: str, field_id: str, field_name: str, object_type_id: int | None) -> Path:
+    type_part = "" if object_type_id is None else str(object_type_id)
+    # Fields resolved by name (no ID) must not share one entry
+    field_part = field_id or f"name:{field_name.strip().lower()}"
+    raw = f"{jira_url.rstrip('/').lower()}|{field_part}|{type_part}"
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return _cache_dir() / f"{field_id or 'field'}_{type_part or 'cfg'}_{digest}.json"
+
+
+def load_insight_objects(
+    jira_url: str, field_id: str, field_name: str, object_type_id: int | None,
+) -> tuple[list[dict], list[int] | None, float] | None:
+    """Return (objects, resolved_object_type_ids, fetched_at_epoch), or None if not cached."""
+    path = _cache_path(jira_url, field_id, field_name, object_type_id)
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data["objects"], data.get("object_type_ids"), float(data["fetched_at"])
+    except Exception as exc:
+        log.warning("insight cache: unreadable %s: %s", path.name, exc)
+        return None
+
+
+def save_insight_objects(
+    jira_url: str,
+    field_id: str,
+    field_name: str,
+    object_type_id: int | None,
+    objects: list[dict],
+    object_type_ids: list[int] | None = None,
+) -> None:
+    path = _cache_path(jira_url, field_id, field_name, object_type_id)
+    data = {
+        "jira_url": jira_url.rstrip("/"),
+        "field_id": field_id,
+        "field_name": field_name,
+        "object_type_id": object_type_id,
+        "object_type_ids": object_type_ids,
+        "fetched_at": time.time(),
+        "objects": objects,
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def clear_insight_cache() -> int:
+    """Delete all cached Insight objects. Returns the number of removed entries."""
+    removed = 0
+    for path in _cache_dir().glob("*.json"):
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+def _cache_dir() -> Path:
+    appdata = os.environ.get("APPDATA")
+    base = Path(appdata) if appdata else Path.home() / "AppData" / "Roaming"
+    directory = base / "Lyudochka" / "meta_cache"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _cache_path(jira_url: str, project_key: str, issue_type_ids: list[str] | None = None) -> Path:
+    raw = f"{jira_url.rstrip('/').lower()}|{project_key.upper()}"
+    if issue_type_ids:
+        raw += "|" + ",".join(sorted(issue_type_ids))
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return _cache_dir() / f"{project_key.upper()}_{digest}.json"
+
+
+def project_meta_mtime(
+    jira_url: str, project_key: str, issue_type_ids: list[str] | None = None
+) -> float | None:
+    """Modification time of a cache entry, or None if it does not exist."""
+    try:
+        return _cache_path(jira_url, project_key, issue_type_ids).stat().st_mtime
+    except OSError:
+        return None
+
+
+def load_project_meta(
+    jira_url: str, project_key: str, issue_type_ids: list[str] | None = None
+) -> tuple[dict, float] | None:
+    """Return (meta, fetched_at_epoch) for a cached project, or None if not cached.
+
+    issue_type_ids selects the entry holding the fields of those issue types
+    only; None is the entry for the whole project.
+    """
+    path = _cache_path(jira_url, project_key, issue_type_ids)
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data["meta"], float(data["fetched_at"])
+    except Exception as exc:
+        log.warning("meta cache: unreadable %s: %s", path.name, exc)
+        return None
+
+
+def save_project_meta(
+    jira_url: str, project_key: str, meta: dict, issue_type_ids: list[str] | None = None
+) -> None:
+    path = _cache_path(jira_url, project_key, issue_type_ids)
+    data = {
+        "jira_url": jira_url.rstrip("/"),
+        "project_key": project_key.upper(),
+        "issue_type_ids": sorted(issue_type_ids) if issue_type_ids else None,
+        "fetched_at": time.time(),
+        "meta": meta,
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def delete_project_meta(jira_url: str, project_key: str) -> int:
+    """Delete every cached entry of one project (all issue type sets). Returns the number removed."""
+    url = jira_url.rstrip("/").lower()
+    removed = 0
+    for path in _cache_dir().glob(f"{project_key.upper()}_*.json"):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+        if str(data.get("jira_url", "")).lower() != url:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def clear_meta_cache() -> int:
+    """Delete all cached project metadata. Returns the number of removed entries."""
+    removed = 0
+    for path in _cache_dir().glob("*.json"):
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
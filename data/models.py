@@ -33,6 +33,13 @@ class Settings:
     jira_token: str = ""             # Personal Access Token
     draft_retention_days: int = 90   # Auto-delete drafts not modified for this many days
     jira_link_types: list = field(default_factory=list)  # [{id, name, inward, outward}] cached globally
+    jira_max_connections: int = 20   # Connection pool size per Jira session
+    jira_http2: bool = False         # Use HTTP/2 for Jira (requires httpx[http2])
+    bulk_concurrency: int = 8        # Parallel Jira requests in bulk edit / linking
+    jira_rate_limits: dict = field(default_factory=dict)  # {jira_url: {"rate": req/s, "burst": n}} for writes
+    llm_hedging: bool = False        # Also send slow LLM requests to the other provider (needs both keys)
+    llm_hedge_percentile: int = 95   # Hedge once the primary is slower than this percentile of its latencies
+    speculative_completion: bool = False  # Pre-generate the "skip questions" answer while questions are shown
 
 
 @dataclass
@@ -46,6 +53,13 @@ class AIResponse:
     jira_issue_key: str = ""  # e.g. "VKPCP-123", filled after successful Jira creation
 
 
+@dataclass
+class Decomposition:
+    """One request split into an epic and its child stories (all with status "ready")."""
+    epic: AIResponse
+    stories: list[AIResponse] = field(default_factory=list)
+
+
 @dataclass
 class VoiceResult:
     description: str
@@ -63,3 +77,43 @@ class Draft:
     answers: list[list[str]] = field(default_factory=list)  # [[question, answer], ...]
     ai_response: AIResponse | None = None
     updated_at: str = ""  # ISO datetime of last file modification; populated on load
+
+
+@dataclass
+class BulkItemResult:
+    index: int                  # Position of the item in the input list (for ordered display)
+    key: str                    # Issue key or other item label
+    ok: bool
+    error: str = ""             # Error message if not ok
+    detail: str = ""            # Optional extra status text (e.g. "skipped")
+    cancelled: bool = False     # True if the run was cancelled before this item started
+    retries: int = 0            # Transient Jira failures retried while processing the item
+
+
+@dataclass
+class IssueCheck:
+    key: str                    # Issue key as entered by the user
+    found: bool                 # False if the issue does not exist or is not visible to the token
+    project: str = ""           # Project key
+    issue_type: str = ""        # Issue type name
+    summary: str = ""
+    fields: dict = field(default_factory=dict)  # {field_id: current raw value} for requested fields
+
+
+@dataclass
+class IssueUpdatePlan:
+    check: IssueCheck
+    changes: dict = field(default_factory=dict)  # {field_id: value string} that differ from current values
+
+
+@dataclass
+class NewIssue:
+    """Parameters of one issue to create (see jira_client.create_jira_issue)."""
+    project_key: str
+    summary: str
+    description: str
+    issue_type: str = "Story"
+    issue_type_id: str = ""
+    labels: list[str] = field(default_factory=list)
+    extra_fields: dict = field(default_factory=dict)  # {jql_or_api_field: value string}
+    epic_name: str = ""
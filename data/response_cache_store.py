@@ -0,0 +1,46 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+def _cache_path() -> Path:
+    appdata = os.environ.get("APPDATA")
+    base = Path(appdata) if appdata else Path.home() / "AppData" / "Roaming"
+    directory = base / "Lyudochka"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / "response_cache.json"
+
+
+def load_response_cache() -> dict[str, dict]:
+    """Return cached responses as {key: {"raw", "stored_at"}}, least recently used first."""
+    path = _cache_path()
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return {
+            key: {"raw": entry["raw"], "stored_at": float(entry["stored_at"])}
+            for key, entry in data.get("entries", {}).items()
+        }
+    except Exception as exc:
+        log.warning("response cache: unreadable %s: %s", path.name, exc)
+        return {}
+
+
+def save_response_cache(entries: dict[str, dict]) -> None:
+    path = _cache_path()
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"entries": entries}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def clear_response_cache() -> int:
+    """Delete all cached responses. Returns the number of removed entries."""
+    removed = len(load_response_cache())
+    path = _cache_path()
+    if path.exists():
+        path.unlink()
+    return removed
@@ -35,6 +35,13 @@ def load_settings() -> Settings:
             jira_token=data.get("jira_token", ""),
             draft_retention_days=int(data.get("draft_retention_days", 90)),
             jira_link_types=data.get("jira_link_types", []),
+            jira_max_connections=int(data.get("jira_max_connections", 20)),
+            jira_http2=bool(data.get("jira_http2", False)),
+            bulk_concurrency=int(data.get("bulk_concurrency", 8)),
+            jira_rate_limits=data.get("jira_rate_limits", {}),
+            llm_hedging=bool(data.get("llm_hedging", False)),
+            llm_hedge_percentile=int(data.get("llm_hedge_percentile", 95)),
+            speculative_completion=bool(data.get("speculative_completion", False)),
         )
     except (json.JSONDecodeError, OSError):
         return Settings()
@@ -50,6 +57,13 @@ def save_settings(settings: Settings) -> None:
         "jira_token": settings.jira_token,
         "draft_retention_days": settings.draft_retention_days,
         "jira_link_types": settings.jira_link_types,
+        "jira_max_connections": settings.jira_max_connections,
+        "jira_http2": settings.jira_http2,
+        "bulk_concurrency": settings.bulk_concurrency,
+        "jira_rate_limits": settings.jira_rate_limits,
+        "llm_hedging": settings.llm_hedging,
+        "llm_hedge_percentile": settings.llm_hedge_percentile,
+        "speculative_completion": settings.speculative_completion,
     }
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
@@ -7,6 +7,9 @@ from data.models import Term
 
 log = logging.getLogger(__name__)
 
+# Bumped on every save so in-process caches notice changes even within one mtime tick
+_save_count = 0
+
 
 def _terms_path() -> Path:
     appdata = os.environ.get("APPDATA")
@@ -27,7 +30,18 @@ def load_terms() -> list[Term]:
         return []
 
 
+def terms_version() -> tuple[int, int, int]:
+    """Cheap change marker for terms.json (no read/parse): (saves in this process, mtime, size)."""
+    try:
+        st = _terms_path().stat()
+    except FileNotFoundError:
+        return _save_count, 0, 0
+    return _save_count, st.st_mtime_ns, st.st_size
+
+
 def save_terms(terms: list[Term]) -> None:
+    global _save_count
+    _save_count += 1
     path = _terms_path()
     data = [{"name": t.name, "description": t.description} for t in terms]
     path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
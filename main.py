@@ -74,10 +74,32 @@ async def main(page: ft.Page) -> None:
     page.window.visible = True
     page.update()
 
+    page.window.prevent_close = True
+    page.window.on_event = _on_window_event
     page.run_task(_init_app, page)
 
 
+async def _on_window_event(e: ft.WindowEvent) -> None:
+    """Release long-lived network resources before the window is destroyed."""
+    if e.type != ft.WindowEventType.CLOSE:
+        return
+    try:
+        await _shutdown()
+    except Exception:
+        log.exception("Shutdown cleanup failed")
+    await e.page.window.destroy()
+
+
+async def _shutdown() -> None:
+    from core.jira_client import close_jira_sessions
+    from core.llm_clients import close_llm_clients
+
+    await close_jira_sessions()
+    await close_llm_clients()
+
+
 async def _init_app(page: ft.Page) -> None:
+    from core.jira_client import configure_jira_pool, configure_jira_rate_limits
     from data.drafts_store import cleanup_old_drafts, migrate_drafts_to_jira_markup
     from data.settings_store import load_settings
     from data.teams_store import migrate_teams_to_jira_markup
@@ -87,6 +109,8 @@ async def _init_app(page: ft.Page) -> None:
     await asyncio.to_thread(migrate_teams_to_jira_markup)
     settings = await asyncio.to_thread(load_settings)
     await asyncio.to_thread(cleanup_old_drafts, settings.draft_retention_days)
+    await configure_jira_pool(settings.jira_max_connections, settings.jira_http2)
+    configure_jira_rate_limits(settings.jira_rate_limits)
 
     shell = AppShell(page)
 
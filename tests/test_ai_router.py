@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+
+from core import ai_router
+from core.prompt_builder import build_system_prompt, build_user_message
+from data.models import Settings, Team
+
+READY = json.dumps(
+    {"status": "ready", "task_title": "Заголовок", "task_text": "Текст", "jira_params": {}},
+    ensure_ascii=False,
+)
+
+
+@pytest.fixture
+def team() -> Team:
+    return Team(
+        name="Команда", jira_project="PRJ", default_task_type="Story",
+        rules="", team_lead="", use_glossary=False,
+    )
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return Settings(anthropic_api_key="key")
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    async def get_cached_response(key):
+        return None
+
+    async def store_response(key, raw):
+        pass
+
+    monkeypatch.setattr(ai_router, "get_cached_response", get_cached_response)
+    monkeypatch.setattr(ai_router, "store_response", store_response)
+    monkeypatch.setattr(ai_router, "_speculative", {})
+    for breaker in ai_router._breakers.values():
+        monkeypatch.setattr(breaker, "_opened_at", None)
+        monkeypatch.setattr(breaker, "_probing", False)
+        monkeypatch.setattr(breaker, "failures", 0)
+
+
+def test_stalled_speculation_falls_back_to_streaming(monkeypatch, team, settings):
+    async def stream_anthropic(system_prompt, user_message, api_key, schema=None):
+        yield READY
+
+    monkeypatch.setattr(ai_router, "stream_anthropic", stream_anthropic)
+
+    async def run():
+        key = ai_router._cache_key(
+            build_system_prompt(team),
+            build_user_message("задача", None, force_complete=True, use_glossary=False),
+            settings,
+        )
+        stalled = asyncio.create_task(asyncio.Event().wait())
+        ai_router._speculative[key] = stalled
+
+        response = await ai_router.generate_stream(
+            team, "задача", None, settings, force_complete=True, idle_timeout=0.05
+        )
+        await asyncio.gather(stalled, return_exceptions=True)
+        return response, stalled, key
+
+    response, stalled, key = asyncio.run(run())
+    assert response.status == "ready"
+    assert response.task_title == "Заголовок"
+    assert stalled.cancelled()
+    assert key not in ai_router._speculative
+
+
+def test_hedged_streams_finishing_together_close_the_loser(monkeypatch):
+    settings = Settings(anthropic_api_key="key", gemini_api_key="key", llm_hedging=True)
+    gate = asyncio.Event()
+    closed: list[str] = []
+
+    def fake_stream(provider):
+        async def stream(system_prompt, user_message, api_key, schema=None):
+            try:
+                await gate.wait()
+                yield provider
+            finally:
+                closed.append(provider)
+        return stream
+
+    monkeypatch.setattr(ai_router, "stream_anthropic", fake_stream("anthropic"))
+    monkeypatch.setattr(ai_router, "stream_gemini", fake_stream("gemini"))
+    monkeypatch.setattr(ai_router, "_hedge_delay", lambda provider, kind, percentile: 0.01)
+    for breaker in ai_router._breakers.values():
+        breaker.failures = 1
+
+    async def run():
+        # Both attempts are waiting on the gate once the hedge has started
+        asyncio.get_running_loop().call_later(0.05, gate.set)
+        return await ai_router._stream_llm("system", "user", settings, {}, idle_timeout=1.0)
+
+    provider, text = asyncio.run(run())
+    assert text == provider
+    assert sorted(closed) == ["anthropic", "gemini"]
+    assert all(b.failures == 0 and not b._probing for b in ai_router._breakers.values())
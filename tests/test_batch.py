@@ -0,0 +1,38 @@
+import pytest
+
+from core.batch import main, read_rows
+
+
+def test_read_rows_jsonl(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text(
+        '{"team": "Бэкенд", "description": "Добавить экспорт"}\n\n{"team": "Фронт"}\n',
+        encoding="utf-8",
+    )
+    assert read_rows(path) == [
+        {"row": 1, "team": "Бэкенд", "description": "Добавить экспорт"},
+        {"row": 2, "team": "Фронт", "description": ""},
+    ]
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ('{"team": "A"}\n["не объект"]\n', "строка 2: ожидается объект"),
+        ('{"team": "A"}\n{"team": \n', "строка 2: некорректный JSON"),
+    ],
+)
+def test_read_rows_rejects_malformed_jsonl(tmp_path, content, message):
+    path = tmp_path / "rows.jsonl"
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        read_rows(path)
+
+
+def test_main_reports_input_errors_with_exit_code_2(tmp_path, capsys):
+    bad = tmp_path / "rows.jsonl"
+    bad.write_text("42\n", encoding="utf-8")
+
+    assert main([str(tmp_path / "missing.csv")]) == 2
+    assert main([str(bad)]) == 2
+    assert "строка 1: ожидается объект" in capsys.readouterr().err
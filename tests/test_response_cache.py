@@ -0,0 +1,26 @@
+import asyncio
+import time
+
+from core import response_cache
+
+
+def test_concurrent_first_loads_keep_stored_entry(monkeypatch):
+    delays = [0.05, 0.0]
+
+    def load_response_cache():
+        time.sleep(delays.pop(0))
+        return {}
+
+    monkeypatch.setattr(response_cache.response_cache_store, "load_response_cache", load_response_cache)
+    monkeypatch.setattr(response_cache.response_cache_store, "save_response_cache", lambda entries: None)
+    monkeypatch.setattr(response_cache, "_entries", None)
+    monkeypatch.setattr(response_cache, "_save_lock", asyncio.Lock())
+
+    async def run():
+        lookup = asyncio.create_task(response_cache.get_cached_response("other"))
+        await asyncio.sleep(0)
+        await response_cache.store_response("key", "ответ")
+        await lookup
+        return await response_cache.get_cached_response("key")
+
+    assert asyncio.run(run()) == "ответ"
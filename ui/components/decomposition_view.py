@@ -0,0 +1,153 @@
+import logging
+
+import flet as ft
+
+from core.bulk_executor import create_epic_with_stories
+from data.models import Decomposition, NewIssue
+from data.settings_store import load_settings
+from ui.components.result_card import ResultCard
+from ui.snack import error_snack
+
+log = logging.getLogger(__name__)
+
+
+class DecompositionView:
+    """An epic and its stories as a batch of ResultCards with one "create all" action.
+
+    Creation runs as epic → all stories at once → Epic Link on every story;
+    progress of all three steps is shown in a single status line.
+    """
+
+    def __init__(self, page: ft.Page, decomposition: Decomposition) -> None:
+        self.page = page
+        self.decomposition = decomposition
+        self._epic_card = ResultCard(page, decomposition.epic, batch=True)
+        self._story_cards = [ResultCard(page, story, batch=True) for story in decomposition.stories]
+        self._create_btn: ft.ElevatedButton | None = None
+        self._progress_bar: ft.ProgressBar | None = None
+        self._progress_text: ft.Text | None = None
+        self._errors_col: ft.Column | None = None
+
+    def build(self) -> ft.Control:
+        settings = load_settings()
+        jira_configured = bool(settings.jira_url and settings.jira_token)
+        already_created = bool(self.decomposition.epic.jira_issue_key)
+        self._create_btn = ft.ElevatedButton(
+            "Создать всё в Jira",
+            icon=ft.Icons.ADD_TASK,
+            disabled=not jira_configured or already_created,
+            tooltip=None if jira_configured else "Настройте Jira в разделе Настройки",
+            on_click=lambda e: self.page.run_task(self._create_all),
+        )
+        self._progress_bar = ft.ProgressBar(value=0, visible=False)
+        self._progress_text = ft.Text("", size=13, color=ft.Colors.GREY_700)
+        self._errors_col = ft.Column(controls=[], spacing=2)
+
+        n = len(self._story_cards)
+        return ft.Column(
+            controls=[
+                ft.Row(
+                    controls=[
+                        ft.Icon(ft.Icons.ACCOUNT_TREE_OUTLINED, color=ft.Colors.GREEN),
+                        ft.Text(
+                            f"Эпик и историй: {n}",
+                            size=16,
+                            weight=ft.FontWeight.BOLD,
+                            color=ft.Colors.GREEN,
+                        ),
+                        ft.Container(expand=True),
+                        self._create_btn,
+                    ],
+                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                ),
+                self._progress_bar,
+                self._progress_text,
+                self._errors_col,
+                self._epic_card.build(),
+                *(card.build() for card in self._story_cards),
+            ],
+            spacing=16,
+        )
+
+    # ------------------------------------------------------------------
+
+    def _set_progress(self, text: str, done: int, total: int) -> None:
+        if self._progress_text is not None:
+            self._progress_text.value = text
+        if self._progress_bar is not None:
+            self._progress_bar.visible = True
+            self._progress_bar.value = done / total if total else None
+        self.page.update()
+
+    def _add_error(self, text: str) -> None:
+        if self._errors_col is not None:
+            self._errors_col.controls.append(ft.Text(text, size=12, color=ft.Colors.RED_400))
+
+    async def _create_all(self) -> None:
+        if self._create_btn is None:
+            return
+        try:
+            epic = self._epic_card.to_new_issue()
+            stories: list[NewIssue] = [card.to_new_issue() for card in self._story_cards]
+        except ValueError as exc:
+            error_snack(self.page, str(exc))
+            return
+
+        self._create_btn.disabled = True
+        self._create_btn.content = "Создаю задачи..."
+        if self._errors_col is not None:
+            self._errors_col.controls = []
+        # One step for the epic, one per story and one per Epic Link
+        total = 1 + 2 * len(stories)
+        status = "Создаю эпик..."
+        done = created = linked = failed = 0
+        self._set_progress(status, done, total)
+        settings = load_settings()
+
+        def on_retry(index: int, text: str) -> None:
+            if self._progress_text is not None:
+                self._progress_text.value = f"{status} ({text})"
+                self._progress_text.update()
+
+        try:
+            async for stage, result in create_epic_with_stories(
+                settings.jira_url, settings.jira_token, epic, stories, on_retry=on_retry,
+            ):
+                done += 1
+                if stage == "epic":
+                    self._epic_card.mark_created(result.key)
+                    status = f"Эпик {result.key} создан, создаю истории..."
+                elif stage == "story":
+                    if result.ok:
+                        created += 1
+                        self._story_cards[result.index].mark_created(result.key)
+                    else:
+                        failed += 1
+                        self._add_error(f"История «{stories[result.index].summary}»: {result.error}")
+                    # Only created stories get an Epic Link step
+                    total = 1 + len(stories) + created + (len(stories) - created - failed)
+                    status = f"Создано историй: {created} из {len(stories)}"
+                else:
+                    if result.ok:
+                        linked += 1
+                    else:
+                        self._add_error(f"{result.key}: не привязана к эпику — {result.error}")
+                    status = f"Привязано к эпику: {linked} из {created}"
+                self._set_progress(status, done, total)
+        except Exception as exc:
+            log.exception("Epic with stories creation failed")
+            if not self.decomposition.epic.jira_issue_key:
+                # Nothing was created yet, so a retry cannot produce duplicates
+                self._create_btn.disabled = False
+                self._create_btn.content = "Создать всё в Jira"
+            self._set_progress(f"Ошибка Jira: {exc}", done, total)
+            error_snack(self.page, f"Ошибка Jira: {exc}")
+            return
+
+        self._create_btn.content = "Создано в Jira"
+        summary = (
+            f"Готово: эпик {self.decomposition.epic.jira_issue_key}, "
+            f"историй создано {created} из {len(stories)}, привязано к эпику {linked}"
+        )
+        self._set_progress(summary, total, total)
+        log.info(summary)
@@ -0,0 +1,91 @@
+from typing import Callable
+
+import flet as ft
+
+from core.insight_index import InsightIndex
+
+_MAX_OPTIONS = 50
+
+
+class InsightPicker:
+    """Search-as-you-type picker over an InsightIndex.
+
+    The dropdown only lists the best matches for the current query, so it stays fast
+    with thousands of objects; refresh() re-runs the query while pages keep loading.
+    """
+
+    def __init__(
+        self,
+        page: ft.Page,
+        index: InsightIndex,
+        on_pick: Callable[[str], None],
+        exclude_ids: set[str] | None = None,
+        expand: int = 3,
+    ) -> None:
+        self.page = page
+        self.index = index
+        self.on_pick = on_pick
+        self._exclude_ids = exclude_ids or set()
+        self._expand = expand
+        self._search_field: ft.TextField | None = None
+        self._dropdown: ft.Dropdown | None = None
+        self._status: ft.Text | None = None
+
+    def build(self) -> ft.Control:
+        self._search_field = ft.TextField(
+            hint_text="Поиск...",
+            dense=True,
+            expand=1,
+            prefix_icon=ft.Icons.SEARCH,
+            on_change=lambda e: self.refresh(),
+            content_padding=ft.padding.only(left=10, top=16, right=10, bottom=16),
+        )
+        self._dropdown = ft.Dropdown(
+            options=self._options(),
+            hint_text="Добавить значение...",
+            dense=True,
+            expand=2,
+            on_select=self._on_select,
+        )
+        self._status = ft.Text(self._status_text(), size=11, color=ft.Colors.GREY_600)
+        return ft.Column(
+            controls=[
+                ft.Row(
+                    controls=[self._search_field, self._dropdown],
+                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                    spacing=4,
+                ),
+                self._status,
+            ],
+            spacing=2,
+            expand=self._expand,
+            horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
+        )
+
+    def refresh(self) -> None:
+        """Re-run the current query against the index (e.g. after more objects were added)."""
+        if self._dropdown is None or self._status is None:
+            return
+        self._dropdown.options = self._options()
+        self._status.value = self._status_text()
+        try:
+            self._dropdown.update()
+            self._status.update()
+        except Exception:
+            pass  # picker was removed from the page meanwhile
+
+    def _options(self) -> list[ft.dropdown.Option]:
+        query = (self._search_field.value or "") if self._search_field else ""
+        matches = self.index.search(query, limit=_MAX_OPTIONS, exclude=self._exclude_ids)
+        return [ft.dropdown.Option(obj["id"], obj["name"]) for obj in matches]
+
+    def _status_text(self) -> str:
+        text = f"Загружено объектов: {len(self.index)}"
+        if not self.index.complete:
+            text += " (загрузка продолжается...)"
+        return text
+
+    def _on_select(self, e: ft.ControlEvent) -> None:
+        vid = e.control.value
+        if vid:
+            self.on_pick(vid)
@@ -0,0 +1,118 @@
+from typing import Callable
+
+import flet as ft
+
+from data.models import IssueCheck, IssueUpdatePlan
+
+
+def format_field_value(value: object) -> str:
+    """Short human-readable form of a raw Jira field value."""
+    if value is None or value == "" or value == []:
+        return "—"
+    if isinstance(value, list):
+        return ", ".join(format_field_value(v) for v in value)
+    if isinstance(value, dict):
+        for key in ("name", "value", "displayName", "key", "id"):
+            if value.get(key):
+                return str(value[key])
+        return str(value)
+    return str(value)
+
+
+class PreflightTable:
+    """Result of the pre-flight check: one row per target issue with its current values.
+
+    With plans (dry run of a bulk edit) changed cells show "current → new" and an
+    extra column tells whether the issue would be updated at all.
+    """
+
+    def __init__(
+        self,
+        checks: list[IssueCheck],
+        fields: list[dict] | None = None,
+        plans: list[IssueUpdatePlan] | None = None,
+        format_new: Callable[[str, str], str] | None = None,
+    ) -> None:
+        self.checks = checks
+        self.fields = fields or []  # [{"id", "name"}] — fields whose current values are shown
+        self.plans = plans
+        self.format_new = format_new or (lambda fid, raw: raw)  # (field_id, value string) → label
+
+    @property
+    def missing_count(self) -> int:
+        return sum(1 for c in self.checks if not c.found)
+
+    def build(self) -> ft.Control:
+        columns = [
+            ft.DataColumn(ft.Text("Задача")),
+            ft.DataColumn(ft.Text("Проект / тип")),
+            ft.DataColumn(ft.Text("Название")),
+            *(ft.DataColumn(ft.Text(f["name"])) for f in self.fields),
+        ]
+        if self.plans is not None:
+            columns.append(ft.DataColumn(ft.Text("Результат")))
+        rows: list[ft.DataRow] = []
+        for pos, check in enumerate(self.checks):
+            changes = self.plans[pos].changes if self.plans is not None else {}
+            if not check.found:
+                cells = [
+                    ft.DataCell(ft.Row(
+                        controls=[
+                            ft.Icon(ft.Icons.ERROR_OUTLINE, color=ft.Colors.RED_400, size=16),
+                            ft.Text(check.key, color=ft.Colors.RED_400),
+                        ],
+                        spacing=6,
+                    )),
+                    ft.DataCell(ft.Text("не найдена или нет доступа", color=ft.Colors.RED_400)),
+                    ft.DataCell(ft.Text("")),
+                    *(ft.DataCell(ft.Text("")) for _ in self.fields),
+                ]
+                if self.plans is not None:
+                    cells.append(ft.DataCell(ft.Text("")))
+            else:
+                cells = [
+                    ft.DataCell(ft.Row(
+                        controls=[
+                            ft.Icon(ft.Icons.CHECK_CIRCLE_OUTLINE, color=ft.Colors.GREEN_600, size=16),
+                            ft.Text(check.key),
+                        ],
+                        spacing=6,
+                    )),
+                    ft.DataCell(ft.Text(f"{check.project} / {check.issue_type}")),
+                    ft.DataCell(ft.Text(check.summary, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS)),
+                    *(self._value_cell(check, f["id"], changes) for f in self.fields),
+                ]
+                if self.plans is not None:
+                    cells.append(ft.DataCell(
+                        ft.Text("изменится", color=ft.Colors.ORANGE_700) if changes
+                        else ft.Text("без изменений", color=ft.Colors.GREY_600)
+                    ))
+            rows.append(ft.DataRow(cells=cells))
+
+        found = len(self.checks) - self.missing_count
+        summary = f"Найдено задач: {found} из {len(self.checks)}"
+        if self.plans is not None:
+            summary += f", будет изменено: {sum(1 for p in self.plans if p.changes)}"
+        return ft.Column(
+            controls=[
+                ft.Text(
+                    summary,
+                    size=13,
+                    color=ft.Colors.RED_400 if self.missing_count else ft.Colors.GREEN_700,
+                ),
+                ft.Row(
+                    controls=[ft.DataTable(columns=columns, rows=rows, column_spacing=24)],
+                    scroll=ft.ScrollMode.AUTO,
+                ),
+            ],
+            spacing=6,
+        )
+
+    def _value_cell(self, check: IssueCheck, field_id: str, changes: dict[str, str]) -> ft.DataCell:
+        current = format_field_value(check.fields.get(field_id))
+        if field_id not in changes:
+            return ft.DataCell(ft.Text(current))
+        return ft.DataCell(ft.Text(
+            f"{current} → {self.format_new(field_id, changes[field_id])}",
+            color=ft.Colors.ORANGE_700,
+        ))
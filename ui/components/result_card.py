@@ -6,8 +6,9 @@ from collections.abc import Callable
 import flet as ft
 
 from core.jira_client import create_jira_issue
-from core.jira_markup import jira_to_md
-from data.models import AIResponse
+from core.jira_markup import jira_to_md, markdown_to_jira
+from core.meta_cache import get_project_meta_cached, peek_project_meta
+from data.models import AIResponse, NewIssue
 from data.settings_store import load_settings
 from data.teams_store import load_all_teams
 from ui.snack import error_snack
@@ -24,16 +25,85 @@ def _copy_to_clipboard(text: str) -> None:
     proc.communicate(input=text.encode("utf-16"))
 
 
+class ResultCardPreview:
+    """Read-only card that fills in while a generation is still streaming.
+
+    Shown in place of the ResultCard until the full response has been parsed;
+    update() takes the partial fields from StreamingResponseParser.
+    """
+
+    def __init__(self) -> None:
+        self._title: ft.Text | None = None
+        self._text: ft.Markdown | None = None
+        self._shown: tuple[str, str] = ("", "")
+
+    def build(self) -> ft.Control:
+        self._title = ft.Text("", size=15, weight=ft.FontWeight.W_500)
+        self._text = ft.Markdown(
+            value="",
+            extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
+            soft_line_break=True,
+            expand=True,
+        )
+        return ft.Container(
+            padding=16,
+            border=ft.border.all(1, ft.Colors.OUTLINE_VARIANT),
+            border_radius=12,
+            content=ft.Column(
+                controls=[
+                    ft.Row(
+                        controls=[
+                            ft.ProgressRing(width=18, height=18, stroke_width=2),
+                            ft.Text("Задача пишется...", size=16, weight=ft.FontWeight.BOLD),
+                        ],
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                    ),
+                    ft.Divider(),
+                    ft.Text("Название задачи", size=11, color=ft.Colors.GREY_600),
+                    ft.Container(
+                        padding=ft.padding.symmetric(vertical=8, horizontal=12),
+                        bgcolor=ft.Colors.SURFACE_CONTAINER,
+                        border_radius=8,
+                        content=self._title,
+                    ),
+                    ft.Text("Описание задачи", size=11, color=ft.Colors.GREY_600),
+                    ft.Container(
+                        padding=12,
+                        bgcolor=ft.Colors.SURFACE_CONTAINER,
+                        border_radius=8,
+                        content=self._text,
+                    ),
+                ],
+                spacing=10,
+            ),
+        )
+
+    def update(self, fields: dict[str, str]) -> None:
+        title, text = fields.get("task_title", ""), fields.get("task_text", "")
+        if (title, text) == self._shown or self._title is None or self._text is None:
+            return
+        self._shown = (title, text)
+        self._title.value = title
+        self._text.value = jira_to_md(markdown_to_jira(text))
+        try:
+            self._title.update()
+            self._text.update()
+        except Exception:
+            pass  # preview was replaced meanwhile
+
+
 class ResultCard:
     def __init__(
         self,
         page: ft.Page,
         response: AIResponse,
         on_jira_created: Callable[[str], None] | None = None,
+        batch: bool = False,
     ) -> None:
         self.page = page
         self.response = response
         self._on_jira_created = on_jira_created
+        self._batch = batch  # Part of a batch created by its owner: no own "Создать в Jira" button
         self._task_text = response.task_text
         self._task_title = response.task_title
         self._labels: list[str] = list(response.jira_params.get("labels", []))
@@ -325,7 +395,7 @@ class ResultCard:
                     url=issue_url,
                 )
             ]
-        else:
+        elif not self._batch:
             jira_configured = bool(settings.jira_url and settings.jira_token)
             self._jira_btn = ft.ElevatedButton(
                 "Создать в Jira",
@@ -438,11 +508,24 @@ class ResultCard:
             (f for f in team.jira_fields_meta if f["id"] == team.release_field_id),
             None,
         )
+        # Shared project meta cache may hold a fresher release list than the saved team;
+        # only the createmeta of the team's issue type is needed for it
+        settings = load_settings()
+        type_ids = [team.default_task_type_id] if team.default_task_type_id else None
+        cached_fmeta = None
+        if settings.jira_url:
+            cached = peek_project_meta(settings.jira_url, team.jira_project, type_ids)
+            if cached is not None:
+                cached_fmeta = self._find_field_with_values(cached, team.release_field_id)
+        if cached_fmeta is not None:
+            fmeta = cached_fmeta
         if fmeta is None or not fmeta.get("allowed_values"):
             return None
         self._release_field_id = team.release_field_id
         self._release_field_meta = fmeta
         in_jira = bool(self.response.jira_issue_key)
+        if not in_jira and settings.jira_url and settings.jira_token:
+            self.page.run_task(self._revalidate_release_options, team.jira_project, type_ids)
 
         def on_release_select(e: ft.ControlEvent) -> None:
             pass  # value is read from dropdown at create time
@@ -467,6 +550,42 @@ class ResultCard:
             horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
         )
 
+    @staticmethod
+    def _find_field_with_values(meta: dict, field_id: str) -> dict | None:
+        fmeta = next((f for f in meta.get("fields", []) if f["id"] == field_id), None)
+        return fmeta if fmeta and fmeta.get("allowed_values") else None
+
+    async def _revalidate_release_options(self, project_key: str, issue_type_ids: list[str] | None) -> None:
+        """Load release options through the meta cache; swap them in if they differ from the shown ones.
+
+        Without a cache entry this fetches the createmeta of the given issue
+        types; a stale entry is refreshed in the background.
+        """
+        settings = load_settings()
+
+        def on_refresh(fresh: dict) -> None:
+            fmeta = self._find_field_with_values(fresh, self._release_field_id)
+            if fmeta is None or self._release_dropdown is None or fmeta == self._release_field_meta:
+                return
+            self._release_field_meta = fmeta
+            current = self._release_dropdown.value
+            self._release_dropdown.options = [
+                ft.dropdown.Option(av["id"], av["name"]) for av in fmeta["allowed_values"]
+            ]
+            ids = {av["id"] for av in fmeta["allowed_values"]}
+            self._release_dropdown.value = current if current in ids else None
+            self._release_dropdown.update()
+
+        try:
+            meta = await get_project_meta_cached(
+                settings.jira_url, settings.jira_token, project_key,
+                on_refresh=on_refresh, issue_type_ids=issue_type_ids,
+            )
+        except Exception as exc:
+            log.debug("Release options revalidation failed for %s: %s", project_key, exc)
+            return
+        on_refresh(meta)
+
     def _build_jira_chips(self) -> list[ft.Control]:
         jira = self.response.jira_params
         chips: list[ft.Control] = []
@@ -633,20 +752,14 @@ class ResultCard:
             self._text_container.update()
         self._edit_btn.update()
 
-    async def _create_in_jira(self) -> None:
-        if self._jira_btn is None or self._jira_action_row is None:
-            return
+    def to_new_issue(self) -> NewIssue:
+        """Issue parameters as currently edited on the card, release included.
 
-        # Validate release selection before disabling the button
+        Raises ValueError if a release has to be picked but was not.
+        """
         if self._release_dropdown is not None and not self._release_dropdown.value:
-            error_snack(self.page, "Релиз не выбран")
-            return
+            raise ValueError("Релиз не выбран")
 
-        self._jira_btn.disabled = True
-        self._jira_btn.content = "Создаю задачу..."
-        self._jira_btn.update()
-
-        settings = load_settings()
         jira_params = self.response.jira_params
         # Merge release value into extra_fields if selected
         merged_extra: dict = dict(jira_params.get("extra_fields") or {})
@@ -664,18 +777,69 @@ class ResultCard:
                 merged_extra[self._release_field_id] = json.dumps([{"id": vid}])
             else:
                 merged_extra[self._release_field_id] = json.dumps({"id": vid})
+        return NewIssue(
+            project_key=jira_params.get("project", ""),
+            summary=self.response.task_title,
+            description=self._task_text,
+            issue_type=jira_params.get("type", "Story"),
+            issue_type_id=jira_params.get("type_id", ""),
+            labels=list(jira_params.get("labels", [])),
+            extra_fields=merged_extra,
+            epic_name=self._epic_name,
+        )
+
+    def mark_created(self, key: str) -> None:
+        """Switch the card to the "Задача в Jira" state with a link to the issue."""
+        self.response.jira_issue_key = key
+        if self._jira_action_row is not None:
+            issue_url = f"{load_settings().jira_url.rstrip('/')}/browse/{key}"
+            self._jira_action_row.controls = [
+                ft.TextButton(
+                    f"Открыть {key} в Jira",
+                    icon=ft.Icons.OPEN_IN_NEW,
+                    url=issue_url,
+                )
+            ]
+            self._jira_action_row.update()
+
+        # Update header to "Задача в Jira"
+        if self._header_icon_ctrl is not None:
+            self._header_icon_ctrl.name = ft.Icons.TASK_ALT
+            self._header_icon_ctrl.color = ft.Colors.TEAL_700
+            self._header_icon_ctrl.update()
+        if self._header_text_ctrl is not None:
+            self._header_text_ctrl.value = "Задача в Jira"
+            self._header_text_ctrl.color = ft.Colors.TEAL_700
+            self._header_text_ctrl.update()
+
+    async def _create_in_jira(self) -> None:
+        if self._jira_btn is None or self._jira_action_row is None:
+            return
+
+        # Validate release selection before disabling the button
+        try:
+            issue = self.to_new_issue()
+        except ValueError as exc:
+            error_snack(self.page, str(exc))
+            return
+
+        self._jira_btn.disabled = True
+        self._jira_btn.content = "Создаю задачу..."
+        self._jira_btn.update()
+
+        settings = load_settings()
         try:
             key = await create_jira_issue(
                 jira_url=settings.jira_url,
                 token=settings.jira_token,
-                project_key=jira_params.get("project", ""),
-                summary=self.response.task_title,
-                description=self._task_text,
-                issue_type=jira_params.get("type", "Story"),
-                issue_type_id=jira_params.get("type_id", ""),
-                labels=jira_params.get("labels", []),
-                extra_fields=merged_extra or None,
-                epic_name=self._epic_name,
+                project_key=issue.project_key,
+                summary=issue.summary,
+                description=issue.description,
+                issue_type=issue.issue_type,
+                issue_type_id=issue.issue_type_id,
+                labels=issue.labels,
+                extra_fields=issue.extra_fields or None,
+                epic_name=issue.epic_name,
             )
         except Exception as exc:
             log.exception("Jira issue creation failed")
@@ -685,25 +849,7 @@ class ResultCard:
             error_snack(self.page, f"Ошибка Jira: {exc}")
             return
 
-        self.response.jira_issue_key = key
-        issue_url = f"{settings.jira_url.rstrip('/')}/browse/{key}"
-        open_btn = ft.TextButton(
-            f"Открыть {key} в Jira",
-            icon=ft.Icons.OPEN_IN_NEW,
-            url=issue_url,
-        )
-        self._jira_action_row.controls = [open_btn]
-        self._jira_action_row.update()
-
-        # Update header to "Задача в Jira"
-        if self._header_icon_ctrl is not None:
-            self._header_icon_ctrl.name = ft.Icons.TASK_ALT
-            self._header_icon_ctrl.color = ft.Colors.TEAL_700
-            self._header_icon_ctrl.update()
-        if self._header_text_ctrl is not None:
-            self._header_text_ctrl.value = "Задача в Jira"
-            self._header_text_ctrl.color = ft.Colors.TEAL_700
-            self._header_text_ctrl.update()
+        self.mark_created(key)
 
         snack = ft.SnackBar(
             content=ft.Text(f"Задача {key} создана в Jira"), open=True
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import re
@@ -5,9 +6,15 @@ from typing import Callable
 
 import flet as ft
 
-from core.jira_client import get_insight_objects, get_project_meta, update_jira_issue
+from core.bulk_executor import bulk_apply_plans, check_issues, estimate_bulk_eta, plan_bulk_update
+from core.insight_index import InsightIndex
+from core.insight_cache import load_insight_objects
+from core.meta_cache import get_project_meta_cached
+from data.models import IssueCheck, IssueUpdatePlan
 from data.settings_store import load_settings
 from data.teams_store import load_all_teams
+from ui.components.insight_picker import InsightPicker
+from ui.components.preflight_table import PreflightTable
 from ui.snack import error_snack
 
 log = logging.getLogger(__name__)
@@ -47,22 +54,31 @@ class BulkEditScreen:
     def __init__(self, page: ft.Page) -> None:
         self.page = page
         self._last_project_key: str = ""
+        self._meta_project_key: str = ""  # project the loaded _jira_fields belong to
         self._jira_fields: list[dict] = []
         self._extra_fields: dict[str, str] = {}
         self._add_row_state: list[dict] = [{"field_id": None, "multi_ids": [], "loading": False}]
+        self._insight_indexes: dict[str, InsightIndex] = {}  # field_id → objects loaded so far
+        self._insight_type_ids: dict[str, int | None] = {}  # field_id → objectTypeId used for loading
+        self._insight_picker: InsightPicker | None = None
 
         # UI refs updated each build(); used by async handlers
         self._load_btn: ft.ElevatedButton | None = None
         self._load_status: ft.Text | None = None
         self._targets_field: ft.TextField | None = None
         self._apply_btn: ft.ElevatedButton | None = None
+        self._check_btn: ft.OutlinedButton | None = None
+        self._cancel_btn: ft.OutlinedButton | None = None
+        self._progress_text: ft.Text | None = None
         self._results_col: ft.Column | None = None
+        self._cancel_event: asyncio.Event | None = None
         self._extra_fields_column: ft.Column | None = None
         self._add_field_row_container: ft.Container | None = None
 
         # Closures from the latest build(); used by _do_fetch_meta after meta loads
         self._rebuild_field_rows: Callable[[], list[ft.Control]] | None = None
         self._rebuild_add_row: Callable[[], ft.Control] | None = None
+        self._display_value: Callable[[str, str], str] | None = None
 
     # ------------------------------------------------------------------
     # Build
@@ -269,27 +285,16 @@ class BulkEditScreen:
                                 raise ValueError("Настройте подключение к Jira в Настройках")
                             raw_tid = (_type_id_field.value or "").strip()
                             explicit_type_id = int(raw_tid) if raw_tid.isdigit() else None
-                            objects = await get_insight_objects(
+                            await self._stream_insight_objects(
                                 settings.jira_url, settings.jira_token,
-                                _captured_fmeta["name"], _captured_fid or "",
-                                object_type_id=explicit_type_id,
+                                _captured_fid or "", _captured_fmeta["name"], explicit_type_id,
                             )
-                            idx = next(
-                                (i for i, f in enumerate(self._jira_fields) if f["id"] == _captured_fid),
-                                None,
-                            )
-                            if idx is not None:
-                                self._jira_fields[idx]["allowed_values"] = objects
-                                self._jira_fields[idx]["multi"] = True
-                            self._add_row_state[0] = {
-                                "field_id": _captured_fid, "multi_ids": [], "loading": False,
-                            }
                         except Exception as exc:
                             self._add_row_state[0]["loading"] = False
                             error_snack(self.page, str(exc))
-                        if self._add_field_row_container is not None:
-                            self._add_field_row_container.content = _build_add_row()
-                        self.page.update()
+                            if self._add_field_row_container is not None:
+                                self._add_field_row_container.content = _build_add_row()
+                            self.page.update()
 
                     val_ctrl = ft.Column(
                         controls=[
@@ -317,29 +322,79 @@ class BulkEditScreen:
 
             elif is_insight or cur_fmeta["multi"]:
                 already_ids = set(cur_multi_ids)
-                filtered_avs = [av for av in cur_fmeta["allowed_values"] if av["id"] not in already_ids]
 
-                def on_add_multi_val(e: ft.ControlEvent) -> None:
-                    vid = e.control.value
+                def add_multi_val(vid: str | None) -> None:
                     if vid and vid not in self._add_row_state[0]["multi_ids"]:
                         self._add_row_state[0]["multi_ids"].append(vid)
                         if self._add_field_row_container is not None:
                             self._add_field_row_container.content = _build_add_row()
                         self.page.update()
 
-                pick_dd = ft.Dropdown(
-                    options=[ft.dropdown.Option(av["id"], av["name"]) for av in filtered_avs],
-                    hint_text="Добавить значение...",
-                    dense=True,
-                    expand=3,
-                    on_select=on_add_multi_val,
-                )
-                val_ctrl = ft.Column(
-                    controls=[ft.Row(controls=[pick_dd], spacing=4)],
-                    spacing=4,
-                    expand=3,
-                    horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
-                )
+                if is_insight:
+                    index = self._insight_indexes.get(cur_fid)
+                    if index is None:
+                        index = InsightIndex.from_objects(cur_fmeta["allowed_values"])
+                        self._insight_indexes[cur_fid] = index
+                    self._insight_picker = InsightPicker(
+                        self.page, index, on_pick=add_multi_val, exclude_ids=already_ids, expand=1,
+                    )
+
+                    _refresh_fid = cur_fid
+                    _refresh_fmeta = cur_fmeta
+
+                    async def _do_refresh_insight(e: ft.ControlEvent) -> None:
+                        # Current objects stay in the picker until the first fresh page arrives
+                        self._add_row_state[0]["loading"] = True
+                        if self._add_field_row_container is not None:
+                            self._add_field_row_container.content = _build_add_row()
+                        self.page.update()
+                        try:
+                            settings = load_settings()
+                            if not settings.jira_url or not settings.jira_token:
+                                raise ValueError("Настройте подключение к Jira в Настройках")
+                            await self._stream_insight_objects(
+                                settings.jira_url, settings.jira_token,
+                                _refresh_fid or "", _refresh_fmeta["name"],
+                                self._insight_type_ids.get(_refresh_fid or ""), force=True,
+                            )
+                        except Exception as exc:
+                            self._add_row_state[0]["loading"] = False
+                            error_snack(self.page, str(exc))
+                            if self._add_field_row_container is not None:
+                                self._add_field_row_container.content = _build_add_row()
+                            self.page.update()
+
+                    refresh_ctrl: ft.Control = (
+                        ft.ProgressRing(width=18, height=18, stroke_width=2)
+                        if is_loading
+                        else ft.IconButton(
+                            icon=ft.Icons.REFRESH,
+                            icon_size=18,
+                            tooltip="Обновить объекты из Jira (без кэша)",
+                            on_click=lambda e: self.page.run_task(_do_refresh_insight, e),
+                        )
+                    )
+                    val_ctrl = ft.Row(
+                        controls=[self._insight_picker.build(), refresh_ctrl],
+                        spacing=4,
+                        expand=3,
+                        vertical_alignment=ft.CrossAxisAlignment.START,
+                    )
+                else:
+                    filtered_avs = [av for av in cur_fmeta["allowed_values"] if av["id"] not in already_ids]
+                    pick_dd = ft.Dropdown(
+                        options=[ft.dropdown.Option(av["id"], av["name"]) for av in filtered_avs],
+                        hint_text="Добавить значение...",
+                        dense=True,
+                        expand=3,
+                        on_select=lambda e: add_multi_val(e.control.value),
+                    )
+                    val_ctrl = ft.Column(
+                        controls=[ft.Row(controls=[pick_dd], spacing=4)],
+                        spacing=4,
+                        expand=3,
+                        horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
+                    )
 
                 for vid in cur_multi_ids:
                     vname = next(
@@ -493,6 +548,7 @@ class BulkEditScreen:
         # Wire up closure references
         self._rebuild_field_rows = _build_field_rows
         self._rebuild_add_row = _build_add_row
+        self._display_value = _display_value
 
         extra_fields_col = ft.Column(controls=_build_field_rows(), spacing=6)
         add_field_row_cont = ft.Container(content=_build_add_row())
@@ -517,6 +573,23 @@ class BulkEditScreen:
             width=220,
         )
 
+        self._check_btn = ft.OutlinedButton(
+            "Пробный запуск",
+            tooltip="Показать текущие значения и что изменится, ничего не записывая",
+            icon=ft.Icons.FACT_CHECK_OUTLINED,
+            on_click=lambda e: self.page.run_task(self._do_check),
+            disabled=True,
+        )
+
+        self._cancel_btn = ft.OutlinedButton(
+            "Остановить",
+            icon=ft.Icons.STOP_CIRCLE_OUTLINED,
+            on_click=self._on_cancel_clicked,
+            visible=self._cancel_event is not None and not self._cancel_event.is_set(),
+            style=ft.ButtonStyle(color=ft.Colors.RED_400),
+        )
+        self._progress_text = ft.Text("", size=13, color=ft.Colors.GREY_600)
+
         self._results_col = ft.Column(controls=[], spacing=6)
 
         return ft.Container(
@@ -559,7 +632,11 @@ class BulkEditScreen:
                         size=13, weight=ft.FontWeight.W_500, color=ft.Colors.GREY_700,
                     ),
                     self._targets_field,
-                    ft.Row(controls=[self._apply_btn]),
+                    ft.Row(
+                        controls=[self._apply_btn, self._check_btn, self._cancel_btn, self._progress_text],
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        spacing=12,
+                    ),
                     self._results_col,
                 ],
                 spacing=14,
@@ -580,6 +657,13 @@ class BulkEditScreen:
     def _on_project_key_selected(self, e: ft.AutoCompleteSelectEvent) -> None:
         self._last_project_key = e.selection.value.strip().upper()
 
+    def _on_cancel_clicked(self, e: ft.ControlEvent) -> None:
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        if self._cancel_btn is not None:
+            self._cancel_btn.disabled = True
+            self._cancel_btn.update()
+
     def _update_apply_btn(self, e: ft.ControlEvent | None = None) -> None:
         if self._apply_btn is None:
             return
@@ -587,6 +671,9 @@ class BulkEditScreen:
         has_targets = bool((self._targets_field.value or "").strip()) if self._targets_field else False
         self._apply_btn.disabled = not (has_fields and has_targets)
         self._apply_btn.update()
+        if self._check_btn is not None:
+            self._check_btn.disabled = not has_targets
+            self._check_btn.update()
 
     # ------------------------------------------------------------------
     # Load project fields
@@ -610,8 +697,21 @@ class BulkEditScreen:
             self._load_status.color = ft.Colors.GREY_600
             self._load_status.update()
 
+        # "Обновить" (fields of this project already loaded) bypasses the cache;
+        # the first load is served from it
+        force = bool(self._jira_fields) and self._meta_project_key == proj_key
+
+        def on_refresh(fresh: dict) -> None:
+            if self._last_project_key != proj_key:
+                return  # user switched project meanwhile
+            self._apply_meta(fresh, keep_selection=True)
+            self.page.update()
+
         try:
-            meta = await get_project_meta(settings.jira_url, settings.jira_token, proj_key)
+            meta = await get_project_meta_cached(
+                settings.jira_url, settings.jira_token, proj_key,
+                on_refresh=on_refresh, force=force,
+            )
         except Exception as exc:
             log.exception("Failed to fetch project meta for %s", proj_key)
             if self._load_status:
@@ -623,12 +723,72 @@ class BulkEditScreen:
                 self._load_btn.update()
             return
 
+        self._meta_project_key = proj_key
+        self._apply_meta(meta, keep_selection=False)
+        if self._load_btn:
+            self._load_btn.content = "Обновить поля из Jira"
+            self._load_btn.icon = ft.Icons.CLOUD_SYNC
+            self._load_btn.disabled = False
+            self._load_btn.update()
+
+        self.page.update()
+
+    async def _stream_insight_objects(
+        self, jira_url: str, token: str, field_id: str, field_name: str, object_type_id: int | None,
+        force: bool = False,
+    ) -> None:
+        """Load Insight objects page by page; the picker appears after the first page.
+
+        force=True skips the on-disk cache and reloads the objects from Jira.
+        """
+        self._insight_type_ids[field_id] = object_type_id
+        index = InsightIndex()
+        values: list[dict] = []  # becomes the field's allowed_values and grows with each page
+        shown = False
+        try:
+            async for page_objects in load_insight_objects(
+                jira_url, token, field_name, field_id, object_type_id=object_type_id, force=force,
+            ):
+                index.add(page_objects)
+                values.extend(page_objects)
+                if not shown and values:
+                    shown = True
+                    self._insight_indexes[field_id] = index
+                    fmeta = next((f for f in self._jira_fields if f["id"] == field_id), None)
+                    if fmeta is not None:
+                        fmeta["allowed_values"] = values
+                        fmeta["multi"] = True
+                    if self._add_row_state[0].get("field_id") == field_id:
+                        self._add_row_state[0] = {"field_id": field_id, "multi_ids": [], "loading": False}
+                        if self._rebuild_add_row and self._add_field_row_container is not None:
+                            self._add_field_row_container.content = self._rebuild_add_row()
+                        self.page.update()
+                elif shown and self._insight_picker is not None and self._insight_picker.index is index:
+                    self._insight_picker.refresh()
+        finally:
+            index.complete = True
+            if self._insight_picker is not None and self._insight_picker.index is index:
+                self._insight_picker.refresh()
+        if not shown:
+            raise ValueError(f"Insight: объекты для поля «{field_name}» не найдены.")
+        log.debug("Insight: streamed %d objects for %s", len(index), field_id)
+
+    def _apply_meta(self, meta: dict, keep_selection: bool) -> None:
+        """Replace field metadata; with keep_selection, chosen changes for fields that still exist survive."""
         self._jira_fields.clear()
         self._jira_fields.extend(meta["fields"])
-
-        # Clear field selections when meta is reloaded
-        self._extra_fields.clear()
-        self._add_row_state[0] = {"field_id": None, "multi_ids": [], "loading": False}
+        self._insight_indexes.clear()
+
+        if keep_selection:
+            known = {f["id"] for f in self._jira_fields}
+            for fid in [k for k in self._extra_fields if k not in known]:
+                self._extra_fields.pop(fid)
+            if self._add_row_state[0].get("field_id") not in known:
+                self._add_row_state[0] = {"field_id": None, "multi_ids": [], "loading": False}
+        else:
+            # Clear field selections when meta is reloaded
+            self._extra_fields.clear()
+            self._add_row_state[0] = {"field_id": None, "multi_ids": [], "loading": False}
 
         # Rebuild extra-fields UI via stored closures
         if self._rebuild_field_rows and self._extra_fields_column is not None:
@@ -643,13 +803,59 @@ class BulkEditScreen:
             self._load_status.value = f"Загружено {len(self._jira_fields)} полей"
             self._load_status.color = ft.Colors.GREEN_700
             self._load_status.update()
-        if self._load_btn:
-            self._load_btn.content = "Обновить поля из Jira"
-            self._load_btn.icon = ft.Icons.CLOUD_SYNC
-            self._load_btn.disabled = False
-            self._load_btn.update()
 
-        self.page.update()
+    # ------------------------------------------------------------------
+    # Pre-flight check
+    # ------------------------------------------------------------------
+
+    async def _do_check(self) -> None:
+        settings = load_settings()
+        if not settings.jira_url or not settings.jira_token:
+            error_snack(self.page, "Настройте подключение к Jira в разделе «Настройки»")
+            return
+        targets = _parse_issues(self._targets_field.value or "", self._last_project_key)
+        if not targets:
+            error_snack(self.page, "Укажите список задач")
+            return
+
+        if self._check_btn:
+            self._check_btn.disabled = True
+            self._check_btn.update()
+        if self._progress_text:
+            self._progress_text.value = "Проверка задач..."
+            self._progress_text.update()
+        field_ids = list(self._extra_fields)
+        try:
+            if field_ids:
+                # Dry run: diff the edit against current values without writing
+                plans: list[IssueUpdatePlan] | None = await plan_bulk_update(
+                    settings.jira_url, settings.jira_token, targets, dict(self._extra_fields),
+                )
+                checks = [plan.check for plan in plans]
+            else:
+                plans = None
+                checks = await check_issues(settings.jira_url, settings.jira_token, targets)
+        except Exception as exc:
+            log.exception("Pre-flight check failed")
+            error_snack(self.page, f"Не удалось проверить задачи: {exc}")
+        else:
+            names = {f["id"]: f["name"] for f in self._jira_fields}
+            table = PreflightTable(
+                checks,
+                [{"id": fid, "name": names.get(fid, fid)} for fid in field_ids],
+                plans=plans,
+                format_new=self._display_value,
+            )
+            if self._results_col:
+                self._results_col.controls = [table.build()]
+                self._results_col.update()
+        finally:
+            if self._progress_text:
+                self._progress_text.value = ""
+                self._progress_text.update()
+            if self._check_btn:
+                self._check_btn.disabled = False
+                self._check_btn.update()
 
     # ------------------------------------------------------------------
     # Apply changes
@@ -673,12 +879,15 @@ class BulkEditScreen:
         if self._apply_btn:
             self._apply_btn.disabled = True
             self._apply_btn.update()
-        if self._results_col:
-            self._results_col.controls = []
-            self._results_col.update()
-
-        for issue_key in targets:
-            pending_row = ft.Row(
+        self._cancel_event = asyncio.Event()
+        if self._cancel_btn:
+            self._cancel_btn.visible = True
+            self._cancel_btn.disabled = False
+            self._cancel_btn.update()
+
+        # One pending row per issue, in input order; results fill them as they arrive
+        rows = [
+            ft.Row(
                 controls=[
                     ft.ProgressRing(width=16, height=16, stroke_width=2),
                     ft.Text(issue_key, size=13),
@@ -686,29 +895,110 @@ class BulkEditScreen:
                 spacing=8,
                 vertical_alignment=ft.CrossAxisAlignment.CENTER,
             )
+            for issue_key in targets
+        ]
+        if self._results_col:
+            self._results_col.controls = list(rows)
+            self._results_col.update()
+
+        done = skipped = failed = 0
+        if self._progress_text:
+            self._progress_text.value = "Проверка задач..."
+            self._progress_text.update()
+        # Pre-flight: read current values with a few batched searches; missing issues
+        # fail right away and issues that already have the target values are skipped,
+        # so only real changes cost a write (re-runs of a half-finished edit are cheap)
+        try:
+            plans = await plan_bulk_update(
+                settings.jira_url, settings.jira_token, targets, dict(self._extra_fields),
+            )
+        except Exception as exc:
+            log.warning("Pre-flight check failed, applying to all targets: %s", exc)
+            plans = [
+                IssueUpdatePlan(check=IssueCheck(key=key, found=True), changes=dict(self._extra_fields))
+                for key in targets
+            ]
+        to_apply = [i for i, plan in enumerate(plans) if plan.changes]  # positions sent to Jira
+        for i, plan in enumerate(plans):
+            if not plan.check.found:
+                done += 1
+                failed += 1
+                rows[i].controls = [
+                    ft.Icon(ft.Icons.ERROR_OUTLINE, color=ft.Colors.RED_400, size=18),
+                    ft.Text(f"{plan.check.key}: не найдена или нет доступа", size=13, color=ft.Colors.RED_400),
+                ]
+            elif not plan.changes:
+                done += 1
+                skipped += 1
+                rows[i].controls = [
+                    ft.Icon(ft.Icons.INFO_OUTLINE, color=ft.Colors.GREY_500, size=18),
+                    ft.Text(f"{plan.check.key}: без изменений", size=13, color=ft.Colors.GREY_600),
+                ]
+        if self._results_col and done:
+            self._results_col.update()
+
+        def on_retry(index: int, status: str) -> None:
+            pos = to_apply[index]
+            rows[pos].controls[1] = ft.Text(
+                f"{targets[pos]}: {status}", size=13, color=ft.Colors.ORANGE_700,
+            )
             if self._results_col:
-                self._results_col.controls.append(pending_row)
                 self._results_col.update()
 
-            try:
-                await update_jira_issue(
-                    settings.jira_url, settings.jira_token,
-                    issue_key, self._extra_fields,
-                )
-                pending_row.controls = [
+        self._set_progress(done, len(targets), skipped, failed, settings.jira_url)
+        async for result in bulk_apply_plans(
+            settings.jira_url, settings.jira_token,
+            [plans[i] for i in to_apply],
+            concurrency=settings.bulk_concurrency,
+            cancel_event=self._cancel_event,
+            on_retry=on_retry,
+        ):
+            row = rows[to_apply[result.index]]
+            retried = f" (повторов: {result.retries})" if result.retries else ""
+            if result.ok:
+                row.controls = [
                     ft.Icon(ft.Icons.CHECK_CIRCLE_OUTLINE, color=ft.Colors.GREEN_600, size=18),
-                    ft.Text(issue_key, size=13),
+                    ft.Text(f"{result.key}{retried}", size=13),
                 ]
-            except Exception as exc:
-                log.exception("Failed to update %s", issue_key)
-                pending_row.controls = [
+            elif result.cancelled:
+                row.controls = [
+                    ft.Icon(ft.Icons.BLOCK, color=ft.Colors.GREY_500, size=18),
+                    ft.Text(f"{result.key}: отменено", size=13, color=ft.Colors.GREY_600),
+                ]
+            else:
+                failed += 1
+                row.controls = [
                     ft.Icon(ft.Icons.ERROR_OUTLINE, color=ft.Colors.RED_400, size=18),
-                    ft.Text(f"{issue_key}: {exc}", size=13, color=ft.Colors.RED_400),
+                    ft.Text(f"{result.key}: {result.error}{retried}", size=13, color=ft.Colors.RED_400),
                 ]
-
+            done += 1
+            self._set_progress(done, len(targets), skipped, failed, settings.jira_url)
             if self._results_col:
                 self._results_col.update()
 
+        self._cancel_event = None
+        if self._cancel_btn:
+            self._cancel_btn.visible = False
+            self._cancel_btn.update()
         if self._apply_btn:
             self._apply_btn.disabled = False
             self._apply_btn.update()
+
+    def _set_progress(
+        self, done: int, total: int, skipped: int, failed: int, jira_url: str = "",
+    ) -> None:
+        if self._progress_text is None:
+            return
+        text = f"Обработано {done} из {total}"
+        if skipped:
+            text += f", без изменений: {skipped}"
+        if failed:
+            text += f", ошибок: {failed}"
+        if jira_url and done < total:
+            queued, eta = estimate_bulk_eta(jira_url, total - done)
+            if queued:
+                text += f", ждут лимита запросов: {queued}"
+            if eta >= 2:
+                text += f", осталось ≈ {eta:.0f} с"
+        self._progress_text.value = text
+        self._progress_text.update()
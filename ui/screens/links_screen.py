@@ -1,11 +1,14 @@
+import asyncio
 import logging
 import re
 
 import flet as ft
 
-from core.jira_client import create_issue_link, get_link_types
+from core.bulk_executor import bulk_create_links, check_issues, estimate_bulk_eta
+from core.jira_client import get_issue_links, get_link_types
 from data.settings_store import load_settings, save_settings
 from data.teams_store import load_all_teams
+from ui.components.preflight_table import PreflightTable
 from ui.snack import error_snack
 
 log = logging.getLogger(__name__)
@@ -67,7 +70,11 @@ class LinksScreen:
         self._source_field: ft.TextField | None = None
         self._targets_field: ft.TextField | None = None
         self._link_btn: ft.ElevatedButton | None = None
+        self._check_btn: ft.OutlinedButton | None = None
+        self._cancel_btn: ft.OutlinedButton | None = None
+        self._progress_text: ft.Text | None = None
         self._results_col: ft.Column | None = None
+        self._cancel_event: asyncio.Event | None = None
 
     # ------------------------------------------------------------------
     # Build
@@ -156,6 +163,22 @@ class LinksScreen:
             width=200,
         )
 
+        self._check_btn = ft.OutlinedButton(
+            "Проверить задачи",
+            icon=ft.Icons.FACT_CHECK_OUTLINED,
+            on_click=lambda e: self.page.run_task(self._do_check),
+            disabled=True,
+        )
+
+        self._cancel_btn = ft.OutlinedButton(
+            "Остановить",
+            icon=ft.Icons.STOP_CIRCLE_OUTLINED,
+            on_click=self._on_cancel_clicked,
+            visible=self._cancel_event is not None and not self._cancel_event.is_set(),
+            style=ft.ButtonStyle(color=ft.Colors.RED_400),
+        )
+        self._progress_text = ft.Text("", size=13, color=ft.Colors.GREY_600)
+
         self._results_col = ft.Column(controls=[], spacing=6)
 
         return ft.Container(
@@ -198,7 +221,11 @@ class LinksScreen:
                     ),
                     self._source_field,
                     self._targets_field,
-                    ft.Row(controls=[self._link_btn]),
+                    ft.Row(
+                        controls=[self._link_btn, self._check_btn, self._cancel_btn, self._progress_text],
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        spacing=12,
+                    ),
                     self._results_col,
                 ],
                 spacing=14,
@@ -250,6 +277,32 @@ class LinksScreen:
             self._selected_label.update()
         self._update_link_btn()
 
+    def _on_cancel_clicked(self, e: ft.ControlEvent) -> None:
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        if self._cancel_btn is not None:
+            self._cancel_btn.disabled = True
+            self._cancel_btn.update()
+
+    def _set_progress(
+        self, done: int, total: int, skipped: int, failed: int, jira_url: str = "",
+    ) -> None:
+        if self._progress_text is None:
+            return
+        text = f"Обработано {done} из {total}"
+        if skipped:
+            text += f", пропущено: {skipped}"
+        if failed:
+            text += f", ошибок: {failed}"
+        if jira_url and done < total:
+            queued, eta = estimate_bulk_eta(jira_url, total - done)
+            if queued:
+                text += f", ждут лимита запросов: {queued}"
+            if eta >= 2:
+                text += f", осталось ≈ {eta:.0f} с"
+        self._progress_text.value = text
+        self._progress_text.update()
+
     def _update_link_btn(self, e: ft.ControlEvent | None = None) -> None:
         if self._link_btn is None:
             return
@@ -258,6 +311,9 @@ class LinksScreen:
         has_targets = bool((self._targets_field.value or "").strip()) if self._targets_field else False
         self._link_btn.disabled = not (has_type and has_source and has_targets)
         self._link_btn.update()
+        if self._check_btn is not None:
+            self._check_btn.disabled = not (has_source or has_targets)
+            self._check_btn.update()
 
     # ------------------------------------------------------------------
     # Load link types
@@ -322,6 +378,46 @@ class LinksScreen:
 
         self._update_link_btn()
 
+    # ------------------------------------------------------------------
+    # Pre-flight check
+    # ------------------------------------------------------------------
+
+    async def _do_check(self) -> None:
+        settings = load_settings()
+        if not settings.jira_url or not settings.jira_token:
+            error_snack(self.page, "Настройте подключение к Jira в разделе «Настройки»")
+            return
+        source = _extract_issue_key((self._source_field.value or "").strip(), self._last_project_key)
+        keys = ([source] if source else []) + _parse_issues(
+            self._targets_field.value or "", self._last_project_key,
+        )
+        if not keys:
+            error_snack(self.page, "Укажите задачи для проверки")
+            return
+
+        if self._check_btn:
+            self._check_btn.disabled = True
+            self._check_btn.update()
+        if self._progress_text:
+            self._progress_text.value = "Проверка задач..."
+            self._progress_text.update()
+        try:
+            checks = await check_issues(settings.jira_url, settings.jira_token, keys)
+        except Exception as exc:
+            log.exception("Pre-flight check failed")
+            error_snack(self.page, f"Не удалось проверить задачи: {exc}")
+        else:
+            if self._results_col:
+                self._results_col.controls = [PreflightTable(checks).build()]
+                self._results_col.update()
+        finally:
+            if self._progress_text:
+                self._progress_text.value = ""
+                self._progress_text.update()
+            if self._check_btn:
+                self._check_btn.disabled = False
+                self._check_btn.update()
+
     # ------------------------------------------------------------------
     # Create links
     # ------------------------------------------------------------------
@@ -355,16 +451,15 @@ class LinksScreen:
         if self._link_btn:
             self._link_btn.disabled = True
             self._link_btn.update()
-        if self._results_col:
-            self._results_col.controls = []
-            self._results_col.update()
-
-        for target in targets:
-            outward = source if is_outward else target
-            inward = target if is_outward else source
-            label_text = f"{source}  {link_label}  {target}"
-
-            pending_row = ft.Row(
+        self._cancel_event = asyncio.Event()
+        if self._cancel_btn:
+            self._cancel_btn.visible = True
+            self._cancel_btn.disabled = False
+            self._cancel_btn.update()
+
+        labels = [f"{source}  {link_label}  {target}" for target in targets]
+        rows = [
+            ft.Row(
                 controls=[
                     ft.ProgressRing(width=16, height=16, stroke_width=2),
                     ft.Text(label_text, size=13),
@@ -372,30 +467,109 @@ class LinksScreen:
                 spacing=8,
                 vertical_alignment=ft.CrossAxisAlignment.CENTER,
             )
-            if self._results_col:
-                self._results_col.controls.append(pending_row)
+            for label_text in labels
+        ]
+        if self._results_col:
+            self._results_col.controls = list(rows)
+            self._results_col.update()
+
+        done = skipped = failed = 0
+        if self._progress_text:
+            self._progress_text.value = "Проверка задач..."
+            self._progress_text.update()
+        # Pre-flight: missing targets fail right away instead of costing a write each
+        to_link = list(range(len(targets)))  # positions in targets that are sent to Jira
+        try:
+            checks = await check_issues(settings.jira_url, settings.jira_token, targets)
+        except Exception as exc:
+            log.warning("Pre-flight check failed, linking all targets: %s", exc)
+        else:
+            to_link = [i for i, check in enumerate(checks) if check.found]
+            for i, check in enumerate(checks):
+                if not check.found:
+                    done += 1
+                    failed += 1
+                    rows[i].controls = [
+                        ft.Icon(ft.Icons.ERROR_OUTLINE, color=ft.Colors.RED_400, size=18),
+                        ft.Text(f"{labels[i]}: задача не найдена или нет доступа",
+                                size=13, color=ft.Colors.RED_400),
+                    ]
+            if self._results_col and failed:
                 self._results_col.update()
 
-            try:
-                await create_issue_link(
-                    settings.jira_url, settings.jira_token,
-                    link_type_id, outward, inward,
-                )
-                pending_row.controls = [
-                    ft.Icon(ft.Icons.CHECK_CIRCLE_OUTLINE,
-                            color=ft.Colors.GREEN_600, size=18),
-                    ft.Text(label_text, size=13),
-                ]
-            except Exception as exc:
-                log.exception("Failed to link %s → %s", source, target)
-                pending_row.controls = [
-                    ft.Icon(ft.Icons.ERROR_OUTLINE, color=ft.Colors.RED_400, size=18),
-                    ft.Text(f"{label_text}: {exc}", size=13, color=ft.Colors.RED_400),
-                ]
+        def on_retry(index: int, status: str) -> None:
+            pos = to_link[index]
+            rows[pos].controls[1] = ft.Text(
+                f"{labels[pos]}: {status}", size=13, color=ft.Colors.ORANGE_700,
+            )
+            if self._results_col:
+                self._results_col.update()
 
+        try:
+            existing = await get_issue_links(settings.jira_url, settings.jira_token, source)
+        except Exception as exc:
+            log.exception("Failed to read existing links of %s", source)
             if self._results_col:
+                self._results_col.controls = []
                 self._results_col.update()
+            error_snack(self.page, f"Не удалось получить связи задачи {source}: {exc}")
+            self._finish_link_run()
+            return
 
+        self._set_progress(done, len(targets), skipped, failed, settings.jira_url)
+        try:
+            async for result in bulk_create_links(
+                settings.jira_url, settings.jira_token,
+                link_type_id, source, [targets[i] for i in to_link], is_outward,
+                concurrency=settings.bulk_concurrency,
+                cancel_event=self._cancel_event,
+                on_retry=on_retry,
+                existing=existing,
+            ):
+                row = rows[to_link[result.index]]
+                label_text = labels[to_link[result.index]]
+                if result.retries:
+                    label_text += f" (повторов: {result.retries})"
+                if result.ok and result.detail:
+                    skipped += 1
+                    row.controls = [
+                        ft.Icon(ft.Icons.INFO_OUTLINE, color=ft.Colors.GREY_500, size=18),
+                        ft.Text(f"{label_text}: {result.detail}", size=13, color=ft.Colors.GREY_600),
+                    ]
+                elif result.ok:
+                    row.controls = [
+                        ft.Icon(ft.Icons.CHECK_CIRCLE_OUTLINE,
+                                color=ft.Colors.GREEN_600, size=18),
+                        ft.Text(label_text, size=13),
+                    ]
+                elif result.cancelled:
+                    row.controls = [
+                        ft.Icon(ft.Icons.BLOCK, color=ft.Colors.GREY_500, size=18),
+                        ft.Text(f"{label_text}: отменено", size=13, color=ft.Colors.GREY_600),
+                    ]
+                else:
+                    failed += 1
+                    row.controls = [
+                        ft.Icon(ft.Icons.ERROR_OUTLINE, color=ft.Colors.RED_400, size=18),
+                        ft.Text(f"{label_text}: {result.error}", size=13, color=ft.Colors.RED_400),
+                    ]
+                done += 1
+                self._set_progress(done, len(targets), skipped, failed, settings.jira_url)
+                if self._results_col:
+                    self._results_col.update()
+        except Exception as exc:
+            # Rows already shown stay as they are: those links were created
+            log.exception("Bulk linking of %s failed", source)
+            error_snack(self.page, f"Создание связей прервано: {exc}")
+        finally:
+            self._finish_link_run()
+
+    def _finish_link_run(self) -> None:
+        """Hide Cancel and re-enable the Link button after a run."""
+        self._cancel_event = None
+        if self._cancel_btn:
+            self._cancel_btn.visible = False
+            self._cancel_btn.update()
         if self._link_btn:
             self._link_btn.disabled = False
             self._link_btn.update()
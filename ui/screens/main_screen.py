@@ -8,15 +8,22 @@ import flet as ft
 
 log = logging.getLogger(__name__)
 
-from core.ai_router import generate
+from core.ai_router import (
+    STREAM_IDLE_TIMEOUT,
+    cancel_speculative_completion,
+    decompose,
+    generate_stream,
+    start_speculative_completion,
+)
 from core.audio_recorder import AudioRecorder
 from core.voice_processor import process_voice
 from data.drafts_store import save_draft
-from data.models import AIResponse, Draft, Team
+from data.models import AIResponse, Decomposition, Draft, Team
 from data.settings_store import load_settings
 from data.teams_store import load_all_teams
+from ui.components.decomposition_view import DecompositionView
 from ui.components.questions_form import QuestionsForm
-from ui.components.result_card import ResultCard
+from ui.components.result_card import ResultCard, ResultCardPreview
 from ui.snack import error_snack
 
 
@@ -35,7 +42,12 @@ class MainScreen:
         self._current_questions: list[str] = []
         self._current_questions_form: QuestionsForm | None = None
         self._current_ai_response: AIResponse | None = None
+        self._current_decomposition: Decomposition | None = None
         self._last_submitted_answers: list[list[str]] = []
+        # Arguments of the last generation (user_input, answers, force_complete) for Regenerate
+        self._last_generation: tuple[str, list[tuple[str, str]] | None, bool] | None = None
+        # Handle of the background "skip questions" generation (see start_speculative_completion)
+        self._speculation: str | None = None
         self._current_draft_id: str | None = None
 
         # Voice input state
@@ -49,6 +61,7 @@ class MainScreen:
         self._generate_btn: ft.ElevatedButton | None = None
         self._back_btn: ft.TextButton | None = None
         self._forward_btn: ft.TextButton | None = None
+        self._regenerate_btn: ft.TextButton | None = None
         self._save_draft_btn: ft.OutlinedButton | None = None
         self._loading: ft.ProgressRing | None = None
         self._error_text: ft.Text | None = None
@@ -57,6 +70,7 @@ class MainScreen:
         self._mic_btn: ft.OutlinedButton | None = None
         self._skip_btn: ft.TextButton | None = None
         self._skip_clarification_cb: ft.Checkbox | None = None
+        self._decompose_cb: ft.Checkbox | None = None
         self._recording_row: ft.Row | None = None
         self._processing_audio_row: ft.Row | None = None
 
@@ -73,6 +87,7 @@ class MainScreen:
         self._current_questions = []
         self._current_questions_form = None
         self._current_ai_response = None
+        self._current_decomposition = None
         self._current_draft_id = None
         self._container = ft.Container(
             padding=30,
@@ -91,6 +106,7 @@ class MainScreen:
         self._current_questions = []
         self._current_questions_form = None
         self._current_ai_response = None
+        self._current_decomposition = None
         self._current_draft_id = None
         if self._container is not None:
             self._container.content = self._build_content()
@@ -106,6 +122,8 @@ class MainScreen:
         self._current_questions = draft.questions
         self._current_questions_form = None
         self._current_ai_response = draft.ai_response
+        self._current_decomposition = None
+        self._last_generation = None
         self._current_draft_id = draft.id
 
         if self._team_dropdown is not None:
@@ -196,6 +214,14 @@ class MainScreen:
             visible=False,
         )
 
+        self._regenerate_btn = ft.TextButton(
+            "Сгенерировать заново",
+            icon=ft.Icons.REFRESH,
+            on_click=self._on_regenerate_clicked,
+            tooltip="Запросить у ИИ новый вариант, не используя сохранённый ответ",
+            visible=False,
+        )
+
         self._skip_btn = ft.TextButton(
             "Пропустить",
             icon=ft.Icons.SKIP_NEXT,
@@ -215,6 +241,12 @@ class MainScreen:
             value=False,
         )
 
+        self._decompose_cb = ft.Checkbox(
+            label="Разбить на эпик и истории",
+            value=False,
+            tooltip="ИИ предложит эпик и дочерние истории; все они создаются в Jira одной кнопкой",
+        )
+
         self._result_area = ft.Column(controls=[], spacing=16)
 
         self._mic_btn = ft.OutlinedButton(
@@ -264,6 +296,7 @@ class MainScreen:
                         ft.Container(expand=True),
                         self._back_btn,
                         self._forward_btn,
+                        self._regenerate_btn,
                         self._skip_btn,
                         self._save_draft_btn,
                     ],
@@ -275,6 +308,7 @@ class MainScreen:
                     controls=[
                         self._team_dropdown,
                         self._skip_clarification_cb,
+                        self._decompose_cb,
                     ],
                     vertical_alignment=ft.CrossAxisAlignment.CENTER,
                     spacing=16,
@@ -313,11 +347,17 @@ class MainScreen:
         self.page.run_task(self._do_generate, raw.strip())
 
     async def _do_generate(self, raw: str) -> None:
+        cancel_speculative_completion(self._speculation)
+        self._speculation = None
         self._user_input_value = raw
         self._stage = "input"
         self._current_questions = []
         self._current_questions_form = None
         self._current_ai_response = None
+        self._current_decomposition = None
+        if self._decompose_cb is not None and self._decompose_cb.value:
+            await self._run_decomposition(raw)
+            return
         force = bool(self._skip_clarification_cb and self._skip_clarification_cb.value)
         await self._run_generation(raw, None, force)
 
@@ -393,36 +433,65 @@ class MainScreen:
     def _on_skip_clicked(self, e: ft.ControlEvent) -> None:
         self.page.run_task(self._run_generation, self._user_input_value, None, True)
 
+    def _on_regenerate_clicked(self, e: ft.ControlEvent) -> None:
+        if self._last_generation is None:
+            return
+        user_input, answers, force_complete = self._last_generation
+        self.page.run_task(self._run_generation, user_input, answers, force_complete, False)
+
     async def _run_generation(
         self,
         user_input: str,
         answers: list[tuple[str, str]] | None,
         force_complete: bool = False,
+        use_cache: bool = True,
     ) -> None:
+        self._last_generation = (user_input, answers, force_complete)
+        if answers:
+            # The user answered instead of skipping: the pre-generated task is not needed
+            cancel_speculative_completion(self._speculation)
+            self._speculation = None
         self._set_loading(True)
         self._clear_result()
         self._clear_error()
 
+        preview: ResultCardPreview | None = None
+
+        def on_partial(fields: dict[str, str]) -> None:
+            # Questions are not worth previewing; show the card once a task is being written
+            nonlocal preview
+            if fields.get("status", "ready") != "ready" or not fields.get("task_title"):
+                return
+            if preview is None and self._result_area is not None:
+                preview = ResultCardPreview()
+                self._result_area.controls = [preview.build()]
+                self._result_area.update()
+            if preview is not None:
+                preview.update(fields)
+
         try:
             settings = load_settings()
-            response = await asyncio.wait_for(
-                generate(
-                    team=self._selected_team,
-                    user_input=user_input,
-                    answers=answers,
-                    settings=settings,
-                    force_complete=force_complete,
-                ),
-                timeout=30.0,
+            response = await generate_stream(
+                team=self._selected_team,
+                user_input=user_input,
+                answers=answers,
+                settings=settings,
+                force_complete=force_complete,
+                on_partial=on_partial,
+                use_cache=use_cache,
             )
             self._handle_response(response, user_input)
         except asyncio.TimeoutError:
-            log.error("Task generation timed out after 30s")
-            self._show_error("Превышено время ожидания (30 с). Попробуйте ещё раз.")
+            log.error("Task generation stalled: no data for %.0fs", STREAM_IDLE_TIMEOUT)
+            self._clear_result()
+            self._show_error(
+                f"ИИ не присылает ответ дольше {STREAM_IDLE_TIMEOUT:.0f} с. Попробуйте ещё раз."
+            )
             if self._current_questions_form is not None:
                 self._current_questions_form.reset_submit()
         except Exception as exc:
             log.exception("Task generation failed")
+            self._clear_result()
             self._show_error(str(exc))
             if self._current_questions_form is not None:
                 self._current_questions_form.reset_submit()
@@ -430,7 +499,35 @@ class MainScreen:
             self._set_loading(False)
             self.page.update()
 
+    async def _run_decomposition(self, user_input: str) -> None:
+        self._set_loading(True)
+        self._clear_result()
+        self._clear_error()
+
+        try:
+            settings = load_settings()
+            # Streamed with an idle timeout: an epic with a dozen stories takes long to write
+            decomposition = await decompose(
+                team=self._selected_team, user_input=user_input, settings=settings,
+            )
+            self._stage = "ready"
+            self._current_decomposition = decomposition
+            self._set_ready_view()
+            self._result_area.controls = [DecompositionView(self.page, decomposition).build()]
+        except asyncio.TimeoutError:
+            log.error("Decomposition stalled: no data for %.0fs", STREAM_IDLE_TIMEOUT)
+            self._show_error(
+                f"ИИ не присылает ответ дольше {STREAM_IDLE_TIMEOUT:.0f} с. Попробуйте ещё раз."
+            )
+        except Exception as exc:
+            log.exception("Decomposition failed")
+            self._show_error(str(exc))
+        finally:
+            self._set_loading(False)
+            self.page.update()
+
     def _handle_response(self, response: AIResponse, user_input: str) -> None:
+        self._current_decomposition = None
         if response.status == "ready":
             self._stage = "ready"
             self._current_ai_response = response
@@ -488,6 +585,9 @@ class MainScreen:
             self._save_draft_btn.icon = ft.Icons.COPY_ALL
             self._save_draft_btn.on_click = self._clone_draft_clicked
             self._save_draft_btn.update()
+        if self._regenerate_btn is not None:
+            self._regenerate_btn.visible = False
+            self._regenerate_btn.update()
 
     def _set_loading(self, loading: bool) -> None:
         if self._loading is not None:
@@ -535,6 +635,8 @@ class MainScreen:
             self._user_input.visible = False
         if self._skip_clarification_cb is not None:
             self._skip_clarification_cb.visible = False
+        if self._decompose_cb is not None:
+            self._decompose_cb.visible = False
         if self._generate_btn is not None:
             self._generate_btn.visible = False
         if self._generate_row is not None:
@@ -545,10 +647,14 @@ class MainScreen:
             self._forward_btn.visible = False
         if self._skip_btn is not None:
             self._skip_btn.visible = False
-        if self._save_draft_btn is not None:
-            in_jira = bool(
-                self._current_ai_response and self._current_ai_response.jira_issue_key
+        in_jira = bool(self._current_ai_response and self._current_ai_response.jira_issue_key)
+        if self._regenerate_btn is not None:
+            self._regenerate_btn.visible = (
+                self._current_decomposition is None and self._last_generation is not None and not in_jira
             )
+        if self._save_draft_btn is not None:
+            # Drafts hold a single task, so a decomposition cannot be saved as one
+            self._save_draft_btn.visible = self._current_decomposition is None
             if in_jira:
                 self._save_draft_btn.content = "Клонировать"
                 self._save_draft_btn.icon = ft.Icons.COPY_ALL
@@ -558,6 +664,18 @@ class MainScreen:
                 self._save_draft_btn.icon = ft.Icons.BOOKMARK_BORDER
                 self._save_draft_btn.on_click = self._save_draft_clicked
 
+    async def _start_speculation(self) -> None:
+        """Pre-generate the answer the Skip button would request."""
+        if self._selected_team is None or not self._user_input_value:
+            return
+        handle = start_speculative_completion(
+            self._selected_team, self._user_input_value, load_settings()
+        )
+        # The same request still in flight comes back under the same handle
+        if handle != self._speculation:
+            cancel_speculative_completion(self._speculation)
+        self._speculation = handle
+
     def _set_clarification_view(self) -> None:
         """Switch to clarification stage: make inputs read-only, show Back button."""
         if self._team_dropdown is not None:
@@ -568,6 +686,8 @@ class MainScreen:
             self._user_input.disabled = True
         if self._skip_clarification_cb is not None:
             self._skip_clarification_cb.visible = False
+        if self._decompose_cb is not None:
+            self._decompose_cb.visible = False
         if self._generate_btn is not None:
             self._generate_btn.visible = False
         if self._generate_row is not None:
@@ -575,11 +695,17 @@ class MainScreen:
         if self._back_btn is not None:
             self._back_btn.visible = True
         has_result = self._current_ai_response is not None
+        if not has_result:
+            # Coming back from a result, Forward returns to it: nothing to pre-generate then
+            self.page.run_task(self._start_speculation)
         if self._forward_btn is not None:
             self._forward_btn.visible = has_result
         if self._skip_btn is not None:
             self._skip_btn.visible = not has_result
+        if self._regenerate_btn is not None:
+            self._regenerate_btn.visible = False
         if self._save_draft_btn is not None:
+            self._save_draft_btn.visible = True
             self._save_draft_btn.content = "Сохранить"
             self._save_draft_btn.icon = ft.Icons.BOOKMARK_BORDER
 
@@ -593,6 +719,8 @@ class MainScreen:
             self._user_input.disabled = False
         if self._skip_clarification_cb is not None:
             self._skip_clarification_cb.visible = True
+        if self._decompose_cb is not None:
+            self._decompose_cb.visible = True
         if self._generate_btn is not None:
             self._generate_btn.visible = True
         if self._generate_row is not None:
@@ -600,10 +728,17 @@ class MainScreen:
         if self._back_btn is not None:
             self._back_btn.visible = False
         if self._forward_btn is not None:
-            self._forward_btn.visible = bool(self._current_questions) or self._current_ai_response is not None
+            self._forward_btn.visible = (
+                bool(self._current_questions)
+                or self._current_ai_response is not None
+                or self._current_decomposition is not None
+            )
         if self._skip_btn is not None:
             self._skip_btn.visible = False
+        if self._regenerate_btn is not None:
+            self._regenerate_btn.visible = False
         if self._save_draft_btn is not None:
+            self._save_draft_btn.visible = True
             self._save_draft_btn.content = "Сохранить"
             self._save_draft_btn.icon = ft.Icons.BOOKMARK_BORDER
 
@@ -652,6 +787,14 @@ class MainScreen:
 
     def _on_forward_clicked(self, e: ft.ControlEvent) -> None:
         """Forward from input → clarification (or ready if no questions); from clarification → ready."""
+        if self._stage == "input" and self._current_decomposition is not None:
+            self._stage = "ready"
+            self._set_ready_view()
+            if self._result_area is not None:
+                self._result_area.controls = [DecompositionView(self.page, self._current_decomposition).build()]
+            self.page.update()
+            return
+
         if self._stage == "input" and not self._current_questions and self._current_ai_response is not None:
             self._stage = "ready"
             self._set_ready_view()
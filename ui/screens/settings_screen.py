@@ -1,6 +1,15 @@
 import flet as ft
 
-from data.models import Settings
+from core.jira_client import (
+    DEFAULT_WRITE_BURST,
+    DEFAULT_WRITE_RATE,
+    configure_jira_pool,
+    configure_jira_rate_limits,
+)
+from core.insight_cache import clear_insight_cache
+from core.llm_clients import release_stale_llm_clients
+from core.meta_cache import clear_project_meta_cache
+from core.response_cache import clear_response_cache
 from data.settings_store import load_settings, save_settings
 
 
@@ -21,6 +30,24 @@ class SettingsScreen:
             width=320,
         )
 
+        hedging_cb = ft.Checkbox(
+            label="Дублировать медленный запрос во второй LLM (нужны оба ключа)",
+            value=settings.llm_hedging,
+        )
+
+        speculative_cb = ft.Checkbox(
+            label="Готовить задачу без уточнений заранее (мгновенный «Пропустить», расходует токены)",
+            value=settings.speculative_completion,
+        )
+
+        hedge_percentile_field = ft.TextField(
+            label="Порог задержки, перцентиль времени ответа",
+            value=str(settings.llm_hedge_percentile),
+            width=380,
+            keyboard_type=ft.KeyboardType.NUMBER,
+            hint_text="например: 95",
+        )
+
         anthropic_key = ft.TextField(
             label="Anthropic API Key",
             value=settings.anthropic_api_key,
@@ -52,6 +79,44 @@ class SettingsScreen:
             width=520,
         )
 
+        jira_pool_field = ft.TextField(
+            label="Макс. соединений с Jira",
+            value=str(settings.jira_max_connections),
+            width=280,
+            keyboard_type=ft.KeyboardType.NUMBER,
+            hint_text="например: 20",
+        )
+
+        jira_http2_cb = ft.Checkbox(
+            label="Использовать HTTP/2 (требуется пакет httpx[http2])",
+            value=settings.jira_http2,
+        )
+
+        bulk_concurrency_field = ft.TextField(
+            label="Параллельных запросов при массовых операциях",
+            value=str(settings.bulk_concurrency),
+            width=380,
+            keyboard_type=ft.KeyboardType.NUMBER,
+            hint_text="например: 8",
+        )
+
+        # Write limits are stored per Jira URL; the fields edit the entry of the current URL
+        rate_limit = settings.jira_rate_limits.get(settings.jira_url.strip().rstrip("/"), {})
+        write_rate_field = ft.TextField(
+            label="Лимит записи в Jira (запросов/с, 0 — без лимита)",
+            value=f"{rate_limit.get('rate', DEFAULT_WRITE_RATE):g}",
+            width=380,
+            keyboard_type=ft.KeyboardType.NUMBER,
+            hint_text=f"например: {DEFAULT_WRITE_RATE:g}",
+        )
+        write_burst_field = ft.TextField(
+            label="Запас запросов для всплеска (burst)",
+            value=str(rate_limit.get("burst", DEFAULT_WRITE_BURST)),
+            width=380,
+            keyboard_type=ft.KeyboardType.NUMBER,
+            hint_text=f"например: {DEFAULT_WRITE_BURST}",
+        )
+
         retention_field = ft.TextField(
             label="Удалять задачи старше (дней)",
             value=str(settings.draft_retention_days),
@@ -68,19 +133,80 @@ class SettingsScreen:
                 retention_days = max(1, retention_days)
             except ValueError:
                 retention_days = 90
-            new_settings = Settings(
-                default_llm=llm_dropdown.value or "anthropic",
-                anthropic_api_key=anthropic_key.value or "",
-                gemini_api_key=gemini_key.value or "",
-                jira_url=jira_url_field.value or "",
-                jira_token=jira_token_field.value or "",
-                draft_retention_days=retention_days,
-            )
+            try:
+                max_connections = max(1, int(jira_pool_field.value or "20"))
+            except ValueError:
+                max_connections = 20
+            try:
+                bulk_concurrency = max(1, int(bulk_concurrency_field.value or "8"))
+            except ValueError:
+                bulk_concurrency = 8
+            try:
+                hedge_percentile = min(99, max(50, int(hedge_percentile_field.value or "95")))
+            except ValueError:
+                hedge_percentile = 95
+            try:
+                write_rate = max(0.0, float((write_rate_field.value or "").replace(",", ".")))
+            except ValueError:
+                write_rate = DEFAULT_WRITE_RATE
+            try:
+                write_burst = max(1, int(write_burst_field.value or ""))
+            except ValueError:
+                write_burst = DEFAULT_WRITE_BURST
+            # Start from the stored settings so values owned by other screens
+            # (e.g. cached link types) are preserved
+            new_settings = load_settings()
+            new_settings.default_llm = llm_dropdown.value or "anthropic"
+            new_settings.llm_hedging = bool(hedging_cb.value)
+            new_settings.llm_hedge_percentile = hedge_percentile
+            new_settings.speculative_completion = bool(speculative_cb.value)
+            new_settings.anthropic_api_key = anthropic_key.value or ""
+            new_settings.gemini_api_key = gemini_key.value or ""
+            new_settings.jira_url = jira_url_field.value or ""
+            new_settings.jira_token = jira_token_field.value or ""
+            new_settings.jira_max_connections = max_connections
+            new_settings.jira_http2 = bool(jira_http2_cb.value)
+            new_settings.bulk_concurrency = bulk_concurrency
+            if new_settings.jira_url.strip():
+                new_settings.jira_rate_limits[new_settings.jira_url.strip().rstrip("/")] = {
+                    "rate": write_rate, "burst": write_burst,
+                }
+            new_settings.draft_retention_days = retention_days
             save_settings(new_settings)
+            self.page.run_task(configure_jira_pool, max_connections, bool(jira_http2_cb.value))
+            configure_jira_rate_limits(new_settings.jira_rate_limits)
+            self.page.run_task(release_stale_llm_clients, new_settings)
             status_text.value = "✓ Настройки сохранены"
             status_text.color = ft.Colors.GREEN
             self.page.update()
 
+        def clear_meta_cache_clicked(e: ft.ControlEvent) -> None:
+            removed = clear_project_meta_cache() + clear_insight_cache()
+            status_text.value = f"✓ Кэш полей и объектов Insight очищен ({removed})"
+            status_text.color = ft.Colors.GREEN
+            self.page.update()
+
+        async def clear_response_cache_async() -> None:
+            removed = await clear_response_cache()
+            status_text.value = f"✓ Сохранённые ответы ИИ удалены ({removed})"
+            status_text.color = ft.Colors.GREEN
+            self.page.update()
+
+        def clear_response_cache_clicked(e: ft.ControlEvent) -> None:
+            self.page.run_task(clear_response_cache_async)
+
+        clear_response_cache_btn = ft.TextButton(
+            "Очистить сохранённые ответы ИИ",
+            icon=ft.Icons.DELETE_SWEEP_OUTLINED,
+            on_click=clear_response_cache_clicked,
+        )
+
+        clear_meta_cache_btn = ft.TextButton(
+            "Очистить кэш Jira",
+            icon=ft.Icons.DELETE_SWEEP_OUTLINED,
+            on_click=clear_meta_cache_clicked,
+        )
+
         save_btn = ft.ElevatedButton(
             "Сохранить",
             icon=ft.Icons.SAVE,
@@ -95,6 +221,10 @@ class SettingsScreen:
                     ft.Divider(),
                     ft.Text("LLM-провайдер", size=15, weight=ft.FontWeight.W_500),
                     llm_dropdown,
+                    hedging_cb,
+                    hedge_percentile_field,
+                    speculative_cb,
+                    clear_response_cache_btn,
                     ft.Container(height=8),
                     ft.Text("API-ключи", size=15, weight=ft.FontWeight.W_500),
                     anthropic_key,
@@ -103,6 +233,12 @@ class SettingsScreen:
                     ft.Text("Подключение к Jira", size=15, weight=ft.FontWeight.W_500),
                     jira_url_field,
                     jira_token_field,
+                    jira_pool_field,
+                    jira_http2_cb,
+                    bulk_concurrency_field,
+                    write_rate_field,
+                    write_burst_field,
+                    clear_meta_cache_btn,
                     ft.Container(height=8),
                     ft.Text("Сохранённые задачи", size=15, weight=ft.FontWeight.W_500),
                     retention_field,
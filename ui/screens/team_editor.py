@@ -4,11 +4,15 @@ from typing import Callable
 
 import flet as ft
 
-from core.jira_client import get_insight_objects, get_link_types, get_project_meta
+from core.insight_index import InsightIndex
+from core.insight_cache import load_insight_objects
+from core.jira_client import get_insight_objects, get_link_types
+from core.meta_cache import get_project_meta_cached
 from core.jira_markup import jira_to_md
 from data.models import Team
 from data.settings_store import load_settings, save_settings
 from data.teams_store import delete_team, is_lead_taken, is_name_taken, save_team
+from ui.components.insight_picker import InsightPicker
 from ui.snack import error_snack
 
 _DIALOG_W = 560
@@ -99,6 +103,9 @@ class TeamEditor:
 
         # --- Add-row state (tracks selected field + accumulated multi-values) ---
         _add_row_state: list[dict] = [{"field_id": None, "multi_ids": [], "schema_filter": None}]
+        _insight_indexes: dict[str, InsightIndex] = {}  # field_id → objects loaded so far
+        _insight_type_ids: dict[str, int | None] = {}  # field_id → objectTypeId used for loading
+        _insight_picker: list[InsightPicker | None] = [None]
 
         # Forward declaration — assigned below after _build_add_row is defined
         _add_field_row_container: ft.Container
@@ -108,6 +115,10 @@ class TeamEditor:
         _release_field_id: list[str] = [self.team.release_field_id if self.team else ""]
         _release_insight_loading: list[bool] = [False]
         _release_section_ref: list[ft.Container | None] = [None]
+        # Project whose meta is currently shown; "Обновить" for it bypasses the cache
+        _meta_project: list[str] = [
+            self.team.jira_project.upper() if self.team and self.team.jira_fields_meta else ""
+        ]
 
         async def _do_fetch_meta() -> None:
             proj_key = (project_field.value or "").strip().upper()
@@ -124,8 +135,18 @@ class TeamEditor:
             fetch_btn.update()
             fetch_loading.update()
             fetch_status.update()
+            force = bool(_jira_fields) and _meta_project[0] == proj_key
+
+            def on_refresh(fresh: dict) -> None:
+                if (project_field.value or "").strip().upper() != proj_key:
+                    return  # project key edited meanwhile
+                _apply_meta(fresh, keep_selection=True)
+
             try:
-                meta = await get_project_meta(settings.jira_url, settings.jira_token, proj_key)
+                meta = await get_project_meta_cached(
+                    settings.jira_url, settings.jira_token, proj_key,
+                    on_refresh=on_refresh, force=force,
+                )
             except Exception as exc:
                 error_snack(self.page, str(exc))
                 return
@@ -135,6 +156,9 @@ class TeamEditor:
                 fetch_btn.update()
                 fetch_loading.update()
 
+            _meta_project[0] = proj_key
+            _apply_meta(meta, keep_selection=False)
+
             # Also fetch and persist link types (global, not project-specific)
             try:
                 link_types = await get_link_types(settings.jira_url, settings.jira_token)
@@ -144,10 +168,13 @@ class TeamEditor:
             except Exception:
                 pass  # non-critical — don't block team save
 
+        def _apply_meta(meta: dict, keep_selection: bool) -> None:
+            """Replace project metadata; with keep_selection, a field being added survives if it still exists."""
             _jira_issue_types.clear()
             _jira_issue_types.extend(meta["issue_types"])
             _jira_fields.clear()
             _jira_fields.extend(meta["fields"])
+            _insight_indexes.clear()
             for t in _jira_issue_types:
                 _type_id_map[t["name"]] = t["id"]
 
@@ -159,9 +186,12 @@ class TeamEditor:
             task_type_dropdown.value = current_val if current_val in type_names else None
             task_type_dropdown.update()
 
-            # Rebuild add-row (now has field meta with allowed_values)
-            _add_row_state[0] = {"field_id": None, "multi_ids": [], "schema_filter": None}
-            _add_field_row_container.content = _build_add_row()
+            # Rebuild add-row (now has field meta with allowed_values), unless a background
+            # refresh arrives while the user is filling it in for a field that still exists
+            known = {f["id"] for f in _jira_fields}
+            if not keep_selection or _add_row_state[0].get("field_id") not in known:
+                _add_row_state[0] = {"field_id": None, "multi_ids": [], "schema_filter": None}
+                _add_field_row_container.content = _build_add_row()
             self.page.update()
             _extra_fields_column.controls = _build_field_rows()
             _extra_fields_column.update()
@@ -440,6 +470,44 @@ class TeamEditor:
                 ]
             return rows
 
+        async def _stream_insight_objects(
+            jira_url: str, token: str, field_id: str, field_name: str, object_type_id: int | None,
+            force: bool = False,
+        ) -> None:
+            """Load Insight objects page by page; the picker appears after the first page.
+
+            force=True skips the on-disk cache and reloads the objects from Jira.
+            """
+            _insight_type_ids[field_id] = object_type_id
+            index = InsightIndex()
+            values: list[dict] = []  # becomes the field's allowed_values and grows with each page
+            shown = False
+            try:
+                async for page_objects in load_insight_objects(
+                    jira_url, token, field_name, field_id, object_type_id=object_type_id, force=force,
+                ):
+                    index.add(page_objects)
+                    values.extend(page_objects)
+                    if not shown and values:
+                        shown = True
+                        _insight_indexes[field_id] = index
+                        fmeta = next((f for f in _jira_fields if f["id"] == field_id), None)
+                        if fmeta is not None:
+                            fmeta["allowed_values"] = values
+                            fmeta["multi"] = True
+                        if _add_row_state[0].get("field_id") == field_id:
+                            _add_row_state[0] = {"field_id": field_id, "multi_ids": [], "loading": False}
+                            _add_field_row_container.content = _build_add_row()
+                            self.page.update()
+                    elif shown and _insight_picker[0] is not None and _insight_picker[0].index is index:
+                        _insight_picker[0].refresh()
+            finally:
+                index.complete = True
+                if _insight_picker[0] is not None and _insight_picker[0].index is index:
+                    _insight_picker[0].refresh()
+            if not shown:
+                raise ValueError(f"Insight: объекты для поля «{field_name}» не найдены.")
+
         def _build_add_row() -> ft.Control:
             meta_loaded = bool(_jira_fields)
             if not meta_loaded:
@@ -541,22 +609,15 @@ class TeamEditor:
                                 raise ValueError("Настройте подключение к Jira в Настройках")
                             raw_tid = (_type_id_field.value or "").strip()
                             explicit_type_id = int(raw_tid) if raw_tid.isdigit() else None
-                            objects = await get_insight_objects(
+                            await _stream_insight_objects(
                                 settings.jira_url, settings.jira_token,
-                                cur_fmeta["name"], cur_fid or "",
-                                object_type_id=explicit_type_id,
+                                cur_fid or "", cur_fmeta["name"], explicit_type_id,
                             )
-                            # Store fetched values into _jira_fields for this field
-                            idx = next((i for i, f in enumerate(_jira_fields) if f["id"] == cur_fid), None)
-                            if idx is not None:
-                                _jira_fields[idx]["allowed_values"] = objects
-                                _jira_fields[idx]["multi"] = True
-                            _add_row_state[0] = {"field_id": cur_fid, "multi_ids": [], "loading": False}
                         except Exception as exc:
                             _add_row_state[0]["loading"] = False
                             error_snack(self.page, str(exc))
-                        _add_field_row_container.content = _build_add_row()
-                        self.page.update()
+                            _add_field_row_container.content = _build_add_row()
+                            self.page.update()
 
                     val_ctrl = ft.Column(
                         controls=[
@@ -583,42 +644,87 @@ class TeamEditor:
                     return ""
 
             elif is_insight or cur_fmeta["multi"]:
-                # Multi-select: dropdown picker + chips
+                # Multi-select: dropdown picker (search picker for Insight) + chips
                 already_ids = set(cur_multi_ids)
 
-                filtered_avs = [
-                    av for av in cur_fmeta["allowed_values"]
-                    if av["id"] not in already_ids
-                ]
-                def on_add_multi_val(e: ft.ControlEvent) -> None:
-                    vid = e.control.value
+                def add_multi_val(vid: str | None) -> None:
                     if vid and vid not in _add_row_state[0]["multi_ids"]:
                         _add_row_state[0]["multi_ids"].append(vid)
                         _add_field_row_container.content = _build_add_row()
                         self.page.update()
 
-                pick_dd = ft.Dropdown(
-                    options=[
-                        ft.dropdown.Option(av["id"], av["name"])
-                        for av in filtered_avs
-                    ],
-                    hint_text="Добавить значение...",
-                    dense=True,
-                    expand=3,
-                    on_select=on_add_multi_val,
-                )
+                if is_insight:
+                    index = _insight_indexes.get(cur_fid)
+                    if index is None:
+                        index = InsightIndex.from_objects(cur_fmeta["allowed_values"])
+                        _insight_indexes[cur_fid] = index
+                    _insight_picker[0] = InsightPicker(
+                        self.page, index, on_pick=add_multi_val, exclude_ids=already_ids, expand=1,
+                    )
 
-                picker_row = ft.Row(
-                    controls=[pick_dd],
-                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                    spacing=4,
-                )
-                val_ctrl = ft.Column(
-                    controls=[picker_row],
-                    spacing=4,
-                    expand=3,
-                    horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
-                )
+                    async def _do_refresh_insight(e: ft.ControlEvent) -> None:
+                        # Current objects stay in the picker until the first fresh page arrives
+                        _add_row_state[0]["loading"] = True
+                        _add_field_row_container.content = _build_add_row()
+                        self.page.update()
+                        try:
+                            settings = load_settings()
+                            if not settings.jira_url or not settings.jira_token:
+                                raise ValueError("Настройте подключение к Jira в Настройках")
+                            await _stream_insight_objects(
+                                settings.jira_url, settings.jira_token,
+                                cur_fid or "", cur_fmeta["name"], _insight_type_ids.get(cur_fid or ""),
+                                force=True,
+                            )
+                        except Exception as exc:
+                            _add_row_state[0]["loading"] = False
+                            error_snack(self.page, str(exc))
+                            _add_field_row_container.content = _build_add_row()
+                            self.page.update()
+
+                    refresh_ctrl: ft.Control = (
+                        ft.ProgressRing(width=18, height=18, stroke_width=2)
+                        if is_loading
+                        else ft.IconButton(
+                            icon=ft.Icons.REFRESH,
+                            icon_size=18,
+                            tooltip="Обновить объекты из Jira (без кэша)",
+                            on_click=lambda e: self.page.run_task(_do_refresh_insight, e),
+                        )
+                    )
+                    val_ctrl = ft.Row(
+                        controls=[_insight_picker[0].build(), refresh_ctrl],
+                        spacing=4,
+                        expand=3,
+                        vertical_alignment=ft.CrossAxisAlignment.START,
+                    )
+                else:
+                    filtered_avs = [
+                        av for av in cur_fmeta["allowed_values"]
+                        if av["id"] not in already_ids
+                    ]
+                    pick_dd = ft.Dropdown(
+                        options=[
+                            ft.dropdown.Option(av["id"], av["name"])
+                            for av in filtered_avs
+                        ],
+                        hint_text="Добавить значение...",
+                        dense=True,
+                        expand=3,
+                        on_select=lambda e: add_multi_val(e.control.value),
+                    )
+
+                    picker_row = ft.Row(
+                        controls=[pick_dd],
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        spacing=4,
+                    )
+                    val_ctrl = ft.Column(
+                        controls=[picker_row],
+                        spacing=4,
+                        expand=3,
+                        horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
+                    )
 
                 for vid in cur_multi_ids:
                     vname = next(